@@ -0,0 +1,95 @@
+"""
+Import-time benchmark for gemini_audio_transcription.
+
+Imports the package in fresh interpreters and reports the wall time, peak RSS and whether
+heavy optional modules were loaded. Transcription-only imports must not load the
+alignment stack (stable_whisper, torch), the audio stack (pydub, NumPy) or libmagic.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--statement "import gemini_audio_transcription"]
+        [--max-seconds 2.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must stay unloaded after a transcription-only import
+HEAVY_MODULES = ("stable_whisper", "torch", "pydub", "numpy", "magic")
+
+# Code run in the child interpreter, prints timing and loaded heavy modules as JSON
+CHILD_CODE = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": max_rss_kb / 1024,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(statement: str) -> dict:
+    """
+    Run the import statement in a fresh interpreter.
+
+    Args:
+        statement: Python statement to time
+
+    Returns:
+        dict: {"seconds": float, "max_rss_mb": float, "loaded": List[str]}
+    """
+    code = CHILD_CODE.format(statement=statement, heavy=HEAVY_MODULES)
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [repo_root, env.get("PYTHONPATH")]))
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to time")
+    parser.add_argument(
+        "--statement",
+        default="import gemini_audio_transcription",
+        help="Import statement to time",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Fail if the median import time exceeds this value",
+    )
+    args = parser.parse_args()
+
+    results = [run_once(args.statement) for _ in range(args.runs)]
+    seconds = [r["seconds"] for r in results]
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    print(f"Statement:      {args.statement}")
+    print(f"Runs:           {args.runs}")
+    print(f"Median time:    {statistics.median(seconds):.3f} s (min {min(seconds):.3f} s, max {max(seconds):.3f} s)")
+    print(f"Peak RSS:       {max(r['max_rss_mb'] for r in results):.1f} MB")
+    print(f"Heavy modules:  {', '.join(loaded) if loaded else 'none'}")
+
+    failed = False
+    if loaded and args.statement == parser.get_default("statement"):
+        print(f"FAIL: package import loaded {', '.join(loaded)}")
+        failed = True
+    if args.max_seconds is not None and statistics.median(seconds) > args.max_seconds:
+        print(f"FAIL: median import time exceeds {args.max_seconds:.3f} s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Chunk slicing benchmark for gemini_audio_transcription.
+
+Cuts a synthetic recording into aligned segments with the former pydub path (millisecond
+cuts, padding concatenated from 1 ms silences, pydub WAV export) and with the path TextAligner
+runs now (AudioChunk objects over the shared samples, AudioChunk.to_wav and write_chunks).
+Reports the wall time of getting every chunk as WAV bytes and of saving every chunk with
+its text file, and how far the pydub chunk lengths are off the sample-accurate length.
+
+Usage:
+    python benchmarks/slicing.py [--duration-s 3600] [--segments 3000] [--sample-rate 16000]
+        [--leading-silence-ms 100] [--trailing-silence-ms 100] [--runs 3] [--workers 8]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+import numpy as np
+from pydub import AudioSegment
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_audio_transcription.chunk import AudioChunk, AudioSlice  # noqa: E402
+from gemini_audio_transcription.chunk_writer import write_chunks  # noqa: E402
+from gemini_audio_transcription.decoded_audio import DecodedAudio  # noqa: E402
+from gemini_audio_transcription.slicer import compute_boundaries, ms_to_samples  # noqa: E402
+
+
+def make_segments(duration_s: float, count: int, seed: int = 0):
+    """
+    Create sorted, non-overlapping segment timestamps with sub-millisecond precision.
+
+    Args:
+        duration_s: Duration (s) of the recording
+        count: Number of segments
+        seed: Random seed
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Start and end times (s)
+    """
+    rng = np.random.default_rng(seed)
+    bounds = np.sort(rng.uniform(0, duration_s, size=2 * count))
+    return bounds[0::2], bounds[1::2]
+
+
+def slice_pydub(segment: AudioSegment, starts, ends, leading_silence_ms: int, trailing_silence_ms: int):
+    """
+    Cut chunks the way TextAligner did before the NumPy slicer.
+    """
+    silence = AudioSegment.silent(duration=1)
+    chunks = []
+    for start, end in zip(starts, ends):
+        chunk = segment[int(start * 1000) : int(end * 1000)]
+        if leading_silence_ms > 0:
+            chunk = silence * leading_silence_ms + chunk
+        if trailing_silence_ms > 0:
+            chunk = chunk + silence * trailing_silence_ms
+        chunks.append(chunk)
+    return chunks
+
+
+def wav_pydub(chunks):
+    """
+    Get pydub chunks as WAV bytes, like the former chunk export.
+    """
+    return [chunk.export(BytesIO(), format="wav").getvalue() for chunk in chunks]
+
+
+def save_pydub(chunks, save_folder: str):
+    """
+    Save pydub chunks with their text files the way TextAligner did before write_chunks.
+    """
+    os.makedirs(save_folder, exist_ok=True)
+    for i, chunk in enumerate(chunks):
+        chunk.export(os.path.join(save_folder, f"{i:05d}.wav"), format="wav")
+        with open(os.path.join(save_folder, f"{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"segment {i}")
+
+
+def build_chunks(audio: DecodedAudio, starts, ends, leading_silence_ms: int, trailing_silence_ms: int):
+    """
+    Build AudioChunk objects the way TextAligner._slice_segments does.
+    """
+    start_idx, end_idx = compute_boundaries(starts, ends, audio.sample_rate, len(audio.samples))
+    leading_samples = ms_to_samples(leading_silence_ms, audio.sample_rate)
+    trailing_samples = ms_to_samples(trailing_silence_ms, audio.sample_rate)
+    return [
+        AudioChunk(
+            AudioSlice(
+                audio.samples,
+                audio.sample_rate,
+                start,
+                end,
+                leading_samples,
+                trailing_samples,
+                sample_width=audio.sample_width,
+            ),
+            f"segment {i}",
+            f"{i:05d}.wav",
+        )
+        for i, (start, end) in enumerate(zip(start_idx.tolist(), end_idx.tolist()))
+    ]
+
+
+def time_call(func, runs: int):
+    """
+    Time a function.
+
+    Args:
+        func: Function without arguments
+        runs: Number of runs
+
+    Returns:
+        Tuple[float, Any]: Median time (s) and the result of the last run
+    """
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration-s", type=float, default=3600.0, help="Duration (s) of the synthetic recording")
+    parser.add_argument("--segments", type=int, default=3000, help="Number of aligned segments")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Sample rate (Hz)")
+    parser.add_argument("--leading-silence-ms", type=int, default=100, help="Silence (ms) before each chunk")
+    parser.add_argument("--trailing-silence-ms", type=int, default=100, help="Silence (ms) after each chunk")
+    parser.add_argument("--runs", type=int, default=3, help="Number of timed runs per path")
+    parser.add_argument("--workers", type=int, default=8, help="Threads of write_chunks")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    samples = rng.integers(-8000, 8000, size=int(args.duration_s * args.sample_rate), dtype=np.int16)
+    audio = DecodedAudio(samples, args.sample_rate)
+    segment = audio.to_segment()
+    starts, ends = make_segments(args.duration_s, args.segments)
+    padding = (args.leading_silence_ms, args.trailing_silence_ms)
+    out_dir = tempfile.mkdtemp(prefix="slicing-benchmark-")
+
+    def save_with_pydub():
+        save_pydub(slice_pydub(segment, starts, ends, *padding), os.path.join(out_dir, "pydub"))
+
+    def save_with_chunks():
+        write_chunks(build_chunks(audio, starts, ends, *padding), os.path.join(out_dir, "chunks"), args.workers)
+
+    try:
+        pydub_wav_s, pydub_chunks = time_call(
+            lambda: wav_pydub(slice_pydub(segment, starts, ends, *padding)), args.runs
+        )
+        chunk_wav_s, chunk_wavs = time_call(
+            lambda: [chunk.to_wav() for chunk in build_chunks(audio, starts, ends, *padding)], args.runs
+        )
+        pydub_save_s, _ = time_call(save_with_pydub, args.runs)
+        chunk_save_s, _ = time_call(save_with_chunks, args.runs)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # Chunk lengths off the sample-accurate length, in samples at the source rate
+    expected = np.array([chunk["audio"].frame_count() for chunk in build_chunks(audio, starts, ends, *padding)])
+    pydub_lengths = np.array(
+        [round(c.frame_count() * args.sample_rate / c.frame_rate) for c in slice_pydub(segment, starts, ends, *padding)]
+    )
+    error = np.abs(pydub_lengths - expected)
+    wav_mb = sum(len(wav) for wav in chunk_wavs) / 1e6
+
+    print(f"Audio:             {args.duration_s:.0f} s at {args.sample_rate} Hz ({audio.nbytes / 1e6:.1f} MB)")
+    print(f"Segments:          {args.segments} (padding {padding[0]} ms + {padding[1]} ms, {wav_mb:.1f} MB of WAV)")
+    print(f"WAV bytes, pydub:  {pydub_wav_s:.3f} s")
+    print(f"WAV bytes, chunks: {chunk_wav_s:.3f} s ({pydub_wav_s / max(chunk_wav_s, 1e-9):.1f}x)")
+    print(f"Save, pydub:       {pydub_save_s:.3f} s")
+    print(f"Save, chunks:      {chunk_save_s:.3f} s ({pydub_save_s / max(chunk_save_s, 1e-9):.1f}x, {args.workers} workers)")
+    print(f"pydub length error: max {error.max()} samples, mean {error.mean():.1f} samples")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -43,7 +43,8 @@ from gemini_audio_transcription import AudioTranscriber, AudioProcessor
 def get_processor(api_key, transcription_model, whisper_model, device):
     """
     Create and cache an AudioProcessor instance.
-    Will only be recreated if any of the input parameters change.
+    Will only be recreated if any of the input parameters change. Processors share the
+    whisper model, so changing the Gemini model or API key does not load it again.
 
     Args:
         api_key: Google API key
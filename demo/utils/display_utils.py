@@ -67,8 +67,8 @@ def show_transcript_details(
             
             # If we have audio data
             if "audio" in item:
-                # Convert audio to WAV format for playback
-                audio_data = item["audio"].export(format="wav").read()
+                # Build WAV bytes on demand, the cached chunk only references the shared samples
+                audio_data = item["audio"].to_wav()
                 
                 # Create playback control
                 st.audio(audio_data)
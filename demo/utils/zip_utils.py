@@ -6,7 +6,6 @@ import io
 import os
 import zipfile
 import streamlit as st
-import tempfile
 
 def create_zip_from_files(file_paths, zip_name="audio_segments.zip"):
     """
@@ -41,39 +40,29 @@ def create_zip_from_audio_chunks(audio_chunks, include_text=True):
     Create a ZIP file from audio chunks (segments).
     
     Args:
-        audio_chunks (list): List of dictionaries containing audio segments
+        audio_chunks (list): List of results containing audio chunks
         include_text (bool): Whether to include text files alongside audio files
         
     Returns:
         bytes: ZIP file content as bytes
     """
-    # Create a temporary directory to store files
-    with tempfile.TemporaryDirectory() as temp_dir:
-        file_paths = []
-        
-        # Save each audio segment to the temporary directory
+    zip_buffer = io.BytesIO()
+    
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        # Write each audio segment straight into the ZIP, WAV bytes are built one chunk at a time
         for i, chunk in enumerate(audio_chunks):
             if "audio" in chunk:
                 # Get the filename from the chunk or generate one
                 filename = chunk.get("filename", f"segment_{i+1}.wav")
-                file_path = os.path.join(temp_dir, filename)
+                zipf.writestr(filename, chunk["audio"].to_wav())
                 
-                # Export audio to file
-                chunk["audio"].export(file_path, format="wav")
-                file_paths.append(file_path)
-                
-                # If including text and we have text, create a text file
+                # If including text and we have text, add a text file
                 if include_text and "text" in chunk:
                     text_filename = os.path.splitext(filename)[0] + ".txt"
-                    text_path = os.path.join(temp_dir, text_filename)
-                    
-                    with open(text_path, "w", encoding="utf-8") as f:
-                        f.write(chunk["text"])
-                    
-                    file_paths.append(text_path)
-        
-        # Create ZIP file
-        return create_zip_from_files(file_paths, "audio_segments.zip")
+                    zipf.writestr(text_filename, chunk["text"])
+    
+    zip_buffer.seek(0)
+    return zip_buffer.getvalue()
 
 def add_zip_download_button(audio_chunks, button_text="Download All Segments as ZIP", include_text=True):
     """
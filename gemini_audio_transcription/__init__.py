@@ -1,15 +1,86 @@
 """
 Audio Transcription - A library for audio transcription and alignment using Google Gemini API.
+
+TextAligner and AudioProcessor, and the audio classes built on pydub and NumPy, are loaded
+on first access, so that transcription-only users do not import stable_whisper, torch,
+pydub or NumPy.
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 from .version import __version__
-from .transcriber import AudioTranscriber
-from .aligner import TextAligner
-from .processor import AudioProcessor
+from .transcriber import AudioTranscriber, TranscriptSegment
+from .file_manager import UploadRegistry
+from .key_pool import APIKeyPool
+from .hedging import HedgePolicy
+from .metrics import MetricsCollector
+from .batch import BatchBackend, GeminiBatchBackend, LocalBatchBackend
+from .rate_limiter import RateLimiter, InMemoryBackend, FileLockBackend
+from .retry import RetryPolicy, RetryError
+from .cache import TranscriptionCache
+from .prompt_cache import PromptCache
+from .model_registry import WhisperModelRegistry
+
+if TYPE_CHECKING:
+    from .aligner import TextAligner
+    from .processor import AudioProcessor
+    from .segmenter import AudioSegmenter
+    from .decoded_audio import DecodedAudio
+    from .chunk import AudioChunk, AudioSlice
+    from .encoder import AudioEncoder
+
+# Attributes imported on first access, mapped to the module defining them
+_LAZY_ATTRIBUTES = {
+    "TextAligner": ".aligner",
+    "AudioProcessor": ".processor",
+    "AudioSegmenter": ".segmenter",
+    "DecodedAudio": ".decoded_audio",
+    "AudioChunk": ".chunk",
+    "AudioSlice": ".chunk",
+    "AudioEncoder": ".encoder",
+}
 
 __all__ = [
     "__version__",
     "AudioTranscriber",
+    "TranscriptSegment",
     "TextAligner",
     "AudioProcessor",
+    "WhisperModelRegistry",
+    "AudioSegmenter",
+    "DecodedAudio",
+    "AudioChunk",
+    "AudioSlice",
+    "AudioEncoder",
+    "UploadRegistry",
+    "APIKeyPool",
+    "HedgePolicy",
+    "MetricsCollector",
+    "BatchBackend",
+    "GeminiBatchBackend",
+    "LocalBatchBackend",
+    "RateLimiter",
+    "InMemoryBackend",
+    "FileLockBackend",
+    "RetryPolicy",
+    "RetryError",
+    "TranscriptionCache",
+    "PromptCache",
 ]
+
+
+def __getattr__(name):
+    """
+    Import lazily loaded attributes on first access.
+    """
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
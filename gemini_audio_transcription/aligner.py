@@ -5,70 +5,95 @@ This module provides functionality to align text with audio and segment audio fi
 into chunks based on the text.
 """
 
-import os
 import random
 import string
 from io import BytesIO
 from typing import Dict, List, Optional, Tuple, Union
 
-import stable_whisper
 from stable_whisper.result import WhisperResult
-from pydub import AudioSegment
 from stable_whisper.whisper_word_level.hf_whisper import WhisperHF
 
+from .chunk import AudioChunk, AudioSlice
+from .chunk_writer import write_chunks
+from .decoded_audio import WHISPER_SAMPLE_RATE, DecodedAudio
+from .metrics import measure_stage
+from .model_registry import default_registry
+from .slicer import compute_boundaries, ms_to_samples
+
 class TextAligner:
     """
     Class for aligning text with audio and creating audio segments.
     """
 
-    def __init__(self, model_name="large-v3", device="cpu"):
+    def __init__(
+        self, model_name="large-v3", device="cpu", metrics=None, dtype=None, model_registry=None, export_workers=8
+    ):
         """
         Initialize TextAligner with a specific model and device.
+
+        The model is shared with other aligners of the same model, device and dtype and
+        is not loaded until the first align_text call.
         
         Args:
             model_name (str): Whisper model name ("tiny", "base", "small", "medium", "large", "large-v3")
             device (str): Device to run the model on ("cpu", "cuda", "mps")
+            metrics (callable, optional): Callback receiving a dict event for every alignment, slicing
+                and export stage, e.g. a MetricsCollector
+            dtype (str, optional): torch dtype name the weights are cast to, e.g. "float16". If None,
+                the model's default dtype is used.
+            model_registry (WhisperModelRegistry, optional): Registry sharing loaded models. If None,
+                the process-wide default registry is used.
+            export_workers (int): Number of threads writing chunk files when align_text is given a save_folder
         """
         self.model_name = model_name
         self.device = device
-        self.model = self._load_model(model_name, device)
+        self.dtype = dtype
+        self.metrics = metrics
+        self.export_workers = export_workers
+        self.model_registry = model_registry or default_registry
+        self._model_handle = self.model_registry.acquire(model_name, device, dtype)
+
+    @property
+    def model(self) -> WhisperHF:
+        """
+        Shared stable_whisper model, loaded on first access.
+        """
+        return self._model_handle.model
 
-    def _load_model(self, model_name, device) -> WhisperHF:
+    def close(self) -> None:
         """
-        Load the stable_whisper model.
-        
-        Args:
-            model_name (str): Whisper model name
-            device (str): Device to run the model on
-            
-        Returns:
-            The loaded model
+        Release the shared model, so it can be unloaded once no other aligner uses it.
         """
-        print(f"Loading stable_whisper model {model_name} on {device}")
-        return stable_whisper.load_model(model_name, device=device)
+        self._model_handle.release()
+
+    def __del__(self):
+        handle = getattr(self, "_model_handle", None)
+        if handle is not None:
+            handle.release()
     
     def align_text(
         self,
         text: Union[str, list[str]],
-        audio_file: Union[str, BytesIO, bytes],
+        audio_file: Union[str, BytesIO, bytes, DecodedAudio],
         save_folder: Optional[str] = None,
         leading_silence_ms: int = 0,
         trailing_silence_ms: int = 0,
         language: str = "en",
-    ) -> List[Dict]:
+    ) -> List[Union[AudioChunk, Dict]]:
         """
         Align text with audio and segment into chunks.
         
         Args:
             text: Text to align with audio, can be a string or list of strings
-            audio_file: Audio file, can be path, BytesIO or bytes
+            audio_file: Audio file, can be path, BytesIO, bytes or DecodedAudio
             save_folder: Folder to save audio chunks and text, if None doesn't save
             leading_silence_ms: Silence (ms) to add at the beginning of each chunk
             trailing_silence_ms: Silence (ms) to add at the end of each chunk
             language: Language code for alignment, default is English ("en")
             
         Returns:
-            If save_folder is None: List of dictionaries with {"audio": AudioSegment, "text": str, "filename": str}
+            If save_folder is None: List of AudioChunk, read-only mappings with {"audio": AudioSlice, "text": str,
+                "filename": str} that share the decoded samples of the file
             If save_folder is provided: List of dictionaries with {"filename": str, "text": str, "full_path": str}
             
         Raises:
@@ -78,40 +103,84 @@ class TextAligner:
         if isinstance(text, list):
             text = "\n".join(text)
 
-        # Handle BytesIO conversion
-        if isinstance(audio_file, BytesIO):
-            audio_file = audio_file.read()
+        # Decode once, whisper and the slicer share the samples
+        audio = self._load_audio(audio_file)
+        audio_size = audio.nbytes
 
         # Align text with audio using stable_whisper
-        result: WhisperResult = self.model.align(
-            audio_file, text, language=language, original_split=True
-        )
+        with measure_stage(self.metrics, "alignment", bytes_in=audio_size, model=self.model_name) as event:
+            whisper_audio = audio.to_float32(WHISPER_SAMPLE_RATE)
+            # The model is shared between aligners, run one alignment at a time
+            with self._model_handle.lock:
+                result: WhisperResult = self.model.align(
+                    whisper_audio, text, language=language, original_split=True
+                )
+            event["segments"] = len(result.segments)
+
+        with measure_stage(self.metrics, "slicing", bytes_in=audio_size) as event:
+            audio_chunks = self._slice_segments(
+                audio, result, leading_silence_ms, trailing_silence_ms
+            )
+            event["chunks"] = len(audio_chunks)
+
+        # Process output depending on save_folder
+        if save_folder:
+            with measure_stage(self.metrics, "export", chunks=len(audio_chunks)) as event:
+                saved_files, stats = write_chunks(audio_chunks, save_folder, max_workers=self.export_workers)
+                event["bytes_out"] = stats["bytes"]
+                event["files"] = stats["files"]
+                event["files_per_s"] = stats["files_per_s"]
+                event["mb_per_s"] = stats["mb_per_s"]
+            return saved_files
+        else:
+            # Return list of dictionaries with audio, text and filename
+            return audio_chunks
+
+    def _slice_segments(
+        self,
+        audio_file: Union[str, bytes, DecodedAudio],
+        result: WhisperResult,
+        leading_silence_ms: int,
+        trailing_silence_ms: int,
+    ) -> List[AudioChunk]:
+        """
+        Cut audio into chunks at the aligned segment timestamps.
+
+        Args:
+            audio_file: Audio file, can be path, bytes or DecodedAudio
+            result: Alignment result
+            leading_silence_ms: Silence (ms) to add at the beginning of each chunk
+            trailing_silence_ms: Silence (ms) to add at the end of each chunk
 
+        Returns:
+            List[AudioChunk]: Chunks referencing the samples of the audio
+        """
         # Load original audio file
         audio = self._load_audio(audio_file)
 
-        # Create silence for use if needed
-        silence = AudioSegment.silent(duration=1)  # 1ms silence to multiply
+        # Compute sample-accurate boundaries of all segments at once
+        start_idx, end_idx = compute_boundaries(
+            [segment.start for segment in result.segments],
+            [segment.end for segment in result.segments],
+            audio.sample_rate,
+            len(audio.samples),
+        )
+        leading_samples = ms_to_samples(leading_silence_ms, audio.sample_rate)
+        trailing_samples = ms_to_samples(trailing_silence_ms, audio.sample_rate)
 
-        # Segment audio according to timestamps from segments
+        # Chunks reference the shared samples, audio bytes are built on export
         audio_chunks = []
-        for segment in result.segments:
-            # Get timestamp (already in milliseconds) and text from segment
-            start_time_ms = int(segment.start * 1000)  # Convert from seconds to milliseconds
-            end_time_ms = int(segment.end * 1000)  # Convert from seconds to milliseconds
+        for segment, start, end in zip(result.segments, start_idx.tolist(), end_idx.tolist()):
             subtitle = segment.text.strip()
-
-            # Cut audio according to timestamps
-            chunk = audio[start_time_ms:end_time_ms]
-
-            # Add silence if needed
-            if leading_silence_ms > 0:
-                leading_silence = silence * leading_silence_ms
-                chunk = leading_silence + chunk
-
-            if trailing_silence_ms > 0:
-                trailing_silence = silence * trailing_silence_ms
-                chunk = chunk + trailing_silence
+            chunk = AudioSlice(
+                audio.samples,
+                audio.sample_rate,
+                start,
+                end,
+                leading_samples,
+                trailing_samples,
+                sample_width=audio.sample_width,
+            )
 
             # Create random filename for each chunk
             random_name = "".join(
@@ -119,63 +188,26 @@ class TextAligner:
             )
             filename = f"{random_name}.wav"
 
-            audio_chunks.append({"audio": chunk, "text": subtitle, "filename": filename})
+            audio_chunks.append(AudioChunk(chunk, subtitle, filename))
 
-        # Process output depending on save_folder
-        if save_folder:
-            # Create directory if it doesn't exist
-            os.makedirs(save_folder, exist_ok=True)
-
-            saved_files = []
-
-            # Save each audio chunk and text
-            for chunk_data in audio_chunks:
-                chunk = chunk_data["audio"]
-                subtitle = chunk_data["text"]
-                filename = chunk_data["filename"]
-
-                # Save audio file
-                audio_path = os.path.join(save_folder, filename)
-                chunk.export(audio_path, format="wav")
-
-                # Save text file
-                text_name = filename.replace(".wav", ".txt")
-                text_path = os.path.join(save_folder, text_name)
-                with open(text_path, "w", encoding="utf-8") as f:
-                    f.write(subtitle)
-
-                # Add information to result
-                saved_files.append(
-                    {"filename": filename, "text": subtitle, "full_path": audio_path}
-                )
+        return audio_chunks
 
-            return saved_files
-        else:
-            # Return list of dictionaries with audio, text and filename
-            return audio_chunks
-
-    def _load_audio(self, audio_file: Union[str, BytesIO, bytes]) -> AudioSegment:
+    def _load_audio(self, audio_file: Union[str, BytesIO, bytes, DecodedAudio]) -> DecodedAudio:
         """
-        Load audio file from different formats into AudioSegment.
+        Load audio file from different formats into DecodedAudio.
 
         Args:
-            audio_file: Audio file, can be path, BytesIO or bytes
+            audio_file: Audio file, can be path, BytesIO, bytes or DecodedAudio
 
         Returns:
-            AudioSegment: AudioSegment object
+            DecodedAudio: Mono samples
             
         Raises:
             ValueError: If audio format is not supported
         """
-        if isinstance(audio_file, str):
-            # File path
-            return AudioSegment.from_file(audio_file)
-        elif isinstance(audio_file, BytesIO):
-            # BytesIO object
-            return AudioSegment.from_file(audio_file)
-        elif isinstance(audio_file, bytes):
-            # Bytes data
-            with BytesIO(audio_file) as audio_bytes:
-                return AudioSegment.from_file(audio_bytes)
-        else:
-            raise ValueError("Unsupported audio format")
+        if isinstance(audio_file, DecodedAudio):
+            # Already decoded samples
+            return audio_file
+        if isinstance(audio_file, BytesIO):
+            audio_file.seek(0)
+        return DecodedAudio.from_file(audio_file)
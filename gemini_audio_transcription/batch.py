@@ -0,0 +1,557 @@
+"""
+Batch job module.
+
+This module runs transcriptions as offline batch jobs: audio files are uploaded, packaged
+into one job, the job id is persisted in a state file and the job is polled until its
+results can be mapped back to the input files. Backends are pluggable, GeminiBatchBackend
+uses the Gemini Batch API and LocalBatchBackend processes jobs in-process without network.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from google.genai import errors
+
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+# Prefix of display names of batch uploads. Differs from the UploadRegistry prefix so the
+# orphan sweep never deletes audio of a job that is still running.
+BATCH_FILE_PREFIX = "gatb-"
+
+# Job states reported by backends
+BATCH_STATES = ("pending", "running", "succeeded", "failed", "cancelled", "expired")
+
+# States after which a job does not change anymore
+TERMINAL_STATES = ("succeeded", "failed", "cancelled", "expired")
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+
+
+def build_batch_request(
+    prompt: str, file_uri: str, mime_type: str, generation_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build GenerateContentRequest of one batch entry in REST JSON form.
+
+    Args:
+        prompt: Transcription prompt
+        file_uri: URI of the uploaded audio returned by the backend
+        mime_type: MIME type of the audio
+        generation_config: Generation config in REST JSON form
+
+    Returns:
+        Dict[str, Any]: Request
+    """
+    request = {
+        "contents": [
+            {
+                "role": "user",
+                "parts": [
+                    {"text": prompt},
+                    {"fileData": {"fileUri": file_uri, "mimeType": mime_type}},
+                ],
+            }
+        ]
+    }
+    if generation_config:
+        request["generationConfig"] = generation_config
+    return request
+
+
+def extract_response_text(response: Dict[str, Any]) -> str:
+    """
+    Get text of the first candidate of a GenerateContentResponse in REST JSON form.
+
+    Args:
+        response: Response of one batch entry
+
+    Returns:
+        str: Concatenated text parts, empty if there is none
+    """
+    candidates = response.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def save_batch_state(path: str, state: Dict[str, Any]) -> None:
+    """
+    Write batch state file atomically.
+
+    Args:
+        path: Path of the state file
+        state: Job id, model and input items of the batch
+    """
+    path = os.path.expanduser(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".batch-", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_batch_state(path: str) -> Dict[str, Any]:
+    """
+    Read batch state file.
+
+    Args:
+        path: Path of the state file
+
+    Returns:
+        Dict[str, Any]: Batch state
+
+    Raises:
+        FileNotFoundError: If the state file does not exist
+    """
+    with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class BatchBackend(ABC):
+    """
+    Interface of batch job backends.
+
+    Uploaded audio is referenced by the URI returned from upload_file. Jobs are identified
+    by the id returned from submit, which stays valid across processes. A backend missing
+    one of the abstract methods cannot be instantiated, so it fails before anything is
+    uploaded.
+    """
+
+    @abstractmethod
+    def upload_file(self, file_data: bytes, mime_type: str, display_name: str) -> str:
+        """
+        Upload audio referenced by batch requests.
+
+        Args:
+            file_data: Audio content as bytes
+            mime_type: MIME type of the audio
+            display_name: Display name of the file
+
+        Returns:
+            str: File URI used in requests and passed to delete_file
+        """
+
+    @abstractmethod
+    def delete_file(self, file_uri: str) -> None:
+        """
+        Delete uploaded audio.
+
+        Args:
+            file_uri: URI returned by upload_file
+        """
+
+    @abstractmethod
+    def submit(self, model: str, requests: List[Dict[str, Any]], display_name: str) -> str:
+        """
+        Submit batch job.
+
+        Args:
+            model: Gemini model name
+            requests: List of {"key": str, "request": GenerateContentRequest in REST JSON form}
+            display_name: Display name of the job
+
+        Returns:
+            str: Job id
+        """
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Get job state.
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            Dict[str, Any]: {"state": one of BATCH_STATES, "error": str or None}
+        """
+
+    @abstractmethod
+    def get_results(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get results of a finished job.
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {key: {"text": str or None, "error": str or None}}
+        """
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> None:
+        """
+        Cancel a job.
+
+        Args:
+            job_id: Job id returned by submit
+        """
+
+    def delete_job_inputs(self, job_id: str) -> None:
+        """
+        Delete request data uploaded for a job once it has finished. The audio referenced by
+        the requests is deleted separately with delete_file.
+
+        Args:
+            job_id: Job id returned by submit
+        """
+
+    def close(self) -> None:
+        """
+        Release connections held by the backend.
+        """
+
+    def __enter__(self) -> "BatchBackend":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class GeminiBatchBackend(BatchBackend):
+    """
+    Batch backend using the Gemini Batch API with file input.
+
+    Audio and the JSONL request file are uploaded with the Files API of the given client.
+    Batch endpoints are called over REST, since the pinned google-genai version supports
+    batch jobs only on Vertex AI. Close the backend, or use it as context manager, to
+    release its HTTP connections.
+    """
+
+    def __init__(
+        self,
+        client,
+        api_key: str,
+        base_url: str = DEFAULT_BASE_URL,
+        api_version: str = "v1beta",
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout_s: float = 60.0,
+    ):
+        """
+        Initialize GeminiBatchBackend.
+
+        Args:
+            client: genai.Client used to upload and delete files
+            api_key (str): Google Gemini API key of the client
+            base_url (str): Base URL of the Gemini API
+            api_version (str): API version
+            retry_policy (RetryPolicy, optional): Policy used to retry REST calls. If None, a default
+                RetryPolicy is used.
+            timeout_s (float): Timeout (s) of REST calls
+        """
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.api_version = api_version
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._http = httpx.Client(headers={"x-goog-api-key": api_key}, timeout=timeout_s)
+        # Request files of jobs submitted by this instance, other jobs are looked up on the API
+        self._input_files: Dict[str, str] = {}
+
+    def upload_file(self, file_data: bytes, mime_type: str, display_name: str) -> str:
+        uploaded = self.retry_policy.call(
+            self.client.files.upload,
+            file=BytesIO(file_data),
+            config={"mime_type": mime_type, "display_name": display_name[:512]},
+        )
+        return uploaded.uri
+
+    def delete_file(self, file_uri: str) -> None:
+        match = re.search(r"(files/[^/?:]+)", file_uri)
+        self.retry_policy.call(self.client.files.delete, name=match.group(1) if match else file_uri)
+
+    def submit(self, model: str, requests: List[Dict[str, Any]], display_name: str) -> str:
+        # Requests are passed as an uploaded JSONL file
+        lines = "\n".join(json.dumps(r, ensure_ascii=False) for r in requests)
+        input_file = self.retry_policy.call(
+            self.client.files.upload,
+            file=BytesIO(lines.encode("utf-8")),
+            config={"mime_type": "application/jsonl", "display_name": f"{display_name}-requests"[:512]},
+        )
+
+        model_name = model if model.startswith("models/") else f"models/{model}"
+        data = self._request(
+            "POST",
+            f"{model_name}:batchGenerateContent",
+            json={"batch": {"displayName": display_name, "inputConfig": {"fileName": input_file.name}}},
+        )
+        self._input_files[data["name"]] = input_file.name
+        return data["name"]
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        data = self._request("GET", job_id)
+        metadata = data.get("metadata") or {}
+        state = metadata.get("state") or data.get("state") or "STATE_UNSPECIFIED"
+        error = (data.get("error") or {}).get("message")
+        return {"state": self._normalize_state(state), "error": error}
+
+    def get_results(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        data = self._request("GET", job_id)
+        output = (data.get("response") or {}) or ((data.get("metadata") or {}).get("output") or {})
+        responses_file = output.get("responsesFile")
+        if not responses_file:
+            raise RuntimeError(f"Batch job {job_id} has no responses file")
+
+        content = self._download(responses_file)
+        results = {}
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            key = str(entry.get("key"))
+            if entry.get("error"):
+                results[key] = {"text": None, "error": entry["error"].get("message", str(entry["error"]))}
+            else:
+                results[key] = {"text": extract_response_text(entry.get("response") or {}), "error": None}
+        return results
+
+    def cancel(self, job_id: str) -> None:
+        self._request("POST", f"{job_id}:cancel")
+
+    def delete_job_inputs(self, job_id: str) -> None:
+        input_file = self._input_files.pop(job_id, None)
+        if input_file is None:
+            data = self._request("GET", job_id)
+            batch = data.get("metadata") or data
+            input_file = (batch.get("inputConfig") or {}).get("fileName")
+        if input_file:
+            self.delete_file(input_file)
+
+    def close(self) -> None:
+        self._http.close()
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Call a REST endpoint of the Gemini API with retries.
+
+        Args:
+            method: HTTP method
+            path: Resource path relative to the API version
+            **kwargs: Arguments of httpx.Client.request
+
+        Returns:
+            Dict[str, Any]: Decoded JSON response
+
+        Raises:
+            errors.APIError: If the API returns an error status
+        """
+        url = f"{self.base_url}/{self.api_version}/{path}"
+
+        def send() -> Dict[str, Any]:
+            response = self._http.request(method, url, **kwargs)
+            errors.APIError.raise_for_response(response)
+            return response.json() if response.content else {}
+
+        return self.retry_policy.call(send)
+
+    def _download(self, file_name: str) -> str:
+        """
+        Download content of a file created by the API.
+
+        Args:
+            file_name: File name, e.g. "files/abc"
+
+        Returns:
+            str: File content
+        """
+        url = f"{self.base_url}/download/{self.api_version}/{file_name}:download"
+
+        def send() -> str:
+            response = self._http.get(url, params={"alt": "media"})
+            errors.APIError.raise_for_response(response)
+            return response.text
+
+        return self.retry_policy.call(send)
+
+    def _normalize_state(self, state: str) -> str:
+        """
+        Map API job state to one of BATCH_STATES.
+
+        Args:
+            state: State reported by the API, e.g. "BATCH_STATE_RUNNING"
+
+        Returns:
+            str: Normalized state
+        """
+        name = re.sub(r"^(BATCH_STATE_|JOB_STATE_)", "", state).lower()
+        mapping = {
+            "partially_succeeded": "succeeded",
+            "queued": "pending",
+            "unspecified": "pending",
+            "state_unspecified": "pending",
+            "cancelling": "running",
+            "updating": "running",
+            "paused": "pending",
+        }
+        name = mapping.get(name, name)
+        return name if name in BATCH_STATES else "pending"
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Batch backend processing jobs in a background thread of this process, without network.
+
+    Jobs and files are stored in storage_dir, so a job submitted by one process can be
+    polled, and finished, by another. Each request is answered by handler.
+    """
+
+    def __init__(self, handler: Callable[[str, str, bytes, str], str], storage_dir: Optional[str] = None):
+        """
+        Initialize LocalBatchBackend.
+
+        Args:
+            handler: Function called with (model, prompt, audio bytes, MIME type) for each request,
+                returning the response text. Exceptions are reported as errors of that entry.
+            storage_dir (str, optional): Directory storing jobs and files. If None, a temporary
+                directory is used.
+        """
+        self.handler = handler
+        self.storage_dir = os.path.expanduser(storage_dir) if storage_dir else tempfile.mkdtemp(prefix="gatb-")
+        os.makedirs(os.path.join(self.storage_dir, "files"), exist_ok=True)
+        os.makedirs(os.path.join(self.storage_dir, "batches"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._workers: Dict[str, threading.Thread] = {}
+
+    def upload_file(self, file_data: bytes, mime_type: str, display_name: str) -> str:
+        file_uri = f"local-files/{uuid.uuid4().hex}"
+        with open(self._path(file_uri), "wb") as f:
+            f.write(file_data)
+        return file_uri
+
+    def delete_file(self, file_uri: str) -> None:
+        try:
+            os.remove(self._path(file_uri))
+        except FileNotFoundError:
+            pass
+
+    def submit(self, model: str, requests: List[Dict[str, Any]], display_name: str) -> str:
+        job_id = f"batches/{uuid.uuid4().hex}"
+        job = {
+            "model": model,
+            "display_name": display_name,
+            "state": "pending",
+            "error": None,
+            "requests": requests,
+            "results": {},
+        }
+        with self._lock:
+            self._write_job(job_id, job)
+        self._ensure_worker(job_id)
+        return job_id
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            job = self._read_job(job_id)
+        if job["state"] not in TERMINAL_STATES:
+            # Resume jobs whose worker belonged to another process
+            self._ensure_worker(job_id)
+        return {"state": job["state"], "error": job["error"]}
+
+    def get_results(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return self._read_job(job_id)["results"]
+
+    def cancel(self, job_id: str) -> None:
+        with self._lock:
+            job = self._read_job(job_id)
+            if job["state"] not in TERMINAL_STATES:
+                job["state"] = "cancelled"
+                self._write_job(job_id, job)
+
+    def cleanup(self) -> None:
+        """
+        Remove storage directory with all jobs and files.
+        """
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    def _ensure_worker(self, job_id: str) -> None:
+        """
+        Start processing thread of a job unless one is running.
+
+        Args:
+            job_id: Job id
+        """
+        with self._lock:
+            worker = self._workers.get(job_id)
+            if worker is not None and worker.is_alive():
+                return
+            worker = threading.Thread(target=self._process, args=(job_id,), name="local-batch", daemon=True)
+            self._workers[job_id] = worker
+        worker.start()
+
+    def _process(self, job_id: str) -> None:
+        """
+        Answer pending requests of a job and store the results.
+
+        Args:
+            job_id: Job id
+        """
+        with self._lock:
+            job = self._read_job(job_id)
+            if job["state"] in TERMINAL_STATES:
+                return
+            job["state"] = "running"
+            self._write_job(job_id, job)
+
+        for entry in job["requests"]:
+            key = entry["key"]
+            if key in job["results"]:
+                continue
+            try:
+                parts = entry["request"]["contents"][0]["parts"]
+                prompt = "".join(p.get("text", "") for p in parts)
+                file_data = next(p["fileData"] for p in parts if "fileData" in p)
+                with open(self._path(file_data["fileUri"]), "rb") as f:
+                    audio = f.read()
+                result = {"text": self.handler(job["model"], prompt, audio, file_data["mimeType"]), "error": None}
+            except Exception as e:
+                result = {"text": None, "error": str(e)}
+
+            with self._lock:
+                job = self._read_job(job_id)
+                if job["state"] == "cancelled":
+                    return
+                job["results"][key] = result
+                self._write_job(job_id, job)
+
+        with self._lock:
+            job = self._read_job(job_id)
+            if job["state"] == "running":
+                job["state"] = "succeeded"
+                self._write_job(job_id, job)
+
+    def _path(self, name: str) -> str:
+        """
+        Get storage path of a file or job.
+
+        Args:
+            name: File URI or job id
+
+        Returns:
+            str: Path inside storage_dir
+        """
+        kind, identifier = name.split("/", 1)
+        directory = "files" if kind == "local-files" else "batches"
+        return os.path.join(self.storage_dir, directory, identifier)
+
+    def _read_job(self, job_id: str) -> Dict[str, Any]:
+        with open(self._path(job_id) + ".json", "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_job(self, job_id: str, job: Dict[str, Any]) -> None:
+        save_batch_state(self._path(job_id) + ".json", job)
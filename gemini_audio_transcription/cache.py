@@ -0,0 +1,179 @@
+"""
+Persistent transcription cache module.
+
+This module provides a content-addressed, on-disk cache of transcription results backed
+by SQLite, with size-based LRU eviction. The database runs in WAL mode so it can be
+shared by several threads and processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionCache:
+    """
+    Class for caching transcription results on disk.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024, timeout_s: float = 30.0):
+        """
+        Initialize TranscriptionCache.
+
+        Args:
+            path (str): Path of the SQLite database file, created if it does not exist
+            max_bytes (int): Maximum total size (bytes) of cached results before least recently
+                used entries are evicted
+            timeout_s (float): Time (s) to wait for a lock held by another process
+        """
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+    @staticmethod
+    def make_key(file_data: bytes, params: Dict[str, Any]) -> str:
+        """
+        Create cache key from audio content and request parameters.
+
+        Args:
+            file_data: Full audio content as bytes
+            params: Parameters affecting the result, e.g. model, prompt and generation config
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(file_data).digest())
+        digest.update(json.dumps(params, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached results and mark them as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            List[Dict[str, Any]], optional: Cached results, None if not cached
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """
+        Store results and evict least recently used entries if the cache is too large.
+
+        Args:
+            key: Cache key
+            results: Transcription results, must be JSON serializable
+        """
+        value = json.dumps(results, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from the cache.
+
+        Args:
+            key: Cache key
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get number of entries and total size of the cache.
+
+        Returns:
+            Dict[str, int]: {"entries": int, "bytes": int}
+        """
+        count, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {"entries": count, "bytes": total}
+
+    def _evict(self) -> None:
+        """
+        Delete least recently used entries until the total size is at most max_bytes.
+        """
+        conn = self._connect()
+        with conn:
+            # Take the write lock before reading the size so concurrent processes do not over-evict
+            conn.execute("BEGIN IMMEDIATE")
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            evicted = 0
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+
+        logger.debug(f"Evicted {evicted} entries from transcription cache")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get SQLite connection of the current thread.
+
+        Returns:
+            sqlite3.Connection: Connection to the cache database
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout_s, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,328 @@
+"""
+Aligned chunk module.
+
+This module provides the chunks returned by TextAligner. A chunk holds its sample range
+within the decoded audio of the whole file, so all chunks of a file share one sample array
+and audio bytes are only built when a chunk is exported.
+"""
+
+import threading
+import wave
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from io import BytesIO
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import numpy as np
+from pydub import AudioSegment
+
+from .decoded_audio import DecodedAudio, samples_to_pcm, samples_to_segment_pcm
+from .slicer import slice_samples
+
+# Number of slices whose raw data is kept after a pydub operation built it
+DATA_CACHE_SIZE = 4
+
+# Raw data of the most recently used slices by id, shared by all slices so its size is
+# bounded however many chunks are kept
+_data_cache: "OrderedDict[int, Tuple[weakref.ref, bytes]]" = OrderedDict()
+# Reentrant, as a weakref callback may drop an entry while the cache is being changed
+_data_cache_lock = threading.RLock()
+
+
+def _drop_cached_data(key: int, ref: weakref.ref) -> None:
+    """
+    Drop the cached raw data of a slice that was garbage collected.
+    """
+    with _data_cache_lock:
+        entry = _data_cache.get(key)
+        if entry is not None and entry[0] is ref:
+            del _data_cache[key]
+
+
+class AudioSlice(AudioSegment):
+    """
+    Lazy view of a sample range of mono audio, padded with silence.
+
+    An AudioSlice is an AudioSegment whose raw data is built from the shared samples
+    when it is needed, so code written for the former AudioSegment chunks keeps working.
+    Slicing, operators and effects return plain AudioSegment objects. Building the raw
+    data copies the chunk once; it is kept for the DATA_CACHE_SIZE most recently used
+    slices, so the reads of one operation and consecutive operations on a chunk share it.
+    WAV export writes from the shared samples without building it.
+    """
+
+    def __init__(
+        self,
+        source: np.ndarray,
+        sample_rate: int,
+        start_sample: int,
+        end_sample: int,
+        leading_samples: int = 0,
+        trailing_samples: int = 0,
+        sample_width: Optional[int] = None,
+    ):
+        """
+        Initialize AudioSlice.
+
+        Args:
+            source: One-dimensional samples of the whole file as held by DecodedAudio, shared
+                and not copied
+            sample_rate: Sample rate (Hz)
+            start_sample: Index of the first sample of the slice
+            end_sample: Index after the last sample of the slice
+            leading_samples: Number of silent samples before the slice
+            trailing_samples: Number of silent samples after the slice
+            sample_width: Sample width (bytes) of the source, see DecodedAudio
+        """
+        # AudioSegment.__init__ is not called, it would need the raw data up front
+        self.source = source
+        self.source_width = sample_width or (2 if source.dtype == np.int16 else 4)
+        self.start_sample = start_sample
+        self.end_sample = end_sample
+        self.leading_samples = leading_samples
+        self.trailing_samples = trailing_samples
+
+        # AudioSegment metadata, pydub holds 24-bit audio as 32-bit
+        self.sample_width = 4 if self.source_width == 3 else self.source_width
+        self.frame_rate = sample_rate
+        self.channels = 1
+        self.frame_width = self.sample_width
+
+    @property
+    def sample_rate(self) -> int:
+        """
+        Sample rate (Hz).
+        """
+        return self.frame_rate
+
+    @property
+    def _data(self) -> bytes:
+        # Raw data of AudioSegment. Slices are immutable, so cached data stays valid.
+        key = id(self)
+        with _data_cache_lock:
+            entry = _data_cache.get(key)
+            if entry is not None and entry[0]() is self:
+                _data_cache.move_to_end(key)
+                return entry[1]
+
+        data = self._build_data()
+        with _data_cache_lock:
+            _data_cache[key] = (weakref.ref(self, lambda ref, key=key: _drop_cached_data(key, ref)), data)
+            _data_cache.move_to_end(key)
+            while len(_data_cache) > DATA_CACHE_SIZE:
+                _data_cache.popitem(last=False)
+        return data
+
+    def _build_data(self) -> bytes:
+        """
+        Build the raw data of the slice with its padding, without a padded sample array.
+
+        Returns:
+            bytes: PCM data as AudioSegment holds it
+        """
+        pcm, sample_width = samples_to_segment_pcm(
+            self.source[self.start_sample : self.end_sample], self.source_width
+        )
+        return b"".join(
+            (bytes(self.leading_samples * sample_width), pcm, bytes(self.trailing_samples * sample_width))
+        )
+
+    def _spawn(self, data, overrides={}) -> AudioSegment:
+        # Results of operations hold their own data, so they are plain AudioSegments
+        template = AudioSegment(
+            data=b"", sample_width=self.sample_width, frame_rate=self.frame_rate, channels=self.channels
+        )
+        return template._spawn(data, overrides)
+
+    def frame_count(self, ms: Optional[float] = None) -> Union[int, float]:
+        """
+        Number of samples including the padding, or the number of samples of ms milliseconds.
+        """
+        if ms is not None:
+            return ms * (self.frame_rate / 1000.0)
+        return self.leading_samples + self.end_sample - self.start_sample + self.trailing_samples
+
+    @property
+    def duration_seconds(self) -> float:
+        """
+        Duration in seconds including the padding.
+        """
+        return self.frame_count() / self.frame_rate
+
+    @property
+    def samples(self) -> np.ndarray:
+        """
+        Samples of the slice, a view of the source if it is not padded.
+        """
+        return slice_samples(
+            self.source,
+            np.array([self.start_sample]),
+            np.array([self.end_sample]),
+            self.leading_samples,
+            self.trailing_samples,
+        )[0]
+
+    def to_decoded(self) -> DecodedAudio:
+        """
+        Get the slice as DecodedAudio.
+
+        Returns:
+            DecodedAudio: Samples of the slice
+        """
+        return DecodedAudio(self.samples, self.frame_rate, sample_width=self.source_width)
+
+    def to_segment(self) -> AudioSegment:
+        """
+        Get the slice as plain AudioSegment.
+
+        Returns:
+            AudioSegment: Copy of the slice
+        """
+        return self.to_decoded().to_segment()
+
+    def write_wav(self, f: Union[str, BinaryIO]) -> None:
+        """
+        Write the slice as PCM WAV of the source sample width.
+
+        The padding and the source range are written one after the other, so no padded
+        copy of the samples is built.
+
+        Args:
+            f: Path or binary file object to write to
+        """
+        with wave.open(f, "wb") as wav_file:
+            wav_file.setnchannels(self.channels)
+            wav_file.setsampwidth(self.source_width)
+            wav_file.setframerate(self.frame_rate)
+            wav_file.setnframes(self.frame_count())
+            if self.leading_samples:
+                wav_file.writeframesraw(bytes(self.leading_samples * self.source_width))
+            wav_file.writeframesraw(
+                samples_to_pcm(self.source[self.start_sample : self.end_sample], self.source_width)
+            )
+            if self.trailing_samples:
+                wav_file.writeframesraw(bytes(self.trailing_samples * self.source_width))
+
+    def to_wav(self) -> bytes:
+        """
+        Get the slice as PCM WAV file content.
+
+        Returns:
+            bytes: WAV file content
+        """
+        buffer = BytesIO()
+        self.write_wav(buffer)
+        return buffer.getvalue()
+
+    def export(self, out_f: Optional[Union[str, BinaryIO]] = None, format: str = "wav", **kwargs) -> BinaryIO:
+        """
+        Export the slice like AudioSegment.export.
+
+        WAV is written directly, other formats are encoded by pydub.
+
+        Args:
+            out_f: Path or binary file object to write to. If None, a BytesIO is returned.
+            format: Output format
+            **kwargs: Options passed to AudioSegment.export for formats other than WAV
+
+        Returns:
+            BinaryIO: File object written to, at position 0
+        """
+        if format != "wav" or kwargs:
+            return self.to_segment().export(out_f, format=format, **kwargs)
+
+        if out_f is None:
+            out_f = BytesIO()
+        elif isinstance(out_f, str):
+            out_f = open(out_f, "wb+")
+        self.write_wav(out_f)
+        out_f.seek(0)
+        return out_f
+
+    def __repr__(self) -> str:
+        return (
+            f"AudioSlice(start_sample={self.start_sample}, end_sample={self.end_sample}, "
+            f"sample_rate={self.frame_rate}, duration_seconds={self.duration_seconds:.3f})"
+        )
+
+
+class AudioChunk(Mapping):
+    """
+    Aligned chunk of audio with its text.
+
+    A chunk is a read-only mapping with the keys "audio" (AudioSlice), "text" and
+    "filename", like the dicts returned before.
+    """
+
+    KEYS = ("audio", "text", "filename")
+
+    def __init__(self, audio: AudioSlice, text: str, filename: str):
+        """
+        Initialize AudioChunk.
+
+        Args:
+            audio: Audio of the chunk
+            text: Aligned text
+            filename: File name the chunk is saved as
+        """
+        self.audio = audio
+        self.text = text
+        self.filename = filename
+
+    @property
+    def start_sample(self) -> int:
+        """
+        Index of the first sample of the chunk in the source audio.
+        """
+        return self.audio.start_sample
+
+    @property
+    def end_sample(self) -> int:
+        """
+        Index after the last sample of the chunk in the source audio.
+        """
+        return self.audio.end_sample
+
+    @property
+    def start_s(self) -> float:
+        """
+        Start time (s) of the chunk in the source audio.
+        """
+        return self.audio.start_sample / self.audio.sample_rate
+
+    @property
+    def end_s(self) -> float:
+        """
+        End time (s) of the chunk in the source audio.
+        """
+        return self.audio.end_sample / self.audio.sample_rate
+
+    def to_wav(self) -> bytes:
+        """
+        Get the audio as PCM WAV file content.
+
+        Returns:
+            bytes: WAV file content
+        """
+        return self.audio.to_wav()
+
+    def export(self, out_f: Optional[Union[str, BinaryIO]] = None, format: str = "wav", **kwargs) -> BinaryIO:
+        """
+        Export the audio, see AudioSlice.export.
+        """
+        return self.audio.export(out_f, format=format, **kwargs)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"AudioChunk(text={self.text!r}, filename={self.filename!r}, audio={self.audio!r})"
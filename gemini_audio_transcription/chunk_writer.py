@@ -0,0 +1,118 @@
+"""
+Chunk writer module.
+
+This module saves aligned chunks as WAV files with a text file next to each. WAV headers
+and PCM samples are written directly from the shared sample array by a pool of threads,
+and text files are written in batches, one task per batch.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _write_wav(chunk, path: str) -> int:
+    """
+    Write the audio of a chunk as WAV file.
+
+    Args:
+        chunk: AudioChunk to write
+        path: Path of the WAV file
+
+    Returns:
+        int: Number of bytes written
+    """
+    with open(path, "wb") as f:
+        chunk["audio"].write_wav(f)
+        return f.tell()
+
+
+def _write_texts(items: Sequence[Tuple[str, str]]) -> int:
+    """
+    Write a batch of text files.
+
+    Args:
+        items: (path, text) of each file
+
+    Returns:
+        int: Number of bytes written
+    """
+    written = 0
+    for path, text in items:
+        data = text.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        written += len(data)
+    return written
+
+
+def write_chunks(
+    chunks: Sequence[Any],
+    save_folder: str,
+    max_workers: int = 8,
+    text_batch_size: int = 256,
+) -> Tuple[List[Dict[str, str]], Dict[str, float]]:
+    """
+    Save chunks as WAV files with a text file of the same name next to each.
+
+    Args:
+        chunks: AudioChunk objects to save
+        save_folder: Folder to save audio chunks and text, created if missing
+        max_workers: Number of threads writing files
+        text_batch_size: Number of text files written by one task
+
+    Returns:
+        Tuple[List[Dict[str, str]], Dict[str, float]]: One {"filename": str, "text": str, "full_path": str}
+            per chunk in input order, and {"files": int, "bytes": int, "duration_s": float,
+            "files_per_s": float, "mb_per_s": float} of the whole write
+
+    Raises:
+        ValueError: If max_workers or text_batch_size is not positive
+        OSError: If a file cannot be written
+    """
+    if max_workers <= 0:
+        raise ValueError("max_workers must be positive")
+    if text_batch_size <= 0:
+        raise ValueError("text_batch_size must be positive")
+
+    start = time.perf_counter()
+    os.makedirs(save_folder, exist_ok=True)
+
+    saved_files = []
+    text_items = []
+    for chunk in chunks:
+        filename = chunk["filename"]
+        audio_path = os.path.join(save_folder, filename)
+        text_path = os.path.join(save_folder, f"{os.path.splitext(filename)[0]}.txt")
+        saved_files.append({"filename": filename, "text": chunk["text"], "full_path": audio_path})
+        text_items.append((text_path, chunk["text"]))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chunk-writer") as executor:
+        wav_futures = [
+            executor.submit(_write_wav, chunk, saved["full_path"]) for chunk, saved in zip(chunks, saved_files)
+        ]
+        text_futures = [
+            executor.submit(_write_texts, text_items[i : i + text_batch_size])
+            for i in range(0, len(text_items), text_batch_size)
+        ]
+        # result() re-raises the first write error
+        written = sum(future.result() for future in wav_futures + text_futures)
+
+    duration_s = time.perf_counter() - start
+    files = len(saved_files) + len(text_items)
+    stats = {
+        "files": files,
+        "bytes": written,
+        "duration_s": duration_s,
+        "files_per_s": files / duration_s if duration_s > 0 else 0.0,
+        "mb_per_s": written / 1e6 / duration_s if duration_s > 0 else 0.0,
+    }
+    logger.info(
+        f"Wrote {files} files ({written / 1e6:.1f} MB) to {save_folder} in {duration_s:.2f} s: "
+        f"{stats['files_per_s']:.0f} files/s, {stats['mb_per_s']:.1f} MB/s"
+    )
+    return saved_files, stats
@@ -0,0 +1,65 @@
+"""
+Concurrency helpers shared by the batch APIs.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+
+def iter_completed(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 4,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run func over items in a thread pool and yield results as they complete.
+
+    At most max_workers items are in flight at any time and items are pulled from the
+    iterable lazily, so very large or unbounded iterables can be processed. Errors are
+    collected per item instead of aborting the whole batch.
+
+    Args:
+        func: Function called with each item
+        items: Iterable of inputs
+        max_workers: Maximum number of items processed at the same time
+
+    Yields:
+        Dict[str, Any]: {"index": int, "input": Any, "results": Any, "error": Optional[Exception]}
+
+    Raises:
+        ValueError: If max_workers is not positive
+    """
+    if max_workers <= 0:
+        raise ValueError("max_workers must be positive")
+
+    iterator = enumerate(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit_next() -> bool:
+            # Pull next item from the iterable and submit it
+            try:
+                index, item = next(iterator)
+            except StopIteration:
+                return False
+            pending[executor.submit(func, item)] = (index, item)
+            return True
+
+        # Fill the pool
+        for _ in range(max_workers):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, item = pending.pop(future)
+                error = future.exception()
+                yield {
+                    "index": index,
+                    "input": item,
+                    "results": None if error else future.result(),
+                    "error": error,
+                }
+                # Keep the pool full
+                submit_next()
@@ -0,0 +1,311 @@
+"""
+Decoded audio module.
+
+This module decodes an audio file once into mono samples held in a NumPy array, so the
+encoder, the whisper aligner and the slicer of one pipeline run share the samples instead
+of each decoding the file again. Samples keep the sample width of the source; they are only
+converted to float for whisper.
+"""
+
+import io
+import os
+import wave
+from io import BytesIO
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from pydub import AudioSegment
+
+from .encoder import INPUT_FORMATS
+from .mime import SNIFF_BYTES, sniff_audio_mime
+
+# Sample rate whisper models expect
+WHISPER_SAMPLE_RATE = 16000
+
+# Sample widths (bytes) held by DecodedAudio, 8-bit audio is widened to 16-bit without loss
+SAMPLE_DTYPES = {2: np.int16, 3: np.int32, 4: np.int32}
+
+
+def pcm_to_samples(data: bytes, sample_width: int) -> np.ndarray:
+    """
+    Convert little-endian signed PCM to samples.
+
+    Args:
+        data: PCM data, e.g. AudioSegment.raw_data or WAV frames
+        sample_width: Sample width (bytes) of data, 2, 3 or 4
+
+    Returns:
+        np.ndarray: New int16 array for 16-bit data, int32 otherwise. 24-bit samples keep their
+            24-bit range.
+    """
+    if sample_width == 3:
+        # Sign-extend each 3-byte sample into the upper bytes of an int32
+        raw = np.frombuffer(data, dtype=np.uint8)[: len(data) // 3 * 3].reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        return padded.view("<i4").reshape(-1) >> 8
+    return np.frombuffer(data, dtype=f"<i{sample_width}").astype(SAMPLE_DTYPES[sample_width])
+
+
+def samples_to_pcm(samples: np.ndarray, sample_width: int) -> bytes:
+    """
+    Convert samples to little-endian signed PCM.
+
+    Args:
+        samples: Samples as returned by pcm_to_samples
+        sample_width: Sample width (bytes) of the PCM data, 2, 3 or 4
+
+    Returns:
+        bytes: PCM data
+    """
+    if sample_width == 3:
+        return samples.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return samples.astype(f"<i{sample_width}", copy=False).tobytes()
+
+
+def samples_to_segment_pcm(samples: np.ndarray, sample_width: int) -> Tuple[bytes, int]:
+    """
+    Convert samples to PCM data as AudioSegment holds it.
+
+    pydub holds 24-bit audio as 32-bit. The samples are shifted here, since pydub's own
+    conversion pads negative samples wrongly.
+
+    Args:
+        samples: Samples as returned by pcm_to_samples
+        sample_width: Sample width (bytes) of the samples, 2, 3 or 4
+
+    Returns:
+        Tuple[bytes, int]: PCM data and its sample width, 4 for 24-bit samples
+    """
+    if sample_width == 3:
+        return samples_to_pcm(samples << 8, 4), 4
+    return samples_to_pcm(samples, sample_width), sample_width
+
+
+class DecodedAudio:
+    """
+    Mono audio as integer samples with their sample rate and sample width.
+
+    Samples are int16 for 16-bit audio and int32 for 24- and 32-bit audio, so no precision
+    of the source is lost. Instances are treated as immutable, conversions return new
+    objects or cached values.
+    """
+
+    channels = 1
+
+    def __init__(
+        self,
+        samples: np.ndarray,
+        sample_rate: int,
+        name: Optional[str] = None,
+        sample_width: Optional[int] = None,
+    ):
+        """
+        Initialize DecodedAudio.
+
+        Args:
+            samples: One-dimensional int16 or int32 array of mono samples
+            sample_rate: Sample rate (Hz)
+            name: File name of the source, used to name derived files
+            sample_width: Sample width (bytes) of the audio. Defaults to 2 for int16 and 4 for
+                int32 samples; 3 means int32 samples in the 24-bit range.
+
+        Raises:
+            ValueError: If samples is not a one-dimensional array of the sample width's dtype
+        """
+        if sample_width is None:
+            sample_width = 2 if samples.dtype == np.int16 else 4
+        if sample_width not in SAMPLE_DTYPES:
+            raise ValueError("sample_width must be 2, 3 or 4")
+        if samples.ndim != 1 or samples.dtype != SAMPLE_DTYPES[sample_width]:
+            raise ValueError(
+                f"samples must be a one-dimensional {np.dtype(SAMPLE_DTYPES[sample_width]).name} array "
+                f"for sample width {sample_width}"
+            )
+
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.name = name
+        self._wav_bytes: Optional[bytes] = None
+
+    @classmethod
+    def from_file(cls, audio_file: Union[str, BytesIO, bytes], name: Optional[str] = None) -> "DecodedAudio":
+        """
+        Decode an audio file and mix it down to mono samples of the source sample width.
+
+        PCM WAV is read with the wave module, other formats are decoded once by ffmpeg.
+
+        Args:
+            audio_file: Path to audio file, BytesIO object or bytes
+            name: File name of the source. If None, it is taken from the path or BytesIO name.
+
+        Returns:
+            DecodedAudio: Decoded audio
+
+        Raises:
+            ValueError: If audio format is not supported
+        """
+        if isinstance(audio_file, str):
+            name = name or os.path.basename(audio_file)
+            with open(audio_file, "rb") as f:
+                data = f.read()
+        elif isinstance(audio_file, BytesIO):
+            name = name or getattr(audio_file, "name", None)
+            data = audio_file.getvalue()
+        elif isinstance(audio_file, bytes):
+            data = audio_file
+        else:
+            raise ValueError("Unsupported audio format")
+
+        decoded = cls._from_pcm_wav(data, name)
+        if decoded is not None:
+            return decoded
+
+        # A format hint spares ffmpeg from probing the container
+        input_format = INPUT_FORMATS.get(sniff_audio_mime(data[:SNIFF_BYTES]))
+        return cls.from_segment(AudioSegment.from_file(BytesIO(data), format=input_format), name=name)
+
+    @classmethod
+    def from_segment(cls, segment: AudioSegment, name: Optional[str] = None) -> "DecodedAudio":
+        """
+        Create decoded audio from an AudioSegment.
+
+        Args:
+            segment: Decoded audio
+            name: File name of the source
+
+        Returns:
+            DecodedAudio: Mono copy of the segment, 8-bit audio is widened to 16-bit
+        """
+        if segment.channels > 1:
+            segment = segment.set_channels(1)
+        if segment.sample_width not in SAMPLE_DTYPES:
+            segment = segment.set_sample_width(2)
+        samples = pcm_to_samples(segment.raw_data, segment.sample_width)
+        return cls(samples, segment.frame_rate, name=name, sample_width=segment.sample_width)
+
+    @classmethod
+    def _from_pcm_wav(cls, data: bytes, name: Optional[str]) -> Optional["DecodedAudio"]:
+        """
+        Read 16-, 24- or 32-bit PCM WAV without ffmpeg.
+
+        Args:
+            data: File content
+            name: File name of the source
+
+        Returns:
+            DecodedAudio, optional: Decoded audio, None if data is not PCM WAV of these widths
+        """
+        if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+            return None
+        try:
+            with wave.open(io.BytesIO(data)) as wav_file:
+                sample_width = wav_file.getsampwidth()
+                if sample_width not in SAMPLE_DTYPES or wav_file.getcomptype() != "NONE":
+                    return None
+                channels = wav_file.getnchannels()
+                sample_rate = wav_file.getframerate()
+                frames = wav_file.readframes(wav_file.getnframes())
+        except (wave.Error, EOFError):
+            return None
+
+        samples = pcm_to_samples(frames, sample_width)
+        if channels > 1:
+            # Average channels like pydub's set_channels(1)
+            samples = samples[: len(samples) // channels * channels].reshape(-1, channels)
+            samples = samples.mean(axis=1).round()
+        return cls(samples.astype(SAMPLE_DTYPES[sample_width], copy=False), sample_rate, name=name, sample_width=sample_width)
+
+    @property
+    def duration_s(self) -> float:
+        """
+        Duration in seconds.
+        """
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the samples in bytes.
+        """
+        return self.samples.nbytes
+
+    def to_segment(self) -> AudioSegment:
+        """
+        Get the audio as AudioSegment.
+
+        Returns:
+            AudioSegment: Mono segment of the same sample width. 24-bit audio is returned as
+                32-bit, like pydub holds it, with every sample value kept.
+        """
+        data, sample_width = samples_to_segment_pcm(self.samples, self.sample_width)
+        return AudioSegment(
+            data=data,
+            sample_width=sample_width,
+            frame_rate=self.sample_rate,
+            channels=self.channels,
+        )
+
+    def to_wav_bytes(self) -> bytes:
+        """
+        Get the audio as PCM WAV file content of the same sample width.
+
+        Returns:
+            bytes: WAV file content, built once and reused
+        """
+        if self._wav_bytes is None:
+            buffer = BytesIO()
+            with wave.open(buffer, "wb") as wav_file:
+                wav_file.setnchannels(self.channels)
+                wav_file.setsampwidth(self.sample_width)
+                wav_file.setframerate(self.sample_rate)
+                wav_file.writeframes(samples_to_pcm(self.samples, self.sample_width))
+            self._wav_bytes = buffer.getvalue()
+        return self._wav_bytes
+
+    def clear_cache(self) -> None:
+        """
+        Drop the cached WAV file content, e.g. once it has been uploaded.
+        """
+        self._wav_bytes = None
+
+    def to_wav_buffer(self) -> BytesIO:
+        """
+        Get the audio as named WAV buffer.
+
+        Returns:
+            BytesIO: Buffer at position 0, named after the source with a .wav extension
+        """
+        buffer = BytesIO(self.to_wav_bytes())
+        buffer.name = self.get_wav_name()
+        return buffer
+
+    def get_wav_name(self) -> Optional[str]:
+        """
+        Get name of WAV files derived from this audio.
+
+        Returns:
+            str, optional: Source name with a .wav extension, None if the source has no name
+        """
+        if not self.name:
+            return None
+        return f"{os.path.splitext(self.name)[0]}.wav"
+
+    def to_float32(self, sample_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+        """
+        Get float samples in [-1, 1] at a sample rate, e.g. as whisper input.
+
+        This is the only conversion that drops precision of 24- and 32-bit audio.
+
+        Args:
+            sample_rate: Sample rate (Hz) of the returned samples
+
+        Returns:
+            np.ndarray: float32 samples
+        """
+        samples, sample_width = self.samples, self.sample_width
+        if self.sample_rate != sample_rate:
+            resampled = self.to_segment().set_frame_rate(sample_rate)
+            samples, sample_width = pcm_to_samples(resampled.raw_data, resampled.sample_width), resampled.sample_width
+        return samples.astype(np.float32) / float(2 ** (8 * sample_width - 1))
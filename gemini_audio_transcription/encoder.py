@@ -0,0 +1,185 @@
+"""
+Pre-upload audio encoding module.
+
+This module re-encodes audio to compact mono audio at a speech-appropriate sample rate
+before it is sent to Gemini, choosing the smallest of several formats accepted by the API.
+"""
+
+import logging
+from io import BytesIO
+from typing import Any, Dict, Optional, Sequence
+
+from pydub import AudioSegment
+
+logger = logging.getLogger(__name__)
+
+# Output formats accepted by Gemini, as pydub export arguments and the MIME type sent to the API
+OUTPUT_FORMATS = {
+    "opus": {"format": "ogg", "codec": "libopus", "mime_type": "audio/ogg", "extension": "ogg"},
+    "flac": {"format": "flac", "codec": None, "mime_type": "audio/flac", "extension": "flac"},
+    "wav": {"format": "wav", "codec": None, "mime_type": "audio/wav", "extension": "wav"},
+}
+
+# Input MIME types that Gemini accepts as they are
+ACCEPTED_MIME_TYPES = (
+    "audio/wav",
+    "audio/mpeg",
+    "audio/aiff",
+    "audio/aac",
+    "audio/ogg",
+    "audio/flac",
+)
+
+# pydub format names of input MIME types, WAV is decoded without ffmpeg
+INPUT_FORMATS = {
+    "audio/wav": "wav",
+    "audio/mpeg": "mp3",
+    "audio/aiff": "aiff",
+    "audio/aac": "aac",
+    "audio/ogg": "ogg",
+    "audio/flac": "flac",
+}
+
+
+class AudioEncoder:
+    """
+    Class for encoding audio to the smallest mono format accepted by Gemini before upload.
+
+    Every format in formats is tried and the smallest output wins. Formats that cannot be
+    encoded, for example because ffmpeg lacks the codec, are skipped. The original audio is
+    kept if it is already accepted by Gemini and smaller than every encoded version.
+    """
+
+    def __init__(
+        self,
+        formats: Sequence[str] = ("opus", "flac"),
+        sample_rate: int = 16000,
+        bitrate: str = "32k",
+    ):
+        """
+        Initialize AudioEncoder.
+
+        Args:
+            formats (Sequence[str]): Candidate output formats, any of "opus", "flac" and "wav"
+            sample_rate (int): Target sample rate (Hz), audio with a lower rate is not upsampled
+            bitrate (str): Bitrate of lossy formats, e.g. "32k"
+
+        Raises:
+            ValueError: If a format is not supported or no format is given
+        """
+        if not formats:
+            raise ValueError("At least one output format is required")
+        unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unsupported output formats: {unknown}, expected any of {list(OUTPUT_FORMATS)}")
+
+        self.formats = tuple(formats)
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate
+
+    def get_params(self) -> Dict[str, Any]:
+        """
+        Get parameters that affect the encoded audio, used for caching.
+
+        Returns:
+            Dict[str, Any]: Encoder parameters
+        """
+        return {"formats": list(self.formats), "sample_rate": self.sample_rate, "bitrate": self.bitrate}
+
+    def encode(self, file_data: bytes, mime_type: str, decoded=None) -> Optional[Dict[str, Any]]:
+        """
+        Encode audio to the smallest candidate format.
+
+        Args:
+            file_data: Audio content as bytes
+            mime_type: MIME type of the audio
+            decoded (DecodedAudio, optional): Already decoded samples of file_data, used instead of
+                decoding file_data again
+
+        Returns:
+            Dict[str, Any], optional: {"data": bytes, "format": str, "mime_type": str, "extension": str,
+                "duration_s": float, "original_bytes": int, "encoded_bytes": int, "bytes_saved": int},
+                None if the original audio should be sent as it is
+
+        Raises:
+            ValueError: If the audio cannot be decoded
+        """
+        if decoded is not None:
+            audio = decoded.to_segment()
+        else:
+            try:
+                audio = AudioSegment.from_file(BytesIO(file_data), format=INPUT_FORMATS.get(mime_type))
+            except Exception as e:
+                raise ValueError(f"Cannot decode audio for encoding: {e}")
+
+        audio = self._to_speech_audio(audio)
+
+        best = None
+        for name in self.formats:
+            try:
+                data = self._export(audio, name)
+            except Exception as e:
+                logger.debug(f"Could not encode audio as {name}: {e}")
+                continue
+            if best is None or len(data) < len(best[1]):
+                best = (name, data)
+
+        if best is None:
+            logger.warning(f"Could not encode audio as any of {list(self.formats)}, sending original")
+            return None
+
+        name, data = best
+        if mime_type in ACCEPTED_MIME_TYPES and len(data) >= len(file_data):
+            logger.debug(f"Original audio ({len(file_data)} bytes) is smaller than {name} ({len(data)} bytes)")
+            return None
+
+        output_format = OUTPUT_FORMATS[name]
+        return {
+            "data": data,
+            "format": name,
+            "mime_type": output_format["mime_type"],
+            "extension": output_format["extension"],
+            "duration_s": audio.duration_seconds,
+            "original_bytes": len(file_data),
+            "encoded_bytes": len(data),
+            "bytes_saved": len(file_data) - len(data),
+        }
+
+    def _to_speech_audio(self, audio: AudioSegment) -> AudioSegment:
+        """
+        Convert audio to 16-bit mono at the target sample rate.
+
+        Args:
+            audio: Decoded audio
+
+        Returns:
+            AudioSegment: Converted audio
+        """
+        if audio.channels > 1:
+            audio = audio.set_channels(1)
+        if audio.frame_rate > self.sample_rate:
+            audio = audio.set_frame_rate(self.sample_rate)
+        if audio.sample_width != 2:
+            audio = audio.set_sample_width(2)
+        return audio
+
+    def _export(self, audio: AudioSegment, name: str) -> bytes:
+        """
+        Export audio in one output format.
+
+        Args:
+            audio: Converted audio
+            name: Output format name
+
+        Returns:
+            bytes: Encoded audio
+        """
+        output_format = OUTPUT_FORMATS[name]
+        kwargs = {"format": output_format["format"]}
+        if output_format["codec"]:
+            kwargs["codec"] = output_format["codec"]
+            kwargs["bitrate"] = self.bitrate
+
+        buffer = BytesIO()
+        audio.export(buffer, **kwargs)
+        return buffer.getvalue()
@@ -0,0 +1,335 @@
+"""
+Uploaded file lifecycle module.
+
+This module keeps track of the files uploaded to the Gemini Files API by this process
+and deletes them in a background janitor thread, so that several transcribers can
+safely share one API key.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import random
+import string
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+# Prefix of display names given to files uploaded by this library
+DEFAULT_PREFIX = "gat-"
+
+# Time of the last remote orphan listing per API key and prefix, shared by all registries
+# of the process so that registries of one key do not each list the same files
+_remote_sweeps: Dict[str, float] = {}
+_remote_sweeps_lock = threading.Lock()
+
+
+def _close_registry(registry_ref: "weakref.ref[UploadRegistry]") -> None:
+    """
+    Close a registry at interpreter exit unless it was already garbage collected.
+
+    Args:
+        registry_ref: Weak reference to the registry
+    """
+    registry = registry_ref()
+    if registry is not None:
+        registry.close()
+
+
+class UploadRegistry:
+    """
+    Class for tracking uploaded files and deleting them in the background.
+
+    Only files registered by this instance are deleted when released. Files carrying the
+    registry prefix that are older than orphan_ttl_s (for example left behind by a crashed
+    worker) are cleaned up by a periodic orphan sweep, which lists the remote files of an
+    API key at most once per interval across all registries of the process.
+
+    The janitor thread is started by the first registered upload and stopped by close,
+    which is also called at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str = DEFAULT_PREFIX,
+        orphan_ttl_s: float = 2 * 60 * 60,
+        orphan_sweep_interval_s: Optional[float] = 10 * 60,
+        batch_size: int = 32,
+        batch_wait_s: float = 0.5,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Initialize UploadRegistry.
+
+        Args:
+            client: genai.Client used to delete files
+            prefix (str): Prefix of display names given to uploaded files
+            orphan_ttl_s (float): Files with the prefix older than this are treated as orphans
+            orphan_sweep_interval_s (float, optional): Interval between orphan sweeps. If None, orphans
+                are only cleaned up when sweep_orphans is called explicitly.
+            batch_size (int): Maximum number of files deleted by the janitor in one batch
+            batch_wait_s (float): Time the janitor waits to collect more files into a batch
+            retry_policy (RetryPolicy, optional): Policy used to retry failed deletes. If None, deletes
+                are retried a few times with short delays.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.orphan_ttl_s = orphan_ttl_s
+        self.orphan_sweep_interval_s = orphan_sweep_interval_s
+        self.batch_size = batch_size
+        self.batch_wait_s = batch_wait_s
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=3, base_delay_s=0.5, max_delay_s=5)
+
+        # Unique owner id so display names never collide between processes
+        random_part = "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
+        self.owner_id = f"{os.getpid()}-{random_part}"
+
+        self._lock = threading.Lock()
+        self._tracked: Dict[str, float] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._closed = threading.Event()
+        self._last_sweep = time.monotonic()
+
+        self._janitor: Optional[threading.Thread] = None
+        self._janitor_lock = threading.Lock()
+
+        # A weak reference lets unused registries be garbage collected before exit
+        atexit.register(_close_registry, weakref.ref(self))
+
+    def __enter__(self) -> "UploadRegistry":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _start_janitor(self) -> None:
+        """
+        Start the janitor thread unless it is running or the registry is closed.
+        """
+        with self._janitor_lock:
+            if self._janitor is not None or self._closed.is_set():
+                return
+            # The thread only holds a weak reference, so it does not keep the registry alive
+            self._janitor = threading.Thread(
+                target=UploadRegistry._run_janitor_ref,
+                args=(weakref.ref(self), self._closed),
+                name="gemini-file-janitor",
+                daemon=True,
+            )
+            self._janitor.start()
+
+    def make_display_name(self, filename: str) -> str:
+        """
+        Create display name for a file uploaded through this registry.
+
+        Args:
+            filename: Original file name
+
+        Returns:
+            str: Display name carrying the registry prefix and owner id
+        """
+        return f"{self.prefix}{self.owner_id}-{filename}"[:512]
+
+    def register(self, uploaded_file) -> None:
+        """
+        Start tracking an uploaded file.
+
+        Args:
+            uploaded_file: File returned by the Files API
+        """
+        with self._lock:
+            self._tracked[uploaded_file.name] = time.monotonic()
+        self._start_janitor()
+
+    def release(self, name: str) -> None:
+        """
+        Schedule a tracked file for deletion by the janitor. Does not block.
+
+        Args:
+            name: Name of the uploaded file
+        """
+        with self._lock:
+            if self._tracked.pop(name, None) is None:
+                return
+        self._queue.put(name)
+        self._start_janitor()
+
+    def tracked_files(self) -> List[str]:
+        """
+        Get names of files that are uploaded and not yet released.
+
+        Returns:
+            List[str]: File names
+        """
+        with self._lock:
+            return list(self._tracked)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all released files have been deleted.
+
+        Args:
+            timeout: Maximum time (s) to wait, if None waits until done
+
+        Returns:
+            bool: True if all released files were processed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout: float = 10) -> None:
+        """
+        Release all tracked files and stop the janitor after pending deletes are done.
+
+        Args:
+            timeout: Maximum time (s) to wait for pending deletes
+        """
+        if self._closed.is_set():
+            return
+        for name in self.tracked_files():
+            self.release(name)
+        if self._janitor is not None:
+            self.flush(timeout)
+        self._closed.set()
+        if self._janitor is not None and self._janitor is not threading.current_thread():
+            self._janitor.join(timeout=1)
+
+    def sweep_orphans(self) -> int:
+        """
+        Delete orphaned files: tracked files and files with the registry prefix that are
+        older than orphan_ttl_s. Files uploaded by live transcribers are never touched as
+        long as a transcription takes less than orphan_ttl_s.
+
+        Returns:
+            int: Number of files scheduled for deletion
+        """
+        count = 0
+
+        # Tracked files that were never released
+        expired_before = time.monotonic() - self.orphan_ttl_s
+        with self._lock:
+            expired = [name for name, t in self._tracked.items() if t < expired_before]
+        for name in expired:
+            self.release(name)
+            count += 1
+
+        # Files left behind by other processes using the same prefix, listed by one registry per key
+        if not self._claim_remote_sweep():
+            if count:
+                logger.info(f"Scheduled {count} orphaned files for deletion")
+            return count
+        created_before = datetime.now(timezone.utc) - timedelta(seconds=self.orphan_ttl_s)
+        try:
+            for f in self.client.files.list():
+                display_name = getattr(f, "display_name", None) or ""
+                create_time = getattr(f, "create_time", None)
+                if not display_name.startswith(self.prefix) or create_time is None:
+                    continue
+                if create_time.tzinfo is None:
+                    create_time = create_time.replace(tzinfo=timezone.utc)
+                with self._lock:
+                    tracked = f.name in self._tracked
+                if create_time < created_before and not tracked:
+                    self._queue.put(f.name)
+                    count += 1
+        except Exception as e:
+            logger.warning(f"Error listing files for orphan sweep: {e}")
+
+        if count:
+            logger.info(f"Scheduled {count} orphaned files for deletion")
+            self._start_janitor()
+        return count
+
+    def _claim_remote_sweep(self) -> bool:
+        """
+        Check whether this registry should list the remote files now, and record the listing.
+
+        Returns:
+            bool: False if another registry of the same API key and prefix listed them within
+                orphan_sweep_interval_s
+        """
+        api_key = getattr(getattr(self.client, "_api_client", None), "api_key", None)
+        client_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest() if api_key else str(id(self.client))
+        sweep_key = f"{self.prefix}:{client_id}"
+        interval = self.orphan_sweep_interval_s or 0
+        now = time.monotonic()
+        with _remote_sweeps_lock:
+            last = _remote_sweeps.get(sweep_key)
+            if last is not None and now - last < interval:
+                return False
+            _remote_sweeps[sweep_key] = now
+        return True
+
+    @staticmethod
+    def _run_janitor_ref(registry_ref: "weakref.ref[UploadRegistry]", closed: threading.Event) -> None:
+        """
+        Run janitor cycles while the registry is alive and not closed.
+
+        Args:
+            registry_ref: Weak reference to the registry
+            closed: Closed event of the registry
+        """
+        while not closed.is_set():
+            registry = registry_ref()
+            if registry is None:
+                return
+            registry._run_janitor_cycle()
+            del registry
+
+    def _run_janitor_cycle(self) -> None:
+        """
+        Delete one batch of released files and run the orphan sweep when it is due.
+        """
+        batch = self._next_batch()
+        for name in batch:
+            try:
+                self.retry_policy.call(self.client.files.delete, name=name)
+                logger.debug(f"Deleted uploaded file: {name}")
+            except Exception as e:
+                logger.warning(f"Error deleting uploaded file {name}: {e}")
+            finally:
+                self._queue.task_done()
+
+        # Run orphan sweep periodically
+        if (
+            self.orphan_sweep_interval_s is not None
+            and time.monotonic() - self._last_sweep >= self.orphan_sweep_interval_s
+        ):
+            self._last_sweep = time.monotonic()
+            self.sweep_orphans()
+
+    def _next_batch(self) -> List[str]:
+        """
+        Collect up to batch_size released files, waiting at most batch_wait_s for more.
+
+        Returns:
+            List[str]: File names to delete
+        """
+        try:
+            batch = [self._queue.get(timeout=1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
@@ -0,0 +1,329 @@
+"""
+Hedged request module.
+
+This module tracks generation latency per model and, when a call has not returned within
+a chosen latency percentile, sends a duplicate call (optionally to a fallback model) and
+keeps whichever finishes first.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """
+    Class for deciding when and where to send hedged requests.
+
+    The hedge delay of a model is the given percentile of its recent successful latencies.
+    Until min_samples latencies are known, initial_delay_s is used, or no hedge is sent
+    if it is None. One policy can be shared by several transcribers and threads.
+
+    Threads cannot be interrupted, so a synchronous call that loses the race keeps running
+    until its response arrives. While max_outstanding of those calls are still running,
+    no further hedged requests are sent.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        window: int = 200,
+        initial_delay_s: Optional[float] = None,
+        min_delay_s: float = 1.0,
+        fallback_model: Optional[str] = None,
+        max_outstanding: int = 4,
+    ):
+        """
+        Initialize HedgePolicy.
+
+        Args:
+            percentile (float): Latency percentile (0-100) after which a hedged request is sent
+            min_samples (int): Number of latencies of a model needed before the percentile is used
+            window (int): Number of recent latencies kept per model
+            initial_delay_s (float, optional): Hedge delay (s) used before min_samples latencies are known.
+                If None, no hedged requests are sent until then.
+            min_delay_s (float): Lower bound (s) of the hedge delay
+            fallback_model (str, optional): Model receiving hedged requests. If None, the hedged request
+                goes to the same model.
+            max_outstanding (int): Maximum number of synchronous losing calls still running in the
+                background. No hedged request is sent while this many are running.
+
+        Raises:
+            ValueError: If percentile is not between 0 and 100 or max_outstanding is negative
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if max_outstanding < 0:
+            raise ValueError("max_outstanding must not be negative")
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.initial_delay_s = initial_delay_s
+        self.min_delay_s = min_delay_s
+        self.fallback_model = fallback_model
+        self.max_outstanding = max_outstanding
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._outstanding = 0
+
+    def record(self, model: str, latency_s: float) -> None:
+        """
+        Record latency of a successful call.
+
+        Args:
+            model: Gemini model name
+            latency_s: Latency in seconds
+        """
+        with self._lock:
+            samples = self._latencies.setdefault(model, deque(maxlen=self.window))
+            samples.append(latency_s)
+
+    def get_delay(self, model: str) -> Optional[float]:
+        """
+        Get time to wait for a call to the model before sending a hedged request.
+
+        Args:
+            model: Gemini model name
+
+        Returns:
+            float, optional: Delay in seconds, None if no hedged request should be sent
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+
+        if len(samples) < self.min_samples:
+            delay = self.initial_delay_s
+        else:
+            # Nearest-rank percentile
+            rank = max(1, math.ceil(self.percentile / 100 * len(samples)))
+            delay = samples[rank - 1]
+
+        return None if delay is None else max(self.min_delay_s, delay)
+
+    @property
+    def outstanding(self) -> int:
+        """
+        Number of synchronous losing calls still running in the background.
+        """
+        with self._lock:
+            return self._outstanding
+
+    def can_hedge(self) -> bool:
+        """
+        Check whether a hedged request may be sent.
+
+        Returns:
+            bool: False while max_outstanding losing calls are still running
+        """
+        with self._lock:
+            return self._outstanding < self.max_outstanding
+
+    def _track_outstanding(self, futures: Iterable[Future]) -> None:
+        """
+        Count calls that lost the race as outstanding until they finish.
+
+        Args:
+            futures: Futures of the calls that are still running
+        """
+
+        def finished(_future: Future) -> None:
+            with self._lock:
+                self._outstanding = max(0, self._outstanding - 1)
+
+        for future in futures:
+            with self._lock:
+                self._outstanding += 1
+            future.add_done_callback(finished)
+
+    def get_hedge_model(self, model: str) -> str:
+        """
+        Get model receiving the hedged request.
+
+        Args:
+            model: Model of the original request
+
+        Returns:
+            str: Model name
+        """
+        return self.fallback_model or model
+
+
+def _when_done(futures: Iterable[Future], callback: Callable[[], None]) -> None:
+    """
+    Call callback once all futures are done, right away if they already are.
+
+    Args:
+        futures: Futures to wait for
+        callback: Function called without arguments
+    """
+    running = [future for future in futures if not future.done()]
+    if not running:
+        callback()
+        return
+
+    lock = threading.Lock()
+    remaining = [len(running)]
+
+    def finished(_future: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+
+    for future in running:
+        future.add_done_callback(finished)
+
+
+def run_hedged(
+    func: Callable[[str], Any],
+    model: str,
+    policy: Optional[HedgePolicy],
+    on_hedge: Optional[Callable[[], Callable[[], None]]] = None,
+) -> Any:
+    """
+    Call func(model) and send a hedged call if it is slower than the policy's delay.
+
+    The first successful result is returned. A call that loses the race cannot be
+    interrupted in a thread, so it keeps running in the background and its result
+    is discarded. Losing calls count towards the policy's max_outstanding until they
+    finish.
+
+    Args:
+        func: Function called with the model name
+        model: Model of the original call
+        policy: Hedge policy, if None func is called once
+        on_hedge: Called when a hedged call is sent, e.g. to count it as in flight. Returns a
+            function that is called once both calls have finished, which can be after run_hedged
+            returned while the losing call still runs in the background.
+
+    Returns:
+        Any: Result of the first successful call
+
+    Raises:
+        Exception: Error of the original call if every call failed
+    """
+    if policy is None:
+        return func(model)
+
+    def timed_call(target_model: str) -> Any:
+        start = time.monotonic()
+        result = func(target_model)
+        policy.record(target_model, time.monotonic() - start)
+        return result
+
+    delay = policy.get_delay(model)
+    if delay is None:
+        return timed_call(model)
+
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gemini-hedge")
+    primary = executor.submit(timed_call, model)
+    futures = [primary]
+    hedge_end = None
+    try:
+        done, _ = wait([primary], timeout=delay)
+        pending = {primary}
+        if not done:
+            if policy.can_hedge():
+                hedge_model = policy.get_hedge_model(model)
+                logger.info(f"No response from {model} after {delay:.1f}s, sending hedged request to {hedge_model}")
+                if on_hedge is not None:
+                    hedge_end = on_hedge()
+                futures.append(executor.submit(timed_call, hedge_model))
+                pending.add(futures[-1])
+            else:
+                logger.info(f"No response from {model} after {delay:.1f}s, too many hedged calls outstanding")
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        logger.info("Hedged request finished first")
+                    return future.result()
+                if future is primary or error is None:
+                    error = future.exception()
+        raise error
+    finally:
+        # Do not wait for the losing call, it keeps counting until it finishes
+        executor.shutdown(wait=False, cancel_futures=True)
+        policy._track_outstanding([future for future in futures if not future.done()])
+        if hedge_end is not None:
+            _when_done(futures, hedge_end)
+
+
+async def run_hedged_async(
+    func: Callable[[str], Awaitable[Any]],
+    model: str,
+    policy: Optional[HedgePolicy],
+    on_hedge: Optional[Callable[[], Callable[[], None]]] = None,
+) -> Any:
+    """
+    Coroutine counterpart of run_hedged. The losing call is cancelled.
+
+    Args:
+        func: Coroutine function called with the model name
+        model: Model of the original call
+        policy: Hedge policy, if None func is called once
+        on_hedge: Called when a hedged call is sent. Returns a function that is called once the
+            race is over.
+
+    Returns:
+        Any: Result of the first successful call
+
+    Raises:
+        Exception: Error of the original call if every call failed
+    """
+    if policy is None:
+        return await func(model)
+
+    async def timed_call(target_model: str) -> Any:
+        start = time.monotonic()
+        result = await func(target_model)
+        policy.record(target_model, time.monotonic() - start)
+        return result
+
+    delay = policy.get_delay(model)
+    if delay is None:
+        return await timed_call(model)
+
+    primary = asyncio.ensure_future(timed_call(model))
+    pending = {primary}
+    hedge_end = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            hedge_model = policy.get_hedge_model(model)
+            logger.info(f"No response from {model} after {delay:.1f}s, sending hedged request to {hedge_model}")
+            if on_hedge is not None:
+                hedge_end = on_hedge()
+            pending.add(asyncio.ensure_future(timed_call(hedge_model)))
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        logger.info("Hedged request finished first")
+                    return task.result()
+                if task is primary or error is None:
+                    error = task.exception()
+        raise error
+    finally:
+        # Cancel the losing call, also when the caller is cancelled
+        for task in pending:
+            task.cancel()
+        if hedge_end is not None:
+            hedge_end()
@@ -0,0 +1,231 @@
+"""
+API key pool module.
+
+This module spreads Gemini requests over several API keys, so a batch can use their
+combined quota. Each key has its own client and upload registry, requests go to the key
+with the fewest requests in flight and keys that hit quota errors are benched for a while.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from google import genai
+from google.genai import errors
+
+from .file_manager import UploadRegistry
+
+logger = logging.getLogger(__name__)
+
+# Environment variable holding comma-separated API keys
+API_KEYS_ENV_VAR = "GOOGLE_API_KEYS"
+
+
+class PooledKey:
+    """
+    One API key of a pool with its client, upload registry and usage counters.
+    """
+
+    def __init__(self, label: str, api_key: str):
+        """
+        Initialize PooledKey.
+
+        Args:
+            label: Identifier of the key used in logs and usage reports, never the key itself
+            api_key: Google Gemini API key
+        """
+        self.label = label
+        self.api_key = api_key
+        self.client = genai.Client(api_key=api_key)
+        self.upload_registry = UploadRegistry(self.client)
+
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.quota_errors = 0
+        self.benched_until = 0.0
+
+    def get_masked_key(self) -> str:
+        """
+        Get API key with all but the last four characters hidden.
+
+        Returns:
+            str: Masked API key
+        """
+        return f"...{self.api_key[-4:]}"
+
+
+class APIKeyPool:
+    """
+    Class for balancing requests over several API keys by least-in-flight.
+
+    Files uploaded with one key cannot be read with another, so callers keep using the
+    key of their first attempt while it is healthy and only move when it is benched.
+    One pool can be shared by several transcribers and threads.
+    """
+
+    def __init__(self, api_keys: Sequence[str], bench_s: float = 60.0):
+        """
+        Initialize APIKeyPool.
+
+        Args:
+            api_keys (Sequence[str]): Google Gemini API keys, duplicates are ignored
+            bench_s (float): Time (s) a key is skipped after a quota error when the server
+                gives no retry hint
+
+        Raises:
+            ValueError: If no API key is given
+        """
+        unique_keys = list(dict.fromkeys(key.strip() for key in api_keys if key and key.strip()))
+        if not unique_keys:
+            raise ValueError("At least one API key is required")
+
+        self.bench_s = bench_s
+        self.keys = [PooledKey(f"key-{i}", key) for i, key in enumerate(unique_keys)]
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """
+        Close the upload registries of all keys, deleting their remaining uploaded files.
+        """
+        for key in self.keys:
+            key.upload_registry.close()
+
+    def __enter__(self) -> "APIKeyPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @classmethod
+    def from_env(cls, var: str = API_KEYS_ENV_VAR, **kwargs) -> "APIKeyPool":
+        """
+        Create pool from a comma-separated list of keys in an environment variable.
+
+        Args:
+            var: Name of the environment variable
+            **kwargs: Other arguments of APIKeyPool
+
+        Returns:
+            APIKeyPool: Pool of the keys
+
+        Raises:
+            ValueError: If the variable is not set or contains no key
+        """
+        value = os.environ.get(var, "")
+        if not value.strip():
+            raise ValueError(f"Environment variable {var} is not set")
+        return cls(value.split(","), **kwargs)
+
+    def acquire(self, preferred: Optional[PooledKey] = None) -> PooledKey:
+        """
+        Choose a key for one request and count it as in flight.
+
+        Args:
+            preferred: Key to keep using if it is not benched, e.g. the key a file was uploaded with
+
+        Returns:
+            PooledKey: Chosen key, release it when the request finishes
+        """
+        with self._lock:
+            now = time.monotonic()
+            if preferred is not None and preferred.benched_until <= now:
+                key = preferred
+            else:
+                available = [k for k in self.keys if k.benched_until <= now]
+                if available:
+                    # Ties go to the key with the fewest requests so far
+                    key = min(available, key=lambda k: (k.in_flight, k.requests))
+                else:
+                    # All keys are benched, use the one that recovers first
+                    key = min(self.keys, key=lambda k: k.benched_until)
+
+            key.in_flight += 1
+            key.requests += 1
+            return key
+
+    def add_request(self, key: PooledKey) -> None:
+        """
+        Count an additional request on an already chosen key as in flight, e.g. a hedged
+        duplicate. Release it like a request returned by acquire.
+
+        Args:
+            key: Key the request is sent with
+        """
+        with self._lock:
+            key.in_flight += 1
+            key.requests += 1
+
+    def release(
+        self,
+        key: PooledKey,
+        error: Optional[Exception] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """
+        Mark a request as finished and bench the key if it hit its quota.
+
+        Args:
+            key: Key returned by acquire
+            error: Error raised by the request, if any
+            retry_after: Delay (s) requested by the server, used as bench time for quota errors
+        """
+        with self._lock:
+            key.in_flight = max(0, key.in_flight - 1)
+            if error is None:
+                return
+
+            key.errors += 1
+            if self.is_quota_error(error):
+                key.quota_errors += 1
+                bench_s = retry_after if retry_after is not None else self.bench_s
+                key.benched_until = max(key.benched_until, time.monotonic() + bench_s)
+                logger.warning(f"API key {key.label} hit its quota, benched for {bench_s:.1f}s")
+
+    def has_available_key(self) -> bool:
+        """
+        Check whether any key is not benched.
+
+        Returns:
+            bool: True if a key can take a request right away
+        """
+        with self._lock:
+            now = time.monotonic()
+            return any(k.benched_until <= now for k in self.keys)
+
+    def is_quota_error(self, error: Exception) -> bool:
+        """
+        Check whether an error means the key ran out of quota.
+
+        Args:
+            error: Error raised by the request
+
+        Returns:
+            bool: True for rate limit and quota errors
+        """
+        return isinstance(error, errors.APIError) and error.code == 429
+
+    def usage(self) -> List[Dict[str, Any]]:
+        """
+        Get usage of every key.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per key with "key" (label), "masked_key", "requests",
+                "in_flight", "errors", "quota_errors" and "benched_for_s"
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "key": k.label,
+                    "masked_key": k.get_masked_key(),
+                    "requests": k.requests,
+                    "in_flight": k.in_flight,
+                    "errors": k.errors,
+                    "quota_errors": k.quota_errors,
+                    "benched_for_s": max(0.0, k.benched_until - now),
+                }
+                for k in self.keys
+            ]
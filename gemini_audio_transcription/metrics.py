@@ -0,0 +1,242 @@
+"""
+Pipeline instrumentation module.
+
+This module emits one structured event per pipeline stage (mono conversion, MIME detection,
+encoding, upload, generation, parse, alignment, slicing and export) to a user callback,
+and provides a collector that aggregates events and exports them as JSON or in the
+Prometheus text format.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stages reported by the library, in pipeline order
+STAGES = (
+    "mono_conversion",
+    "mime_detection",
+    "encoding",
+    "upload",
+    "generation",
+    "parse",
+    "alignment",
+    "slicing",
+    "export",
+)
+
+# Numeric event fields summed per stage by MetricsCollector
+SUMMED_FIELDS = ("duration_s", "bytes_in", "bytes_out", "input_tokens", "output_tokens", "retries")
+
+MetricsCallback = Callable[[Dict[str, Any]], None]
+
+
+def make_event(stage: str, **fields) -> Dict[str, Any]:
+    """
+    Create stage event with all standard fields.
+
+    Args:
+        stage: Stage name, one of STAGES
+        **fields: Field values, extra fields such as "file" or "model" are kept as they are
+
+    Returns:
+        Dict[str, Any]: Event with "stage", "duration_s", "bytes_in", "bytes_out", "input_tokens",
+            "output_tokens", "retries" and "error"
+    """
+    event = {
+        "stage": stage,
+        "duration_s": 0.0,
+        "bytes_in": None,
+        "bytes_out": None,
+        "input_tokens": None,
+        "output_tokens": None,
+        "retries": 0,
+        "error": None,
+    }
+    event.update(fields)
+    return event
+
+
+def emit(metrics: Optional[MetricsCallback], event: Dict[str, Any]) -> None:
+    """
+    Send event to the metrics callback. Errors of the callback are logged, never raised.
+
+    Args:
+        metrics: Metrics callback, if None the event is dropped
+        event: Stage event
+    """
+    if metrics is None:
+        return
+    try:
+        metrics(event)
+    except Exception as e:
+        logger.warning(f"Error in metrics callback for stage {event.get('stage')}: {e}")
+
+
+@contextmanager
+def measure_stage(metrics: Optional[MetricsCallback], stage: str, **fields) -> Iterator[Dict[str, Any]]:
+    """
+    Measure duration of a stage and emit its event when the block exits.
+
+    The event is yielded so the block can fill in bytes, tokens and other fields. If the
+    block raises, the error type is stored in the event and the error is re-raised.
+
+    Args:
+        metrics: Metrics callback, if None nothing is emitted
+        stage: Stage name, one of STAGES
+        **fields: Initial field values
+
+    Yields:
+        Dict[str, Any]: Event of the stage
+    """
+    event = make_event(stage, **fields)
+    start = time.perf_counter()
+    try:
+        yield event
+    except Exception as e:
+        event["error"] = type(e).__name__
+        raise
+    finally:
+        event["duration_s"] = time.perf_counter() - start
+        emit(metrics, event)
+
+
+def get_token_usage(response) -> Dict[str, Optional[int]]:
+    """
+    Get token counts from the usage metadata of a Gemini response.
+
+    Args:
+        response: Response or stream chunk of generate_content
+
+    Returns:
+        Dict[str, Optional[int]]: {"input_tokens": int or None, "output_tokens": int or None}
+    """
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "input_tokens": getattr(usage, "prompt_token_count", None),
+        "output_tokens": getattr(usage, "candidates_token_count", None),
+    }
+
+
+class MetricsCollector:
+    """
+    Metrics callback aggregating stage events in memory.
+
+    Pass an instance as the metrics argument of AudioTranscriber, TextAligner or
+    AudioProcessor. It is thread-safe and can be shared between them.
+    """
+
+    def __init__(self, max_events: int = 1000):
+        """
+        Initialize MetricsCollector.
+
+        Args:
+            max_events (int): Number of most recent raw events kept for inspection
+        """
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        """
+        Record one stage event.
+
+        Args:
+            event: Stage event
+        """
+        with self._lock:
+            self._events.append(dict(event))
+            totals = self._stages.setdefault(
+                event["stage"],
+                {"count": 0, "errors": 0, "max_duration_s": 0.0, **{f: 0 for f in SUMMED_FIELDS}},
+            )
+            totals["count"] += 1
+            if event.get("error"):
+                totals["errors"] += 1
+            for field in SUMMED_FIELDS:
+                totals[field] += event.get(field) or 0
+            totals["max_duration_s"] = max(totals["max_duration_s"], event.get("duration_s") or 0.0)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get totals per stage.
+
+        Returns:
+            Dict[str, Dict[str, float]]: {stage: {"count", "errors", "duration_s", "max_duration_s",
+                "bytes_in", "bytes_out", "input_tokens", "output_tokens", "retries"}}
+        """
+        with self._lock:
+            return {stage: dict(totals) for stage, totals in self._stages.items()}
+
+    def events(self) -> List[Dict[str, Any]]:
+        """
+        Get the most recent raw events.
+
+        Returns:
+            List[Dict[str, Any]]: Events in the order they were recorded
+        """
+        with self._lock:
+            return list(self._events)
+
+    def reset(self) -> None:
+        """
+        Remove all recorded events and totals.
+        """
+        with self._lock:
+            self._stages.clear()
+            self._events.clear()
+
+    def to_json(self, include_events: bool = False, indent: Optional[int] = 2) -> str:
+        """
+        Export totals per stage as JSON.
+
+        Args:
+            include_events: Whether to include the most recent raw events
+            indent: JSON indentation
+
+        Returns:
+            str: JSON document {"stages": {...}} and, if requested, "events": [...]
+        """
+        data: Dict[str, Any] = {"stages": self.summary()}
+        if include_events:
+            data["events"] = self.events()
+        return json.dumps(data, ensure_ascii=False, indent=indent, default=str)
+
+    def to_prometheus(self, prefix: str = "gemini_audio_transcription") -> str:
+        """
+        Export totals per stage in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            str: Metrics text, one sample per stage and metric
+        """
+        metrics = (
+            ("stage_calls_total", "counter", "Number of stage calls", "count"),
+            ("stage_errors_total", "counter", "Number of failed stage calls", "errors"),
+            ("stage_duration_seconds_total", "counter", "Total wall time of stage calls", "duration_s"),
+            ("stage_duration_seconds_max", "gauge", "Longest stage call", "max_duration_s"),
+            ("stage_bytes_in_total", "counter", "Bytes read by stage calls", "bytes_in"),
+            ("stage_bytes_out_total", "counter", "Bytes produced by stage calls", "bytes_out"),
+            ("stage_input_tokens_total", "counter", "Input tokens reported by Gemini", "input_tokens"),
+            ("stage_output_tokens_total", "counter", "Output tokens reported by Gemini", "output_tokens"),
+            ("stage_retries_total", "counter", "Retries before stage calls", "retries"),
+        )
+        summary = self.summary()
+
+        lines = []
+        for name, metric_type, description, field in metrics:
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            for stage, totals in summary.items():
+                value = totals[field]
+                value = int(value) if float(value).is_integer() else float(value)
+                lines.append(f'{prefix}_{name}{{stage="{stage}"}} {value}')
+        return "\n".join(lines) + "\n"
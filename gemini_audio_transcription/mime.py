@@ -0,0 +1,45 @@
+"""
+Audio MIME type sniffing module.
+
+This module detects common audio container formats from the first bytes of a file,
+without reading the whole file or loading libmagic.
+"""
+
+from typing import Optional
+
+# Number of leading bytes needed by sniff_audio_mime
+SNIFF_BYTES = 16
+
+
+def sniff_audio_mime(header: bytes) -> Optional[str]:
+    """
+    Detect audio MIME type from the file header.
+
+    Recognizes WAV (RIFF/WAVE), AIFF (FORM/AIFF), MP3 (ID3 tag or MPEG frame sync),
+    AAC (ADTS frame sync), FLAC (fLaC) and Ogg (OggS).
+
+    Args:
+        header: First bytes of the file, at least SNIFF_BYTES for reliable detection
+
+    Returns:
+        str, optional: Standardized MIME type, None if the header is not recognized
+    """
+    if len(header) >= 12 and header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "audio/wav"
+    if len(header) >= 12 and header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+        return "audio/aiff"
+    if header[:4] == b"fLaC":
+        return "audio/flac"
+    if header[:4] == b"OggS":
+        return "audio/ogg"
+    if header[:3] == b"ID3":
+        return "audio/mpeg"
+
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        layer = (header[1] >> 1) & 0x03
+        if layer == 0:
+            # ADTS frames use the MPEG-2/4 sync word with layer bits 00
+            return "audio/aac" if header[1] & 0xF0 == 0xF0 else None
+        return "audio/mpeg"
+
+    return None
@@ -0,0 +1,279 @@
+"""
+Whisper model registry module.
+
+This module shares loaded stable_whisper models between TextAligner instances of a
+process. Models are keyed on (model name, device, dtype), loaded on first use, counted
+by the handles referencing them and unloaded after being unreferenced for a while.
+"""
+
+import gc
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, Optional[str]]
+
+
+def load_whisper_model(model_name: str, device: str, dtype: Optional[str] = None):
+    """
+    Load a stable_whisper model.
+
+    Args:
+        model_name: Whisper model name
+        device: Device to run the model on
+        dtype: torch dtype name the weights are cast to, e.g. "float16". If None, the
+            model's default dtype is kept.
+
+    Returns:
+        The loaded model
+    """
+    import stable_whisper
+
+    print(f"Loading stable_whisper model {model_name} on {device}")
+    model = stable_whisper.load_model(model_name, device=device)
+    if dtype is not None:
+        import torch
+
+        model = model.to(getattr(torch, dtype))
+    return model
+
+
+class _RegistryEntry:
+    """
+    Loaded model of one key with its reference count.
+    """
+
+    def __init__(self):
+        self.model = None
+        self.refs = 0
+        self.last_used = time.monotonic()
+        # Serializes loading and use of the model
+        self.lock = threading.RLock()
+
+
+class WhisperModelHandle:
+    """
+    Reference to a shared model of a WhisperModelRegistry.
+
+    The model is loaded on first access of model. Calls on the model should hold lock,
+    since one model instance is shared by all handles of its key.
+    """
+
+    def __init__(self, registry: "WhisperModelRegistry", key: ModelKey, entry: _RegistryEntry):
+        """
+        Initialize WhisperModelHandle.
+
+        Args:
+            registry: Registry the handle belongs to
+            key: (model name, device, dtype) of the model
+            entry: Registry entry of the key
+        """
+        self.registry = registry
+        self.key = key
+        self.lock = entry.lock
+        self._entry = entry
+        self._released = False
+
+    @property
+    def model(self):
+        """
+        Shared model, loaded on first access.
+        """
+        if self._released:
+            raise RuntimeError("Model handle was released")
+        return self.registry._get_model(self.key, self._entry)
+
+    def release(self) -> None:
+        """
+        Drop this reference. Releasing twice has no effect.
+        """
+        if self._released:
+            return
+        self._released = True
+        self.registry._release(self.key, self._entry)
+
+
+class WhisperModelRegistry:
+    """
+    Class for sharing stable_whisper models between aligners.
+
+    Each (model name, device, dtype) is loaded at most once. A model that no handle
+    references anymore is unloaded after idle_timeout_s, and loaded again when a new
+    handle uses it. One registry is shared by all threads of a process.
+    """
+
+    def __init__(
+        self,
+        idle_timeout_s: Optional[float] = 300.0,
+        loader: Callable[[str, str, Optional[str]], Any] = load_whisper_model,
+    ):
+        """
+        Initialize WhisperModelRegistry.
+
+        Args:
+            idle_timeout_s (float, optional): Time (s) an unreferenced model stays loaded.
+                If None, models stay loaded until clear is called.
+            loader (callable): Function called with (model name, device, dtype) to load a model
+        """
+        self.idle_timeout_s = idle_timeout_s
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._entries: Dict[ModelKey, _RegistryEntry] = {}
+        self._evictor: Optional[threading.Thread] = None
+
+    def acquire(self, model_name: str, device: str = "cpu", dtype: Optional[str] = None) -> WhisperModelHandle:
+        """
+        Get a handle of a model without loading it.
+
+        Args:
+            model_name: Whisper model name
+            device: Device to run the model on
+            dtype: torch dtype name of the weights, None for the model's default
+
+        Returns:
+            WhisperModelHandle: Handle, release it when it is no longer used
+        """
+        key = (model_name, device, dtype)
+        with self._lock:
+            entry = self._entries.setdefault(key, _RegistryEntry())
+            entry.refs += 1
+        return WhisperModelHandle(self, key, entry)
+
+    def evict_idle(self) -> int:
+        """
+        Unload models that have been unreferenced for idle_timeout_s.
+
+        Returns:
+            int: Number of unloaded models
+        """
+        if self.idle_timeout_s is None:
+            return 0
+
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                (key, entry)
+                for key, entry in self._entries.items()
+                if entry.refs == 0 and now - entry.last_used >= self.idle_timeout_s
+            ]
+            for key, _ in idle:
+                del self._entries[key]
+
+        for key, entry in idle:
+            self._unload(key, entry)
+        return len(idle)
+
+    def clear(self) -> None:
+        """
+        Unload all models. Referenced models are loaded again on their next use.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries = {key: entry for key, entry in entries if entry.refs > 0}
+        for key, entry in entries:
+            self._unload(key, entry)
+
+    def loaded_models(self) -> List[Dict[str, Any]]:
+        """
+        Get models of the registry.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per key with "model_name", "device", "dtype", "loaded",
+                "refs" and "idle_s"
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "model_name": key[0],
+                    "device": key[1],
+                    "dtype": key[2],
+                    "loaded": entry.model is not None,
+                    "refs": entry.refs,
+                    "idle_s": now - entry.last_used,
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def _get_model(self, key: ModelKey, entry: _RegistryEntry):
+        """
+        Get model of an entry, loading it if needed.
+
+        Args:
+            key: (model name, device, dtype) of the model
+            entry: Registry entry of the key
+
+        Returns:
+            The loaded model
+        """
+        with entry.lock:
+            if entry.model is None:
+                entry.model = self.loader(*key)
+            entry.last_used = time.monotonic()
+            return entry.model
+
+    def _release(self, key: ModelKey, entry: _RegistryEntry) -> None:
+        """
+        Drop one reference of an entry and schedule eviction when it is unreferenced.
+
+        Args:
+            key: (model name, device, dtype) of the model
+            entry: Registry entry of the key
+        """
+        with self._lock:
+            entry.refs = max(0, entry.refs - 1)
+            entry.last_used = time.monotonic()
+            unreferenced = entry.refs == 0
+
+        if unreferenced and self.idle_timeout_s is not None:
+            self._start_evictor()
+
+    def _start_evictor(self) -> None:
+        """
+        Start the thread unloading idle models unless it is running.
+        """
+        with self._lock:
+            # Threads cannot be started while the interpreter shuts down, e.g. from __del__
+            if sys.is_finalizing() or (self._evictor is not None and self._evictor.is_alive()):
+                return
+            self._evictor = threading.Thread(target=self._run_evictor, name="whisper-model-evictor", daemon=True)
+            self._evictor.start()
+
+    def _run_evictor(self) -> None:
+        """
+        Unload idle models until no unreferenced model is left.
+        """
+        while True:
+            time.sleep(self.idle_timeout_s / 2)
+            self.evict_idle()
+            with self._lock:
+                if not any(entry.refs == 0 for entry in self._entries.values()):
+                    self._evictor = None
+                    return
+
+    def _unload(self, key: ModelKey, entry: _RegistryEntry) -> None:
+        """
+        Drop a loaded model and free its memory.
+
+        Args:
+            key: (model name, device, dtype) of the model
+            entry: Registry entry of the key
+        """
+        with entry.lock:
+            if entry.model is None:
+                return
+            entry.model = None
+        logger.info(f"Unloaded whisper model {key[0]} on {key[1]}")
+        gc.collect()
+        if key[1].startswith("cuda"):
+            import torch
+
+            torch.cuda.empty_cache()
+
+
+# Registry shared by all aligners of the process unless one is passed explicitly
+default_registry = WhisperModelRegistry()
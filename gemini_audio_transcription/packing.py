@@ -0,0 +1,127 @@
+"""
+Clip packing module.
+
+This module groups short clips into packs sent as one Gemini request and splits the
+per-clip results of a packed response back out, reporting clips the model dropped or
+merged so they can be retried on their own.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Appended to the transcription prompt of packed requests
+PACK_INSTRUCTIONS = """
+**This request contains {count} separate audio clips.** Each clip is preceded by its label "Clip <index>:", with indexes 0 to {last}.
+
+* Apply the instructions above to every clip on its own. Never merge clips and never split one clip across entries.
+* Return a JSON array with exactly one object per clip, in clip order: [{{"clip": <index>, "results": <the JSON array described above for that clip>}}]
+"""
+
+
+def get_pack_prompt(prompt: str, count: int) -> str:
+    """
+    Get prompt of a packed request.
+
+    Args:
+        prompt: Transcription prompt of a single clip
+        count: Number of clips in the pack
+
+    Returns:
+        str: Prompt asking for results keyed by clip index
+    """
+    return prompt.rstrip() + "\n" + PACK_INSTRUCTIONS.format(count=count, last=count - 1)
+
+
+def plan_packs(
+    sizes: Sequence[int],
+    tokens: Sequence[int],
+    max_clips: int,
+    max_bytes: int,
+    max_tokens: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    Group clips into packs in input order without exceeding the pack budget.
+
+    A clip that exceeds the budget on its own forms a pack of one.
+
+    Args:
+        sizes: Size in bytes of each clip
+        tokens: Estimated audio tokens of each clip
+        max_clips: Maximum number of clips per pack
+        max_bytes: Maximum total size of the clips of a pack
+        max_tokens: Maximum total audio tokens of a pack. If None, tokens are not limited.
+
+    Returns:
+        List[List[int]]: Clip positions of each pack
+    """
+    packs: List[List[int]] = []
+    current: List[int] = []
+    current_bytes = 0
+    current_tokens = 0
+
+    for position, (size, clip_tokens) in enumerate(zip(sizes, tokens)):
+        fits = (
+            len(current) < max_clips
+            and current_bytes + size <= max_bytes
+            and (max_tokens is None or current_tokens + clip_tokens <= max_tokens)
+        )
+        if current and not fits:
+            packs.append(current)
+            current, current_bytes, current_tokens = [], 0, 0
+        current.append(position)
+        current_bytes += size
+        current_tokens += clip_tokens
+
+    if current:
+        packs.append(current)
+    return packs
+
+
+def split_packed_results(
+    entries: List[Any], count: int
+) -> Tuple[Dict[int, List[Dict[str, Any]]], List[int]]:
+    """
+    Split a packed response into the results of each clip and validate them.
+
+    An entry is valid if its clip index is in range, appears only once and carries a
+    non-empty list of result objects. A merge shows up as a missing clip, so the clips
+    next to a missing clip are not trusted either.
+
+    Args:
+        entries: Parsed response, a list of {"clip": int, "results": list}
+        count: Number of clips in the pack
+
+    Returns:
+        Tuple: ({clip index: results} of accepted clips, sorted clip indexes to retry individually)
+    """
+    by_clip: Dict[int, List[Dict[str, Any]]] = {}
+    duplicates = set()
+
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            clip = int(entry.get("clip"))
+        except (TypeError, ValueError):
+            continue
+        results = entry.get("results")
+        if not 0 <= clip < count or not isinstance(results, list) or not results:
+            continue
+        if not all(isinstance(item, dict) for item in results):
+            continue
+        if clip in by_clip:
+            duplicates.add(clip)
+            continue
+        by_clip[clip] = results
+
+    for clip in duplicates:
+        del by_clip[clip]
+
+    missing = [clip for clip in range(count) if clip not in by_clip]
+    retry = set(missing)
+    for clip in missing:
+        # Neighbours of a dropped clip may have absorbed its speech
+        retry.update(c for c in (clip - 1, clip + 1) if c in by_clip)
+    for clip in retry:
+        by_clip.pop(clip, None)
+
+    return by_clip, sorted(retry)
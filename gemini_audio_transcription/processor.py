@@ -5,16 +5,20 @@ This module combines transcription and alignment capabilities to provide
 a complete audio processing pipeline.
 """
 
+import asyncio
 import json
 import logging
 import os
+import threading
 from io import BytesIO
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Union, Any
 
-from pydub import AudioSegment
-
-from .transcriber import AudioTranscriber
+from .transcriber import AudioTranscriber, DEFAULT_INLINE_MAX_BYTES
 from .aligner import TextAligner
+from .encoder import AudioEncoder
+from .concurrency import iter_completed
+from .decoded_audio import DecodedAudio
+from .metrics import measure_stage
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -32,7 +36,15 @@ class AudioProcessor:
         transcription_model="gemini-2.0-flash", 
         whisper_model="large-v3", 
         device="cpu",
-        custom_prompt=None
+        custom_prompt=None,
+        inline_max_bytes=DEFAULT_INLINE_MAX_BYTES,
+        rate_limiter=None,
+        cache=None,
+        structured_output=None,
+        encode_uploads=False,
+        upload_encoder=None,
+        metrics=None,
+        whisper_dtype=None
     ):
         """
         Initialize AudioProcessor.
@@ -43,9 +55,53 @@ class AudioProcessor:
             whisper_model (str): Whisper model name for alignment.
             device (str): Device for running whisper model ("cpu", "cuda", "mps").
             custom_prompt (str, optional): Custom prompt for transcription. If None, default prompt will be used.
+            inline_max_bytes (int): Files up to this size are sent inline instead of through the Files API.
+            rate_limiter (RateLimiter, optional): Client-side rate limiter for Gemini requests.
+            cache (TranscriptionCache, optional): Persistent cache of transcription results.
+            structured_output (bool, optional): Whether to request schema-constrained JSON output.
+                If None, it is enabled for the default prompt only.
+            encode_uploads (bool): Whether to encode audio to compact mono audio before sending it to Gemini.
+                Off by default, so the audio graded by the prompt is the mono source audio.
+            upload_encoder (AudioEncoder, optional): Encoder used when encode_uploads is True. If None,
+                lossless 16 kHz mono FLAC is used; pass an AudioEncoder with "opus" to opt in to lossy audio.
+            metrics (callable, optional): Callback receiving a dict event for every pipeline stage,
+                e.g. a MetricsCollector. Shared by the transcriber and the aligner.
+            whisper_dtype (str, optional): torch dtype name of the whisper weights, e.g. "float16". The
+                whisper model is shared with other processors of the same model, device and dtype and is
+                loaded on the first alignment.
+        """
+        if encode_uploads and upload_encoder is None:
+            upload_encoder = AudioEncoder(formats=("flac",))
+        
+        self.transcriber = AudioTranscriber(
+            api_key=api_key,
+            model=transcription_model,
+            custom_prompt=custom_prompt,
+            inline_max_bytes=inline_max_bytes,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            structured_output=structured_output,
+            upload_encoder=upload_encoder if encode_uploads else None,
+            metrics=metrics
+        )
+        self.aligner = TextAligner(
+            model_name=whisper_model, device=device, metrics=metrics, dtype=whisper_dtype
+        )
+        self.metrics = metrics
+        self._align_lock = threading.Lock()
+
+    def close(self) -> None:
+        """
+        Close the transcriber, deleting remaining uploaded files, and release the shared whisper model.
         """
-        self.transcriber = AudioTranscriber(api_key=api_key, model=transcription_model, custom_prompt=custom_prompt)
-        self.aligner = TextAligner(model_name=whisper_model, device=device)
+        self.transcriber.close()
+        self.aligner.close()
+
+    def __enter__(self) -> "AudioProcessor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
     
     def process_audio(
         self, 
@@ -54,7 +110,8 @@ class AudioProcessor:
         leading_silence_ms: int = 0, 
         trailing_silence_ms: int = 0, 
         max_retries: int = 3,
-        language: str = "en"
+        language: str = "en",
+        long_audio: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Process audio file: transcribe and align text-audio.
@@ -66,6 +123,7 @@ class AudioProcessor:
             trailing_silence_ms: Silence (ms) to add at the end of each chunk
             max_retries: Maximum number of retry attempts on rate limit errors
             language: Language code for alignment
+            long_audio: Whether to split audio at silence points and transcribe windows concurrently
             
         Returns:
             List[Dict[str, Any]]: Transcription results with audio information
@@ -74,6 +132,179 @@ class AudioProcessor:
             ValueError: If audio file is invalid or alignment fails
             RuntimeError: If transcription fails after maximum retries
         """
+        return self._process_audio(
+            audio_file,
+            save_folder,
+            leading_silence_ms,
+            trailing_silence_ms,
+            max_retries,
+            language,
+            long_audio
+        )
+
+    def process_many(
+        self, 
+        audio_files: Iterable[Union[str, BytesIO]], 
+        save_folder: Optional[str] = None, 
+        leading_silence_ms: int = 0, 
+        trailing_silence_ms: int = 0, 
+        max_retries: int = 3,
+        language: str = "en",
+        long_audio: bool = False,
+        max_workers: int = 4
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process many audio files with bounded concurrency.
+        
+        Files are processed in a worker pool of max_workers threads so that Gemini calls
+        overlap, while alignment is serialized on the shared Whisper model. Results are
+        yielded as they complete and errors are collected per file instead of aborting
+        the whole batch.
+        
+        Args:
+            audio_files: Iterable of paths to audio files or BytesIO objects
+            save_folder: Folder to save audio chunks and text, if None doesn't save
+            leading_silence_ms: Silence (ms) to add at the beginning of each chunk
+            trailing_silence_ms: Silence (ms) to add at the end of each chunk
+            max_retries: Maximum number of retry attempts on rate limit errors
+            language: Language code for alignment
+            long_audio: Whether to split audio at silence points and transcribe windows concurrently
+            max_workers: Maximum number of files processed at the same time
+            
+        Yields:
+            Dict[str, Any]: {"index": int, "input": audio file, "results": processing results or None,
+                "error": exception or None}
+        """
+        def process_file(audio_file: Union[str, BytesIO]) -> List[Dict[str, Any]]:
+            return self._process_audio(
+                audio_file,
+                save_folder,
+                leading_silence_ms,
+                trailing_silence_ms,
+                max_retries,
+                language,
+                long_audio
+            )
+        
+        for item in iter_completed(process_file, audio_files, max_workers=max_workers):
+            if item["error"] is not None:
+                logger.error(f"Error processing item {item['index']}: {item['error']}")
+            yield item
+
+    def _process_audio(
+        self, 
+        audio_file: Union[str, BytesIO], 
+        save_folder: Optional[str], 
+        leading_silence_ms: int, 
+        trailing_silence_ms: int, 
+        max_retries: int,
+        language: str,
+        long_audio: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Process audio file: transcribe and align text-audio.
+        
+        Args:
+            audio_file: Path to audio file or BytesIO object
+            save_folder: Folder to save audio chunks and text, if None doesn't save
+            leading_silence_ms: Silence (ms) to add at the beginning of each chunk
+            trailing_silence_ms: Silence (ms) to add at the end of each chunk
+            max_retries: Maximum number of retry attempts on rate limit errors
+            language: Language code for alignment
+            long_audio: Whether to split audio at silence points and transcribe windows concurrently
+            
+        Returns:
+            List[Dict[str, Any]]: Transcription results with audio information
+        """
+        audio_file = self._prepare_audio(audio_file, save_folder)
+        
+        # Step 1: Transcribe audio file
+        logger.info("Starting audio processing")
+            
+        if long_audio:
+            transcription_results = self.transcriber.transcribe_long(audio_file, max_retries)
+        else:
+            transcription_results = self.transcriber.transcribe(audio_file, max_retries)
+        
+        # Steps 2-4: Align transcript with audio and combine results
+        return self._align_transcription(
+            transcription_results,
+            audio_file,
+            save_folder,
+            leading_silence_ms,
+            trailing_silence_ms,
+            language
+        )
+
+    async def process_audio_async(
+        self, 
+        audio_file: Union[str, BytesIO], 
+        save_folder: Optional[str] = None, 
+        leading_silence_ms: int = 0, 
+        trailing_silence_ms: int = 0, 
+        max_retries: int = 3,
+        language: str = "en",
+        long_audio: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Coroutine counterpart of process_audio.
+        
+        Transcription uses the asynchronous Gemini client, while CPU-bound mono conversion
+        and alignment run in worker threads so the event loop is never blocked.
+        
+        Args:
+            audio_file: Path to audio file or BytesIO object
+            save_folder: Folder to save audio chunks and text, if None doesn't save
+            leading_silence_ms: Silence (ms) to add at the beginning of each chunk
+            trailing_silence_ms: Silence (ms) to add at the end of each chunk
+            max_retries: Maximum number of retry attempts on rate limit errors
+            language: Language code for alignment
+            long_audio: Whether to split audio at silence points and transcribe windows concurrently
+            
+        Returns:
+            List[Dict[str, Any]]: Transcription results with audio information
+        
+        Raises:
+            ValueError: If audio file is invalid or alignment fails
+            RuntimeError: If transcription fails after maximum retries
+        """
+        audio_file = await asyncio.to_thread(self._prepare_audio, audio_file, save_folder)
+        
+        # Step 1: Transcribe audio file
+        logger.info("Starting audio processing")
+        
+        if long_audio:
+            transcription_results = await self.transcriber.transcribe_long_async(audio_file, max_retries)
+        else:
+            transcription_results = await self.transcriber.transcribe_async(audio_file, max_retries)
+        
+        # Steps 2-4: Align transcript with audio and combine results
+        return await asyncio.to_thread(
+            self._align_transcription,
+            transcription_results,
+            audio_file,
+            save_folder,
+            leading_silence_ms,
+            trailing_silence_ms,
+            language
+        )
+
+    def _prepare_audio(
+        self, audio_file: Union[str, BytesIO], save_folder: Optional[str]
+    ) -> Union[str, BytesIO, DecodedAudio]:
+        """
+        Validate input and decode audio to mono samples before transcription.
+        
+        Args:
+            audio_file: Path to audio file or BytesIO object
+            save_folder: Folder to save audio chunks and text, if None doesn't save
+            
+        Returns:
+            Union[str, BytesIO, DecodedAudio]: Decoded mono audio, or the original input if decoding fails
+            
+        Raises:
+            ValueError: If audio file or save folder is invalid
+        """
         # Validate input
         if not isinstance(audio_file, (str, BytesIO)):
             raise ValueError("audio_file must be a path (str) or BytesIO object")
@@ -88,40 +319,43 @@ class AudioProcessor:
             audio_bytes = audio_file.getvalue()
             # Create new BytesIO for processing
             audio_file_copy = BytesIO(audio_bytes)
+            audio_file_copy.name = getattr(audio_file, "name", None)
             audio_file = audio_file_copy
         
-        # Step 0: Convert audio to mono if stereo
+        # Step 0: Decode audio once, the transcriber, aligner and slicer share the mono samples
         try:
-            # Preserve original path if audio_file is string
-            original_path = audio_file if isinstance(audio_file, str) else None
-            
-            # Convert audio to mono
-            mono_audio = self._convert_to_mono(audio_file)
-            
-            # If input is path string, maintain that information for other modules
-            if original_path:
-                # Some modules may require string path, we log the information
-                logger.info(f"Converted file {original_path} to mono")
-                # Use mono_audio (BytesIO) for next steps
-                audio_file = mono_audio
-            else:
-                # If input is BytesIO, replace with mono version
-                audio_file = mono_audio
-                
+            audio_file = self._decode_audio(audio_file)
         except Exception as e:
-            logger.warning(f"Could not convert audio to mono: {str(e)}. Continuing with original format.")
-            # If conversion fails, continue with original file
+            logger.warning(f"Could not decode audio: {str(e)}. Continuing with original format.")
+            # If decoding fails, continue with original file
+            if isinstance(audio_file, BytesIO):
+                audio_file.seek(0)
         
-        # Step 1: Transcribe audio file
-        logger.info("Starting audio processing")
+        return audio_file
+
+    def _align_transcription(
+        self,
+        transcription_results: List[Dict[str, str]],
+        audio_file: Union[str, BytesIO, DecodedAudio],
+        save_folder: Optional[str],
+        leading_silence_ms: int,
+        trailing_silence_ms: int,
+        language: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Align transcribed text with audio and combine results.
         
-        # Ensure BytesIO is at beginning before transcription
-        if isinstance(audio_file, BytesIO):
-            audio_file.seek(0)
-            logger.debug("Reset BytesIO pointer before transcription")
+        Args:
+            transcription_results: Results from AudioTranscriber
+            audio_file: Path to audio file, BytesIO object or DecodedAudio
+            save_folder: Folder to save audio chunks and text, if None doesn't save
+            leading_silence_ms: Silence (ms) to add at the beginning of each chunk
+            trailing_silence_ms: Silence (ms) to add at the end of each chunk
+            language: Language code for alignment
             
-        transcription_results = self.transcriber.transcribe(audio_file, max_retries)
-        
+        Returns:
+            List[Dict[str, Any]]: Transcription results with audio information
+        """
         # Step 2: Extract transcript text from transcription results
         transcript_text = self._extract_transcript_text(transcription_results)
         if not transcript_text:
@@ -132,16 +366,20 @@ class AudioProcessor:
         if isinstance(audio_file, BytesIO):
             audio_file.seek(0)
             logger.debug("Reset BytesIO pointer before alignment")
+        elif isinstance(audio_file, DecodedAudio):
+            # The upload WAV is not needed anymore, the chunks only reference the samples
+            audio_file.clear_cache()
         
-        # Step 3: Align text with audio to create audio chunks
-        aligned_chunks = self.aligner.align_text(
-            text=transcript_text,
-            audio_file=audio_file,
-            save_folder=save_folder,
-            leading_silence_ms=leading_silence_ms,
-            trailing_silence_ms=trailing_silence_ms,
-            language=language
-        )
+        # Step 3: Align text with audio to create audio chunks (one alignment at a time on the shared model)
+        with self._align_lock:
+            aligned_chunks = self.aligner.align_text(
+                text=transcript_text,
+                audio_file=audio_file,
+                save_folder=save_folder,
+                leading_silence_ms=leading_silence_ms,
+                trailing_silence_ms=trailing_silence_ms,
+                language=language
+            )
         
         # Step 4: Combine transcription results with audio chunk info
         combined_results = self._combine_results(transcription_results, aligned_chunks)
@@ -149,18 +387,30 @@ class AudioProcessor:
         logger.info("Audio processing complete")
         return combined_results
 
-    def transcribe_only(self, audio_file: Union[str, BytesIO], max_retries: int = 3) -> List[Dict[str, str]]:
+    def transcribe_only(
+        self, 
+        audio_file: Union[str, BytesIO], 
+        max_retries: int = 3, 
+        long_audio: bool = False
+    ) -> List[Dict[str, str]]:
         """
         Transcribe audio without alignment.
         
         Args:
             audio_file: Path to audio file or BytesIO object
             max_retries: Maximum number of retry attempts on rate limit errors
+            long_audio: Whether to split audio at silence points and transcribe windows concurrently
             
         Returns:
             List[Dict[str, str]]: Transcription results
         """
-        mono_audio = self._convert_to_mono(audio_file)
+        # The upload encoder converts to mono itself, skip the intermediate WAV
+        if self.transcriber.upload_encoder is not None:
+            mono_audio = audio_file
+        else:
+            mono_audio = self._convert_to_mono(audio_file)
+        if long_audio:
+            return self.transcriber.transcribe_long(mono_audio, max_retries=max_retries)
         return self.transcriber.transcribe(mono_audio, max_retries=max_retries)
     
     def align_only(
@@ -186,7 +436,7 @@ class AudioProcessor:
         Returns:
             List[Dict]: Audio chunks with aligned text
         """
-        mono_audio = self._convert_to_mono(audio_file)
+        mono_audio = self._decode_audio(audio_file)
         return self.aligner.align_text(
             text=text,
             audio_file=mono_audio,
@@ -196,43 +446,49 @@ class AudioProcessor:
             language=language
         )
     
-    def _convert_to_mono(self, audio_file: Union[str, BytesIO]) -> BytesIO:
+    def _decode_audio(self, audio_file: Union[str, BytesIO]) -> DecodedAudio:
         """
-        Convert audio file to mono channel if it's stereo.
+        Decode audio file to mono samples.
         
         Args:
             audio_file: Path to audio file or BytesIO object
             
         Returns:
-            BytesIO: Buffer containing mono audio
+            DecodedAudio: Mono audio
             
         Raises:
             ValueError: If audio file cannot be read
         """
         try:
-            # Load audio
             if isinstance(audio_file, BytesIO):
-                # Make sure pointer is at beginning
-                if hasattr(audio_file, 'seek'):
-                    audio_file.seek(0)
-                    
-            audio: AudioSegment = AudioSegment.from_file(audio_file)
-            
-            # Check if audio is stereo (2+ channels) and convert to mono
-            if audio.channels > 1:
-                logger.info(f"Converting audio from {audio.channels} channels to mono")
-                audio = audio.set_channels(1)
+                bytes_in = len(audio_file.getvalue())
+            else:
+                bytes_in = os.path.getsize(audio_file)
             
-            # Export audio to BytesIO
-            output_buffer = BytesIO()
-            audio.export(output_buffer, format="wav")
-            output_buffer.seek(0)
+            with measure_stage(self.metrics, "mono_conversion", bytes_in=bytes_in) as event:
+                audio = DecodedAudio.from_file(audio_file)
+                event["bytes_out"] = audio.nbytes
             
-            return output_buffer
+            return audio
         except Exception as e:
             logger.error(f"Error converting audio to mono: {str(e)}")
             raise ValueError(f"Cannot convert audio to mono: {str(e)}")
     
+    def _convert_to_mono(self, audio_file: Union[str, BytesIO]) -> BytesIO:
+        """
+        Convert audio file to mono channel if it's stereo.
+        
+        Args:
+            audio_file: Path to audio file or BytesIO object
+            
+        Returns:
+            BytesIO: Buffer containing mono audio
+            
+        Raises:
+            ValueError: If audio file cannot be read
+        """
+        return self._decode_audio(audio_file).to_wav_buffer()
+    
     def _extract_transcript_text(self, transcription_results: List[Dict[str, str]]) -> str:
         """
         Extract text from transcription results.
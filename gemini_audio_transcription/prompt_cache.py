@@ -0,0 +1,226 @@
+"""
+Prompt context caching module.
+
+This module keeps the transcription prompt in server-side cached content, so requests
+reference the cached prompt instead of resending it. Handles are created per API key and
+model, replaced before they expire, and skipped when caching is unavailable.
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from google.genai import errors, types
+
+logger = logging.getLogger(__name__)
+
+# Display name prefix of cached contents created by this library
+CACHE_DISPLAY_PREFIX = "gat-prompt-"
+
+# Minimum number of tokens of cached content accepted by the API, per model family
+MIN_CACHE_TOKENS = {"pro": 4096}
+DEFAULT_MIN_CACHE_TOKENS = 1024
+
+# Characters per token used when the prompt cannot be counted
+CHARS_PER_TOKEN = 4
+
+
+class PromptCache:
+    """
+    Class for creating and reusing cached-content handles of transcription prompts.
+
+    Cached content is bound to the API key and model it was created with, so one handle
+    is kept per key scope, model and prompt. Prompts below the model's minimum cache size,
+    such as the default prompt, are always sent inline without trying to cache them. If
+    creating a handle fails for another reason, the prompt is sent inline and creation is
+    not attempted again for unavailable_retry_s. One cache can be shared by several
+    transcribers and threads.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 3600.0,
+        refresh_margin_s: float = 60.0,
+        unavailable_retry_s: float = 600.0,
+        min_tokens: Optional[int] = None,
+    ):
+        """
+        Initialize PromptCache.
+
+        Args:
+            ttl_s (float): Lifetime (s) of created cached contents
+            refresh_margin_s (float): A handle is replaced when it expires within this time (s),
+                so in-flight requests do not reference expired content
+            unavailable_retry_s (float): Time (s) before creation is attempted again after it failed
+            min_tokens (int, optional): Minimum prompt size (tokens) worth caching. Defaults to the
+                API minimum of the model, 4096 for pro models and 1024 otherwise.
+        """
+        self.ttl_s = ttl_s
+        self.refresh_margin_s = refresh_margin_s
+        self.unavailable_retry_s = unavailable_retry_s
+        self.min_tokens = min_tokens
+
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._handles: Dict[Tuple[str, str, str], Tuple[str, datetime]] = {}
+        self._unavailable_until: Dict[Tuple[str, str, str], datetime] = {}
+        # Token counts of prompts per model and prompt hash, they do not depend on the key
+        self._token_counts: Dict[Tuple[str, str], int] = {}
+
+    def get(self, client, model: str, prompt: str, scope: Optional[str] = None) -> Optional[str]:
+        """
+        Get name of cached content holding the prompt, creating or replacing it if needed.
+
+        Args:
+            client: genai.Client of the API key the request is sent with
+            model: Gemini model name of the request
+            prompt: Transcription prompt
+            scope: Scope of the API key, e.g. its key pool label
+
+        Returns:
+            str, optional: Cached content name, None if the prompt has to be sent inline
+        """
+        key = (scope or "default", model, hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only one thread creates the handle of a key, others wait and reuse it
+        with key_lock:
+            now = datetime.now(timezone.utc)
+            with self._lock:
+                handle = self._handles.get(key)
+                unavailable_until = self._unavailable_until.get(key)
+            if handle is not None and handle[1] - now > timedelta(seconds=self.refresh_margin_s):
+                return handle[0]
+            if unavailable_until is not None and unavailable_until > now:
+                return None
+            if not self._is_large_enough(client, model, prompt, key[2]):
+                return None
+
+            try:
+                cached = client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        contents=[prompt],
+                        ttl=f"{int(self.ttl_s)}s",
+                        display_name=f"{CACHE_DISPLAY_PREFIX}{key[2][:16]}",
+                    ),
+                )
+            except errors.APIError as e:
+                logger.warning(f"Could not cache prompt for {model}, sending it inline: {e}")
+                with self._lock:
+                    self._handles.pop(key, None)
+                    self._unavailable_until[key] = now + timedelta(seconds=self.unavailable_retry_s)
+                return None
+
+            expire_time = cached.expire_time or now + timedelta(seconds=self.ttl_s)
+            with self._lock:
+                self._handles[key] = (cached.name, expire_time)
+                self._unavailable_until.pop(key, None)
+            logger.info(f"Cached prompt for {model} as {cached.name} until {expire_time.isoformat()}")
+            return cached.name
+
+    def get_min_tokens(self, model: str) -> int:
+        """
+        Get minimum prompt size worth caching for a model.
+
+        Args:
+            model: Gemini model name
+
+        Returns:
+            int: Minimum number of tokens
+        """
+        if self.min_tokens is not None:
+            return self.min_tokens
+        for family, min_tokens in MIN_CACHE_TOKENS.items():
+            if family in model:
+                return min_tokens
+        return DEFAULT_MIN_CACHE_TOKENS
+
+    def _is_large_enough(self, client, model: str, prompt: str, prompt_hash: str) -> bool:
+        """
+        Check whether a prompt reaches the minimum cache size of a model.
+
+        The prompt is counted once per model with the API, and estimated from its length if
+        counting fails.
+
+        Args:
+            client: genai.Client used to count tokens
+            model: Gemini model name
+            prompt: Transcription prompt
+            prompt_hash: SHA-256 of the prompt
+
+        Returns:
+            bool: True if the prompt can be cached
+        """
+        min_tokens = self.get_min_tokens(model)
+        with self._lock:
+            tokens = self._token_counts.get((model, prompt_hash))
+        if tokens is None:
+            try:
+                tokens = client.models.count_tokens(model=model, contents=[prompt]).total_tokens
+            except errors.APIError as e:
+                logger.debug(f"Could not count prompt tokens for {model}, estimating them: {e}")
+                tokens = None
+            if tokens is None:
+                # Estimates are not kept, the prompt is counted again by the next request
+                tokens = len(prompt) // CHARS_PER_TOKEN
+            else:
+                with self._lock:
+                    self._token_counts[(model, prompt_hash)] = tokens
+            if tokens < min_tokens:
+                logger.info(
+                    f"Prompt has {tokens} tokens, below the minimum of {min_tokens} for caching on {model}, "
+                    f"sending it inline"
+                )
+        return tokens >= min_tokens
+
+    def invalidate(self, name: str) -> None:
+        """
+        Forget a handle the API no longer accepts, the next request creates a new one.
+
+        Args:
+            name: Cached content name
+        """
+        with self._lock:
+            for key, handle in list(self._handles.items()):
+                if handle[0] == name:
+                    del self._handles[key]
+
+    def is_cache_error(self, error: Exception) -> bool:
+        """
+        Check whether a request failed because its cached content is gone.
+
+        Args:
+            error: Error raised by the request
+
+        Returns:
+            bool: True for errors about missing or expired cached content
+        """
+        if not isinstance(error, errors.APIError) or error.code not in (400, 403, 404):
+            return False
+        message = str(error).lower()
+        return "cachedcontent" in message or "cached content" in message
+
+    def clear(self, client=None) -> None:
+        """
+        Forget all handles, deleting their cached contents if a client is given.
+
+        Args:
+            client: genai.Client used to delete the cached contents. Only handles created with
+                this client's API key can be deleted, other deletions are logged and skipped.
+        """
+        with self._lock:
+            names = [handle[0] for handle in self._handles.values()]
+            self._handles.clear()
+            self._unavailable_until.clear()
+
+        if client is None:
+            return
+        for name in names:
+            try:
+                client.caches.delete(name=name)
+            except errors.APIError as e:
+                logger.warning(f"Could not delete cached content {name}: {e}")
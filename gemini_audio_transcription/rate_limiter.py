@@ -0,0 +1,243 @@
+"""
+Client-side rate limiting module.
+
+This module provides token-bucket rate limiting of Gemini API calls per model, with
+requests-per-minute and tokens-per-minute budgets that can be shared between threads,
+transcriber instances and, with the file-lock backend, processes on one host.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class InMemoryBackend:
+    """
+    Token bucket storage shared by the threads of one process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, requests: List[Tuple[str, float, float]]) -> float:
+        """
+        Atomically take tokens from several buckets.
+
+        Tokens are taken from all buckets or from none of them.
+
+        Args:
+            requests: List of (bucket key, capacity per minute, amount)
+
+        Returns:
+            float: 0 if tokens were taken, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            return _take(self._buckets, requests, time.monotonic())
+
+
+class FileLockBackend:
+    """
+    Token bucket storage shared by the processes of one host through a locked state file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize FileLockBackend.
+
+        Args:
+            path: Path of the state file, created if it does not exist
+
+        Raises:
+            RuntimeError: If file locking is not supported on this platform
+        """
+        if fcntl is None:
+            raise RuntimeError("FileLockBackend requires fcntl, which is not available on this platform")
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def take(self, requests: List[Tuple[str, float, float]]) -> float:
+        """
+        Atomically take tokens from several buckets.
+
+        Args:
+            requests: List of (bucket key, capacity per minute, amount)
+
+        Returns:
+            float: 0 if tokens were taken, otherwise seconds to wait before trying again
+        """
+        with self._lock, open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                try:
+                    buckets = {k: tuple(v) for k, v in json.loads(content).items()} if content else {}
+                except (json.JSONDecodeError, AttributeError, TypeError):
+                    buckets = {}
+
+                # Wall clock time is shared between processes, monotonic time is not
+                wait_time = _take(buckets, requests, time.time())
+
+                f.seek(0)
+                f.truncate()
+                json.dump(buckets, f)
+                f.flush()
+                return wait_time
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _take(
+    buckets: Dict[str, Tuple[float, float]],
+    requests: List[Tuple[str, float, float]],
+    now: float,
+) -> float:
+    """
+    Refill buckets and take tokens from all of them if every bucket has enough.
+
+    Args:
+        buckets: Bucket state as {key: (level, last update time)}, updated in place
+        requests: List of (bucket key, capacity per minute, amount)
+        now: Current time in seconds
+
+    Returns:
+        float: 0 if tokens were taken, otherwise seconds to wait before trying again
+    """
+    levels = {}
+    wait_time = 0.0
+    for key, capacity, amount in requests:
+        refill_per_s = capacity / 60.0
+        level, updated = buckets.get(key, (capacity, now))
+        level = min(capacity, level + max(0.0, now - updated) * refill_per_s)
+        levels[key] = level
+
+        # Requests larger than the bucket can never fit, let them through once it is full
+        amount = min(amount, capacity)
+        if level < amount:
+            wait_time = max(wait_time, (amount - level) / refill_per_s)
+
+    for key, capacity, amount in requests:
+        level = levels[key]
+        if wait_time == 0:
+            level -= min(amount, capacity)
+        buckets[key] = (level, now)
+
+    return wait_time
+
+
+class RateLimiter:
+    """
+    Class for client-side rate limiting of Gemini API calls with per-model token buckets.
+
+    One instance can be shared by several AudioTranscriber instances and threads. Pass a
+    FileLockBackend to share the budget between processes on the same host.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        model_limits: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        backend=None,
+    ):
+        """
+        Initialize RateLimiter.
+
+        Args:
+            requests_per_minute (float, optional): Default requests per minute for every model
+            tokens_per_minute (float, optional): Default tokens per minute for every model
+            model_limits (dict, optional): Per-model limits as {model: (requests_per_minute, tokens_per_minute)},
+                overriding the defaults. None disables a limit.
+            backend (optional): Bucket storage, InMemoryBackend or FileLockBackend. If None, an
+                InMemoryBackend is used.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+        self.backend = backend or InMemoryBackend()
+
+    def get_limits(self, model: str) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Get limits for a model.
+
+        Args:
+            model: Gemini model name
+
+        Returns:
+            Tuple: (requests per minute, tokens per minute), None means unlimited
+        """
+        return self.model_limits.get(model, (self.requests_per_minute, self.tokens_per_minute))
+
+    def try_acquire(self, model: str, tokens: int = 0, scope: Optional[str] = None) -> float:
+        """
+        Try to acquire budget for one request without waiting.
+
+        Args:
+            model: Gemini model name
+            tokens: Estimated number of tokens of the request
+            scope: Separate budget for the same model, e.g. one per API key of a key pool
+
+        Returns:
+            float: 0 if budget was acquired, otherwise seconds to wait before trying again
+        """
+        rpm, tpm = self.get_limits(model)
+        bucket = f"{scope}/{model}" if scope else model
+        requests = []
+        if rpm:
+            requests.append((f"{bucket}:rpm", float(rpm), 1.0))
+        if tpm and tokens > 0:
+            requests.append((f"{bucket}:tpm", float(tpm), float(tokens)))
+        if not requests:
+            return 0.0
+        return self.backend.take(requests)
+
+    def acquire(self, model: str, tokens: int = 0, scope: Optional[str] = None) -> float:
+        """
+        Wait until budget for one request is available and acquire it.
+
+        Args:
+            model: Gemini model name
+            tokens: Estimated number of tokens of the request
+            scope: Separate budget for the same model, e.g. one per API key of a key pool
+
+        Returns:
+            float: Total time (s) spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait_time = self.try_acquire(model, tokens, scope)
+            if wait_time <= 0:
+                return waited
+            time.sleep(wait_time)
+            waited += wait_time
+
+    async def acquire_async(self, model: str, tokens: int = 0, scope: Optional[str] = None) -> float:
+        """
+        Coroutine counterpart of acquire, waits without blocking the event loop.
+
+        Args:
+            model: Gemini model name
+            tokens: Estimated number of tokens of the request
+            scope: Separate budget for the same model, e.g. one per API key of a key pool
+
+        Returns:
+            float: Total time (s) spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait_time = self.try_acquire(model, tokens, scope)
+            if wait_time <= 0:
+                return waited
+            await asyncio.sleep(wait_time)
+            waited += wait_time
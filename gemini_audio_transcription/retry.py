@@ -0,0 +1,297 @@
+"""
+Retry policy module.
+
+This module provides a reusable retry policy for Gemini API calls that classifies errors
+by exception type and status code, honours server retry hints and waits with full-jitter
+exponential backoff under an overall deadline.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, Tuple, Type
+
+import httpx
+from google.genai import errors
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: timeout, rate limit and transient server errors
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+# Status codes meaning the model is overloaded or unavailable
+OVERLOADED_STATUS_CODES = (500, 503, 504)
+
+# Exception types worth retrying besides API errors. ValueError covers responses
+# that could not be parsed.
+DEFAULT_RETRYABLE_EXCEPTIONS = (
+    httpx.TransportError,
+    ConnectionError,
+    TimeoutError,
+    ValueError,
+)
+
+
+class RetryError(RuntimeError):
+    """
+    Raised when a call still fails after all retry attempts or the deadline.
+    """
+
+    def __init__(self, message: str, last_error: Exception, attempts: int):
+        super().__init__(message)
+        self.last_error = last_error
+        self.attempts = attempts
+
+
+class RetryPolicy:
+    """
+    Class for retrying calls with full-jitter exponential backoff.
+
+    A policy holds no per-call state, so one instance can be shared by uploads,
+    generations and deletes, and across threads and coroutines.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay_s: float = 1.0,
+        max_delay_s: float = 60.0,
+        deadline_s: Optional[float] = None,
+        retryable_exceptions: Tuple[Type[Exception], ...] = DEFAULT_RETRYABLE_EXCEPTIONS,
+    ):
+        """
+        Initialize RetryPolicy.
+
+        Args:
+            max_attempts (int): Maximum number of attempts, including the first one
+            base_delay_s (float): Base delay (s) of the exponential backoff
+            max_delay_s (float): Maximum delay (s) between two attempts
+            deadline_s (float, optional): Overall time budget (s) of a call including all retries
+            retryable_exceptions (tuple): Exception types retried besides retryable API errors
+
+        Raises:
+            ValueError: If max_attempts is not positive
+        """
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be positive")
+
+        self.max_attempts = max_attempts
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.deadline_s = deadline_s
+        self.retryable_exceptions = retryable_exceptions
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Check whether an error is worth retrying.
+
+        Args:
+            error: Error raised by the call
+
+        Returns:
+            bool: True if the call should be retried
+        """
+        if isinstance(error, errors.APIError):
+            return error.code in RETRYABLE_STATUS_CODES
+        return isinstance(error, self.retryable_exceptions)
+
+    def is_overloaded(self, error: Exception) -> bool:
+        """
+        Check whether an error means the model is overloaded or unavailable.
+
+        Args:
+            error: Error raised by the call
+
+        Returns:
+            bool: True if the error is a transient server error
+        """
+        return isinstance(error, errors.APIError) and error.code in OVERLOADED_STATUS_CODES
+
+    def get_retry_after(self, error: Exception) -> Optional[float]:
+        """
+        Get delay requested by the server, from the Retry-After header or RetryInfo details.
+
+        Args:
+            error: Error raised by the call
+
+        Returns:
+            float, optional: Delay in seconds, None if the server gave no hint
+        """
+        if not isinstance(error, errors.APIError):
+            return None
+
+        # Retry-After header, in seconds or as HTTP date
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        retry_after = headers.get("retry-after") if headers is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+
+        # google.rpc.RetryInfo in error details, e.g. {"retryDelay": "12s"}
+        details = error.details if isinstance(error.details, dict) else {}
+        error_body = details.get("error", details)
+        for detail in error_body.get("details", []) or []:
+            if isinstance(detail, dict) and "retryDelay" in detail:
+                match = re.match(r"^\s*([\d.]+)s\s*$", str(detail["retryDelay"]))
+                if match:
+                    return float(match.group(1))
+
+        return None
+
+    def get_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Get delay before the next attempt.
+
+        Args:
+            attempt: Number of the failed attempt, starting at 1
+            error: Error raised by the failed attempt
+
+        Returns:
+            float: Delay in seconds
+        """
+        retry_after = self.get_retry_after(error)
+        if retry_after is not None:
+            # Honour the server hint, with a little jitter so waiting clients do not return in lockstep
+            return min(self.max_delay_s, retry_after) + random.uniform(0, self.base_delay_s)
+
+        # Full jitter: uniform between 0 and the exponential backoff cap
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2 ** (attempt - 1)))
+
+    def call(
+        self,
+        func: Callable[..., Any],
+        *args,
+        max_attempts: Optional[int] = None,
+        retry_if: Optional[Callable[[Exception], bool]] = None,
+        on_retry: Optional[Callable[[Exception, int, float], None]] = None,
+        delay_func: Optional[Callable[[int, Exception], float]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Call func and retry it on retryable errors.
+
+        Args:
+            func: Function to call
+            *args: Positional arguments of func
+            max_attempts: Override of the maximum number of attempts for this call
+            retry_if: Additional predicate marking errors as retryable
+            on_retry: Callback called with (error, attempt, delay) before waiting for the next attempt
+            delay_func: Override of get_delay for this call, called with (attempt, error)
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            Any: Return value of func
+
+        Raises:
+            RetryError: If all attempts failed or the deadline was reached
+            Exception: The error of func if it is not retryable
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, start, max_attempts, retry_if, delay_func)
+                if on_retry:
+                    on_retry(e, attempt, delay)
+                time.sleep(delay)
+
+    async def call_async(
+        self,
+        func: Callable[..., Any],
+        *args,
+        max_attempts: Optional[int] = None,
+        retry_if: Optional[Callable[[Exception], bool]] = None,
+        on_retry: Optional[Callable[[Exception, int, float], None]] = None,
+        delay_func: Optional[Callable[[int, Exception], float]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Coroutine counterpart of call, func must be a coroutine function.
+
+        Args:
+            func: Coroutine function to call
+            *args: Positional arguments of func
+            max_attempts: Override of the maximum number of attempts for this call
+            retry_if: Additional predicate marking errors as retryable
+            on_retry: Callback called with (error, attempt, delay) before waiting for the next attempt
+            delay_func: Override of get_delay for this call, called with (attempt, error)
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            Any: Return value of func
+
+        Raises:
+            RetryError: If all attempts failed or the deadline was reached
+            Exception: The error of func if it is not retryable
+        """
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                delay = self._next_delay(e, attempt, start, max_attempts, retry_if, delay_func)
+                if on_retry:
+                    on_retry(e, attempt, delay)
+                await asyncio.sleep(delay)
+
+    def _next_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        start: float,
+        max_attempts: Optional[int],
+        retry_if: Optional[Callable[[Exception], bool]],
+        delay_func: Optional[Callable[[int, Exception], float]] = None,
+    ) -> float:
+        """
+        Decide whether a failed attempt is retried and how long to wait.
+
+        Args:
+            error: Error raised by the failed attempt
+            attempt: Number of the failed attempt, starting at 1
+            start: Monotonic start time of the call
+            max_attempts: Override of the maximum number of attempts
+            retry_if: Additional predicate marking errors as retryable
+            delay_func: Override of get_delay
+
+        Returns:
+            float: Delay in seconds before the next attempt
+
+        Raises:
+            RetryError: If no attempts are left or the deadline would be exceeded
+            Exception: The error itself if it is not retryable
+        """
+        if not (self.is_retryable(error) or (retry_if is not None and retry_if(error))):
+            raise error
+
+        max_attempts = max_attempts or self.max_attempts
+        if attempt >= max_attempts:
+            raise RetryError(
+                f"Call failed after {attempt} attempts: {error}", error, attempt
+            ) from error
+
+        delay = (delay_func or self.get_delay)(attempt, error)
+        if self.deadline_s is not None and time.monotonic() - start + delay > self.deadline_s:
+            raise RetryError(
+                f"Retry deadline of {self.deadline_s}s reached after {attempt} attempts: {error}",
+                error,
+                attempt,
+            ) from error
+
+        logger.debug(f"Attempt {attempt} failed with {error!r}, retrying in {delay:.2f}s")
+        return delay
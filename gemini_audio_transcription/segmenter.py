@@ -0,0 +1,151 @@
+"""
+Silence-aware audio segmentation module.
+
+This module provides functionality to split long audio files into bounded windows
+at silence points, so that each window can be transcribed independently.
+"""
+
+from io import BytesIO
+from typing import Dict, List, Union
+
+from pydub import AudioSegment
+from pydub.silence import detect_silence
+
+from .decoded_audio import DecodedAudio
+
+
+class AudioSegmenter:
+    """
+    Class for splitting long audio into bounded windows at silence points.
+    """
+
+    def __init__(
+        self,
+        max_window_ms: int = 10 * 60 * 1000,
+        min_window_ms: int = 5 * 60 * 1000,
+        min_silence_len_ms: int = 500,
+        silence_thresh_offset_db: float = -16.0,
+        seek_step_ms: int = 10,
+    ):
+        """
+        Initialize AudioSegmenter.
+
+        Args:
+            max_window_ms (int): Maximum length (ms) of a single window
+            min_window_ms (int): Minimum length (ms) of a window before a split point is searched
+            min_silence_len_ms (int): Minimum length (ms) of a silence to be used as split point
+            silence_thresh_offset_db (float): Silence threshold relative to the loudness (dBFS) of the audio
+            seek_step_ms (int): Step size (ms) used when scanning for silence
+
+        Raises:
+            ValueError: If window lengths are not valid
+        """
+        if max_window_ms <= 0:
+            raise ValueError("max_window_ms must be positive")
+        if not 0 <= min_window_ms < max_window_ms:
+            raise ValueError("min_window_ms must be between 0 and max_window_ms")
+
+        self.max_window_ms = max_window_ms
+        self.min_window_ms = min_window_ms
+        self.min_silence_len_ms = min_silence_len_ms
+        self.silence_thresh_offset_db = silence_thresh_offset_db
+        self.seek_step_ms = seek_step_ms
+
+    def find_split_points(self, audio: AudioSegment) -> List[int]:
+        """
+        Find split points (ms) so that every window is at most max_window_ms long.
+
+        Only the region between min_window_ms and max_window_ms after the start of the
+        current window is scanned, which keeps the scan bounded for hour-long audio.
+
+        Args:
+            audio: Audio to split
+
+        Returns:
+            List[int]: Sorted split points in milliseconds, excluding 0 and the audio end
+        """
+        duration_ms = len(audio)
+        silence_thresh = audio.dBFS + self.silence_thresh_offset_db
+
+        split_points = []
+        window_start = 0
+        while duration_ms - window_start > self.max_window_ms:
+            search_start = window_start + self.min_window_ms
+            search_end = window_start + self.max_window_ms
+
+            # Look for silences only inside the allowed region of the current window
+            silences = detect_silence(
+                audio[search_start:search_end],
+                min_silence_len=self.min_silence_len_ms,
+                silence_thresh=silence_thresh,
+                seek_step=self.seek_step_ms,
+            )
+
+            if silences:
+                # Prefer the longest silence, then the latest one, and cut in its middle
+                silence_start, silence_end = max(
+                    silences, key=lambda s: (s[1] - s[0], s[0])
+                )
+                split_point = search_start + (silence_start + silence_end) // 2
+            else:
+                # No silence found, fall back to a hard cut at the window limit
+                split_point = search_end
+
+            split_points.append(split_point)
+            window_start = split_point
+
+        return split_points
+
+    def split(self, audio_file: Union[str, BytesIO, AudioSegment, DecodedAudio]) -> List[Dict]:
+        """
+        Split audio into windows at silence points.
+
+        Args:
+            audio_file: Path to audio file, BytesIO object, AudioSegment or DecodedAudio
+
+        Returns:
+            List[Dict]: Windows in order, each as {"index": int, "start_ms": int, "end_ms": int, "audio": AudioSegment}
+        """
+        audio = self._load_audio(audio_file)
+
+        boundaries = [0] + self.find_split_points(audio) + [len(audio)]
+
+        windows = []
+        for index, (start_ms, end_ms) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+            windows.append(
+                {
+                    "index": index,
+                    "start_ms": start_ms,
+                    "end_ms": end_ms,
+                    "audio": audio[start_ms:end_ms],
+                }
+            )
+
+        return windows
+
+    def _load_audio(self, audio_file: Union[str, BytesIO, AudioSegment, DecodedAudio]) -> AudioSegment:
+        """
+        Load audio into AudioSegment.
+
+        Args:
+            audio_file: Path to audio file, BytesIO object, AudioSegment or DecodedAudio
+
+        Returns:
+            AudioSegment: AudioSegment object
+
+        Raises:
+            ValueError: If audio format is not supported
+        """
+        if isinstance(audio_file, AudioSegment):
+            return audio_file
+        elif isinstance(audio_file, DecodedAudio):
+            return audio_file.to_segment()
+        elif isinstance(audio_file, str):
+            return AudioSegment.from_file(audio_file)
+        elif isinstance(audio_file, BytesIO):
+            audio_file.seek(0)
+            audio = AudioSegment.from_file(audio_file)
+            audio_file.seek(0)
+            return audio
+        else:
+            raise ValueError("Unsupported audio format")
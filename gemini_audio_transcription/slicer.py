@@ -0,0 +1,98 @@
+"""
+Sample slicing module.
+
+This module cuts aligned segments out of one PCM sample array. Boundaries of all segments
+are computed at once as sample indices, unpadded chunks are views of the source array and
+padded chunks are views of one buffer allocated for all of them.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def ms_to_samples(duration_ms: float, sample_rate: int) -> int:
+    """
+    Convert a duration to a number of samples.
+
+    Args:
+        duration_ms: Duration (ms)
+        sample_rate: Sample rate (Hz)
+
+    Returns:
+        int: Number of samples, rounded to the nearest sample
+    """
+    return max(0, int(round(duration_ms * sample_rate / 1000)))
+
+
+def compute_boundaries(
+    starts_s: Sequence[float],
+    ends_s: Sequence[float],
+    sample_rate: int,
+    num_samples: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert segment timestamps to sample indices.
+
+    Args:
+        starts_s: Segment start times (s)
+        ends_s: Segment end times (s)
+        sample_rate: Sample rate (Hz)
+        num_samples: Number of samples of the audio, indices are clipped to it
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int64 start and end indices, each end is at least its start
+
+    Raises:
+        ValueError: If starts_s and ends_s differ in length
+    """
+    starts = np.asarray(starts_s, dtype=np.float64)
+    ends = np.asarray(ends_s, dtype=np.float64)
+    if starts.shape != ends.shape:
+        raise ValueError("starts_s and ends_s must have the same length")
+
+    start_idx = np.clip(np.rint(starts * sample_rate), 0, num_samples).astype(np.int64)
+    end_idx = np.clip(np.rint(ends * sample_rate), 0, num_samples).astype(np.int64)
+    return start_idx, np.maximum(end_idx, start_idx)
+
+
+def slice_samples(
+    samples: np.ndarray,
+    start_idx: np.ndarray,
+    end_idx: np.ndarray,
+    leading_samples: int = 0,
+    trailing_samples: int = 0,
+) -> List[np.ndarray]:
+    """
+    Cut chunks out of a sample array.
+
+    Without padding, the chunks are views of samples and nothing is copied. With padding,
+    one zeroed buffer holding all padded chunks back to back is allocated, each chunk is
+    copied into it once and returned as a view of that buffer.
+
+    Args:
+        samples: One-dimensional sample array
+        start_idx: Start index of each chunk
+        end_idx: End index of each chunk
+        leading_samples: Number of silent samples before each chunk
+        trailing_samples: Number of silent samples after each chunk
+
+    Returns:
+        List[np.ndarray]: One array per chunk, in the order of the indices
+    """
+    if leading_samples <= 0 and trailing_samples <= 0:
+        return [samples[start:end] for start, end in zip(start_idx.tolist(), end_idx.tolist())]
+
+    leading_samples = max(0, leading_samples)
+    trailing_samples = max(0, trailing_samples)
+    lengths = end_idx - start_idx + leading_samples + trailing_samples
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    buffer = np.zeros(int(offsets[-1]), dtype=samples.dtype)
+    chunks = []
+    for start, end, offset, next_offset in zip(
+        start_idx.tolist(), end_idx.tolist(), offsets[:-1].tolist(), offsets[1:].tolist()
+    ):
+        buffer[offset + leading_samples : offset + leading_samples + end - start] = samples[start:end]
+        chunks.append(buffer[offset:next_offset])
+    return chunks
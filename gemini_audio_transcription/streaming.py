@@ -0,0 +1,126 @@
+"""
+Incremental JSON parsing module for streamed Gemini responses.
+"""
+
+import json
+from typing import Any, Dict, List
+
+
+class JSONArrayStreamParser:
+    """
+    Class for parsing a JSON array of objects from text that arrives in pieces.
+
+    Text before the opening "[" (for example a ```json fence) is ignored. Each object of the
+    top-level array is returned as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether the closing "]" of the top-level array has been seen.
+        """
+        return self._finished
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Add text to the parser.
+
+        Args:
+            text: Next piece of the response text
+
+        Returns:
+            List[Dict[str, Any]]: Objects completed by this piece, in order
+
+        Raises:
+            ValueError: If a completed object is not valid JSON
+        """
+        if self._finished or not text:
+            return []
+
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+
+        while pos < len(buffer):
+            char = buffer[pos]
+
+            if not self._started:
+                # Skip everything before the top-level array
+                if char == "[":
+                    self._started = True
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._object_start = pos
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    if char == "]":
+                        # End of top-level array
+                        self._finished = True
+                        pos += 1
+                        break
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        completed.append(self._decode(buffer[self._object_start : pos + 1]))
+                        self._object_start = None
+            pos += 1
+
+        # Drop consumed text, keep the start of an unfinished object
+        keep_from = self._object_start if self._object_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+
+        return completed
+
+    def close(self) -> None:
+        """
+        Check that the complete array has been received.
+
+        Raises:
+            ValueError: If no array was found or the array is incomplete
+        """
+        if not self._started:
+            raise ValueError("Cannot parse result as JSON: Valid JSON format not found")
+        if not self._finished:
+            raise ValueError("Cannot parse result as JSON: response ended before the JSON array was closed")
+
+    def _decode(self, text: str) -> Dict[str, Any]:
+        """
+        Decode a completed object.
+
+        Args:
+            text: JSON text of the object
+
+        Returns:
+            Dict[str, Any]: Decoded object
+
+        Raises:
+            ValueError: If the text is not valid JSON
+        """
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Cannot parse result as JSON: {e}")
@@ -2,20 +2,51 @@
 Audio transcription module using Google Gemini API.
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import mimetypes
 import os
 import random
 import string
+import sys
 import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from io import BytesIO
-from typing import Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from google import genai
-from magic import Magic
+from google.genai import errors, types
+from pydantic import BaseModel
+
+from .batch import (
+    BATCH_FILE_PREFIX,
+    TERMINAL_STATES,
+    BatchBackend,
+    GeminiBatchBackend,
+    build_batch_request,
+    load_batch_state,
+    save_batch_state,
+)
+from .cache import TranscriptionCache
+from .concurrency import iter_completed
+from .file_manager import UploadRegistry
+from .hedging import run_hedged, run_hedged_async
+from .key_pool import API_KEYS_ENV_VAR, APIKeyPool
+from .metrics import emit, get_token_usage, make_event, measure_stage
+from .mime import SNIFF_BYTES, sniff_audio_mime
+from .packing import get_pack_prompt, plan_packs, split_packed_results
+from .retry import RetryError, RetryPolicy
+from .streaming import JSONArrayStreamParser
+
+if TYPE_CHECKING:
+    # Both import pydub and NumPy, they are imported when audio is decoded or split
+    from .decoded_audio import DecodedAudio
+    from .segmenter import AudioSegmenter
 
-# Initialize with mime=True to get MIME type instead of description
-magic = Magic(mime=True)
 
 # Ensure mimetypes is initialized
 mimetypes.init()
@@ -45,31 +76,440 @@ DEFAULT_PROMPT = """
 4. Do not include any commentary or content outside the specified JSON format.
 """
 
+# Inline request data is limited to 20 MB in total, keep room for base64 overhead and the prompt
+DEFAULT_INLINE_MAX_BYTES = 10 * 1024 * 1024
+
+# Gemini represents each second of audio as 32 tokens
+AUDIO_TOKENS_PER_SECOND = 32
+
+# Bytes per second assumed for compressed audio when the duration cannot be read (128 kbps)
+ESTIMATED_BYTES_PER_SECOND = 16000
+
+# Maximum number of clips sent in one packed request
+DEFAULT_PACK_MAX_CLIPS = 20
+
+# Number of leading bytes passed to libmagic when the header is not recognized
+MAGIC_BYTES = 2048
+
+
+@functools.lru_cache(maxsize=None)
+def _get_magic():
+    """
+    Get libmagic MIME detector, loaded on first use since opening the magic database is slow.
+
+    Returns:
+        magic.Magic: Detector returning MIME types instead of descriptions
+    """
+    from magic import Magic
+
+    return Magic(mime=True)
+
+
+def _is_decoded_audio(value: Any) -> bool:
+    """
+    Check whether a value is DecodedAudio without importing pydub and NumPy.
+
+    Args:
+        value: Audio input
+
+    Returns:
+        bool: True for DecodedAudio, which requires its module to have been imported
+    """
+    module = sys.modules.get(f"{__package__}.decoded_audio")
+    return module is not None and isinstance(value, module.DecodedAudio)
+
+
+class TranscriptSegment(BaseModel):
+    """
+    Schema of one transcription result requested with structured output.
+    """
+
+    text: str
+    description: str
+
+
+class PackedClip(BaseModel):
+    """
+    Schema of the results of one clip of a packed request.
+    """
+
+    clip: int
+    results: List[TranscriptSegment]
+
+
+# REST form of the list[TranscriptSegment] response schema, used in batch requests
+TRANSCRIPT_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"text": {"type": "STRING"}, "description": {"type": "STRING"}},
+        "required": ["text", "description"],
+    },
+}
+
+
+class _AudioRequest:
+    """
+    State of one transcription request: the prepared audio, the API key it is sent with
+    and its uploaded file, if any.
+    """
+
+    def __init__(
+        self,
+        transcriber,
+        file_source,
+        file_data: bytes,
+        filename: str,
+        mime_type: str,
+        duration_s: Optional[float] = None,
+    ):
+        """
+        Initialize _AudioRequest.
+
+        Args:
+            transcriber (AudioTranscriber): Transcriber sending the request
+            file_source: File source for upload (path or BytesIO)
+            file_data: File content as bytes
+            filename: File name
+            mime_type: MIME type of the file
+            duration_s: Duration (s) of the audio if known, used for the token estimate
+        """
+        self.transcriber = transcriber
+        self.file_source = file_source
+        self.filename = filename
+        self.mime_type = mime_type
+        self.size = len(file_data)
+        self.uploaded_file = None
+        self.attempts = 0
+
+        # Last error that dropped the uploaded file or cached prompt, retrying fixes it
+        self._stale_error: Optional[Exception] = None
+        # Errors of calls whose cached prompt was gone, reported by each call since hedged
+        # calls of this request run at the same time
+        self._cache_errors: List[Exception] = []
+
+        # Client and registry of the current API key, chosen per attempt when a key pool is used
+        self.key = None
+        self.client = transcriber.client
+        self.upload_registry = transcriber.upload_registry
+        self._attempt_active = False
+
+        # Estimate request size for the rate limiter
+        self.estimated_tokens = transcriber._estimate_tokens(file_data, mime_type, duration_s)
+
+        # Small clips are sent inline with the request instead of through the Files API
+        self.inline = len(file_data) <= transcriber.inline_max_bytes
+        self.inline_part = None
+        if self.inline:
+            self.inline_part = types.Part.from_bytes(data=file_data, mime_type=mime_type)
+            print(f"Sending file {filename} inline ({len(file_data)} bytes)")
+
+    def _prepare_upload(self) -> Optional[Dict[str, str]]:
+        """
+        Drop expired upload and get upload config if the file has to be uploaded.
+
+        Returns:
+            Dict[str, str], optional: Upload config, None if the current upload can be reused
+        """
+        # Delete previously uploaded file if it expired
+        if self.uploaded_file and self.transcriber._is_file_expired(self.uploaded_file):
+            print(f"Uploaded file {self.uploaded_file.name} expired, will upload again")
+            self.upload_registry.release(self.uploaded_file.name)
+            self.uploaded_file = None
+
+        # Upload only once, generation retries reuse the uploaded file
+        if self.uploaded_file is not None:
+            return None
+
+        # Reset file to beginning before upload
+        if isinstance(self.file_source, BytesIO) and hasattr(self.file_source, "seek"):
+            self.file_source.seek(0)
+
+        return {
+            "mime_type": self.mime_type,
+            "display_name": self.upload_registry.make_display_name(self.filename),
+        }
+
+    def _set_uploaded_file(self, uploaded_file) -> None:
+        """
+        Track a newly uploaded file.
+
+        Args:
+            uploaded_file: File returned by the Files API
+        """
+        self.uploaded_file = uploaded_file
+        self.upload_registry.register(uploaded_file)
+        print(f"Uploaded file {self.filename} with ID: {uploaded_file.name}")
+
+    def get_audio_part(self):
+        """
+        Get audio content for the request, uploading the file if needed.
+
+        Returns:
+            Inline Part or uploaded File
+        """
+        if self.inline:
+            return self.inline_part
+        config = self._prepare_upload()
+        if config is not None:
+            with measure_stage(
+                self.transcriber.metrics, "upload", file=self.filename, bytes_in=self.size, retries=self.retries
+            ):
+                self._set_uploaded_file(
+                    self.client.files.upload(file=self.file_source, config=config)
+                )
+        return self.uploaded_file
+
+    async def get_audio_part_async(self):
+        """
+        Coroutine counterpart of get_audio_part.
+
+        Returns:
+            Inline Part or uploaded File
+        """
+        if self.inline:
+            return self.inline_part
+        config = self._prepare_upload()
+        if config is not None:
+            with measure_stage(
+                self.transcriber.metrics, "upload", file=self.filename, bytes_in=self.size, retries=self.retries
+            ):
+                self._set_uploaded_file(
+                    await self.client.aio.files.upload(file=self.file_source, config=config)
+                )
+        return self.uploaded_file
+
+    @property
+    def retries(self) -> int:
+        """
+        Number of attempts before the current one.
+        """
+        return max(0, self.attempts - 1)
+
+    @property
+    def scope(self) -> Optional[str]:
+        """
+        Rate limiter scope of the current API key, None without a key pool.
+        """
+        return self.key.label if self.key is not None else None
+
+    def begin_attempt(self) -> None:
+        """
+        Start an attempt, choosing the API key from the transcriber's key pool if it has one.
+
+        The key of the previous attempt is kept while it is healthy, so an uploaded file can be
+        reused. When the request moves to another key, the file is uploaded again with that key.
+        """
+        self.attempts += 1
+        pool = self.transcriber.key_pool
+        if pool is None:
+            return
+
+        key = pool.acquire(preferred=self.key)
+        if key is not self.key:
+            if self.uploaded_file is not None:
+                print(f"Switching file {self.filename} to API key {key.label}, will upload again")
+                self.upload_registry.release(self.uploaded_file.name)
+                self.uploaded_file = None
+            self.key = key
+            self.client = key.client
+            self.upload_registry = key.upload_registry
+        self._attempt_active = True
+
+    def end_attempt(self, error: Optional[Exception] = None) -> None:
+        """
+        Finish the current attempt and report its outcome to the key pool.
+
+        Args:
+            error: Error raised by the attempt, if any
+        """
+        if not self._attempt_active:
+            return
+        self._attempt_active = False
+        retry_after = self.transcriber.retry_policy.get_retry_after(error) if error is not None else None
+        self.transcriber.key_pool.release(self.key, error, retry_after)
+
+    def begin_hedge(self) -> Callable[[], None]:
+        """
+        Count a hedged duplicate of the current attempt as in flight on its API key.
+
+        Returns:
+            Callable[[], None]: Function releasing the duplicate once both calls of the race are
+                done, even if the losing call outlives the attempt
+        """
+        pool = self.transcriber.key_pool
+        key = self.key
+        if key is None:
+            return lambda: None
+        pool.add_request(key)
+        return lambda: pool.release(key)
+
+    def handle_error(self, error: Exception) -> None:
+        """
+        Finish the current attempt with an error and drop the uploaded file if the error
+        means it can no longer be used.
+
+        Args:
+            error: Error raised while calling Gemini API
+        """
+        self.end_attempt(error)
+        self._stale_error = None
+        if any(error is cache_error for cache_error in self._cache_errors):
+            self._stale_error = error
+        self._cache_errors = []
+        if self.transcriber._is_file_error(error, self.uploaded_file):
+            print(f"Uploaded file {self.uploaded_file.name} is no longer available, will upload again")
+            self.upload_registry.release(self.uploaded_file.name)
+            self.uploaded_file = None
+            self._stale_error = error
+
+    def handle_cache_error(self, error: Exception, cached_content: Optional[str]) -> None:
+        """
+        Drop the cached prompt a failed call referenced if the error means it is gone.
+
+        Args:
+            error: Error raised by the call
+            cached_content: Name of the cached content the call referenced, None if the prompt
+                was sent inline
+        """
+        prompt_cache = self.transcriber.prompt_cache
+        if cached_content and prompt_cache is not None and prompt_cache.is_cache_error(error):
+            print(f"Cached prompt {cached_content} is no longer available, will cache it again")
+            prompt_cache.invalidate(cached_content)
+            self._cache_errors.append(error)
+
+    def is_stale_error(self, error: Exception) -> bool:
+        """
+        Check whether an error dropped the uploaded file or cached prompt of this request,
+        so another attempt uploads or caches it again. Used as retry_if of the retry policy.
+
+        Args:
+            error: Error raised by the last attempt
+
+        Returns:
+            bool: True if handle_error dropped a stale resource because of this error
+        """
+        return error is self._stale_error
+
+    def release(self) -> None:
+        """
+        Finish any open attempt and hand uploaded file over to the janitor, deletion does
+        not block the caller.
+        """
+        self.end_attempt()
+        if self.uploaded_file and hasattr(self.uploaded_file, "name"):
+            self.upload_registry.release(self.uploaded_file.name)
+            self.uploaded_file = None
+
 
 class AudioTranscriber:
     """
     Class for audio transcription using Google Gemini API.
     """
 
-    def __init__(self, api_key=None, model="gemini-2.0-flash", custom_prompt=None):
+    def __init__(
+        self,
+        api_key=None,
+        model="gemini-2.0-flash",
+        custom_prompt=None,
+        inline_max_bytes=DEFAULT_INLINE_MAX_BYTES,
+        upload_registry=None,
+        rate_limiter=None,
+        retry_policy=None,
+        cache=None,
+        structured_output=None,
+        upload_encoder=None,
+        key_pool=None,
+        hedge_policy=None,
+        metrics=None,
+        prompt_cache=None,
+    ):
         """
         Initialize AudioTranscriber.
         
         Args:
-            api_key (str, optional): Google Gemini API key. If None, will be retrieved from environment.
+            api_key (str or list, optional): Google Gemini API key, or a list of keys to create a key pool.
+                If None, will be retrieved from environment.
             model (str): Gemini model name used for transcription.
             custom_prompt (str, optional): Custom prompt for the transcription. If None, default prompt will be used.
+            inline_max_bytes (int): Files up to this size are sent inline with the request instead of
+                being uploaded through the Files API. Set to 0 to always upload.
+            upload_registry (UploadRegistry, optional): Registry tracking uploaded files and deleting them
+                in the background. If None, a registry bound to this transcriber's client is created.
+                Ignored with a key pool, which has one registry per key.
+            rate_limiter (RateLimiter, optional): Client-side rate limiter applied before every generation
+                request. Can be shared between transcribers. If None, requests are not limited.
+            retry_policy (RetryPolicy, optional): Policy used to retry failed requests. The max_retries
+                argument of each call overrides its maximum number of attempts. If None, a default
+                RetryPolicy is used.
+            cache (TranscriptionCache, optional): Persistent cache of transcription results keyed on the
+                audio content, model, prompt and generation config. If None, results are not cached.
+            structured_output (bool, optional): Whether to request JSON output constrained to the
+                TranscriptSegment list schema. If None, it is enabled for the default prompt only,
+                since custom prompts may ask for a different structure.
+            upload_encoder (AudioEncoder, optional): Encoder converting audio to compact mono audio before
+                it is sent to Gemini. If None, audio is sent in its original format.
+            key_pool (APIKeyPool, optional): Pool of API keys that requests are spread over. If None, a pool
+                is created when api_key is a list or GOOGLE_API_KEYS is set, otherwise a single key is used.
+            hedge_policy (HedgePolicy, optional): Policy for sending a duplicate generation request, optionally
+                to a fallback model, when a request is slower than a latency percentile. Not used for
+                streaming. If None, requests are not hedged.
+            metrics (callable, optional): Callback receiving a dict event for every MIME detection, encoding,
+                upload, generation and parse stage, e.g. a MetricsCollector. If None, no events are emitted.
+            prompt_cache (PromptCache, optional): Cache keeping the prompt in server-side cached content, so
+                requests reference it instead of resending it. The prompt is sent inline whenever caching is
+                unavailable. If None, the prompt is sent with every request.
         
         Raises:
             ValueError: If no API key is provided and GOOGLE_API_KEY environment variable is not set.
         """
-        self.api_key = self._get_api_key(api_key)
+        self.key_pool = key_pool or self._get_key_pool(api_key)
+        # Pools and registries created here are closed by close, passed-in ones by their owner
+        self._owns_key_pool = key_pool is None and self.key_pool is not None
+        self._owns_upload_registry = False
+        if self.key_pool is not None:
+            # Requests choose their key from the pool, the first key serves as default client
+            default_key = self.key_pool.keys[0]
+            self.api_key = default_key.api_key
+            self.client = default_key.client
+            self.upload_registry = default_key.upload_registry
+        else:
+            self.api_key = self._get_api_key(api_key)
+            self.client = genai.Client(api_key=self.api_key)
+            self.upload_registry = upload_registry or UploadRegistry(self.client)
+            self._owns_upload_registry = upload_registry is None
         self.model = model
-        self.client = genai.Client(api_key=self.api_key)
+        self.inline_max_bytes = inline_max_bytes
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.upload_encoder = upload_encoder
+        self.hedge_policy = hedge_policy
+        self.metrics = metrics
+        self.prompt_cache = prompt_cache
         
         # Use custom prompt if provided, otherwise use default
         self.prompt = custom_prompt if custom_prompt else self._get_default_prompt()
+
+        # Schema-constrained output matches the structure requested by the default prompt
+        self.structured_output = not custom_prompt if structured_output is None else structured_output
     
+    def close(self) -> None:
+        """
+        Delete remaining uploaded files and stop the janitor threads of the upload registries
+        and key pool created by this transcriber. Registries and pools passed in are left open.
+        """
+        if self._owns_key_pool:
+            self.key_pool.close()
+        if self._owns_upload_registry:
+            self.upload_registry.close()
+
+    def __enter__(self) -> "AudioTranscriber":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
     def _get_api_key(self, api_key=None):
         """
         Get Google Gemini API key with the following priority:
@@ -94,6 +534,30 @@ class AudioTranscriber:
         # API key not found
         raise ValueError("API key not provided. Please pass API key when initializing or set the GOOGLE_API_KEY environment variable")
     
+    def _get_key_pool(self, api_key=None) -> Optional[APIKeyPool]:
+        """
+        Create API key pool with the following priority:
+        1. From api_key parameter if it is a list of keys
+        2. From GOOGLE_API_KEYS environment variable (comma-separated) if no single key is passed
+
+        Returns:
+            APIKeyPool, optional: Key pool, None if a single key is used
+        """
+        if isinstance(api_key, (list, tuple)):
+            return APIKeyPool(api_key)
+        if not api_key and os.environ.get(API_KEYS_ENV_VAR, "").strip():
+            return APIKeyPool.from_env()
+        return None
+
+    def get_key_usage(self) -> List[Dict[str, Any]]:
+        """
+        Get per-key usage of the key pool.
+
+        Returns:
+            List[Dict[str, Any]]: Usage of each key, see APIKeyPool.usage. Empty without a key pool.
+        """
+        return self.key_pool.usage() if self.key_pool is not None else []
+
     def _get_default_prompt(self):
         """
         Returns the default transcription prompt.
@@ -133,6 +597,319 @@ class AudioTranscriber:
             print(f"Response text: {response_text}")
             raise ValueError(f"Cannot parse result as JSON: {e}")
 
+    def _is_file_expired(self, uploaded_file, margin_s: float = 60) -> bool:
+        """
+        Check whether an uploaded file has expired or is about to expire.
+
+        Args:
+            uploaded_file: File returned by the Files API
+            margin_s: Files expiring within this many seconds are treated as expired
+
+        Returns:
+            bool: True if the file should be uploaded again
+        """
+        expiration_time = getattr(uploaded_file, "expiration_time", None)
+        if expiration_time is None:
+            return False
+        if expiration_time.tzinfo is None:
+            expiration_time = expiration_time.replace(tzinfo=timezone.utc)
+        return expiration_time - timedelta(seconds=margin_s) <= datetime.now(timezone.utc)
+
+    def _is_file_error(self, error: Exception, uploaded_file) -> bool:
+        """
+        Check whether an error means an uploaded file can no longer be used.
+
+        403 and 404 errors are only attributed to the file if they name it, so errors
+        about the model or the API key are not mistaken for a stale upload.
+
+        Args:
+            error: Error raised while calling Gemini API
+            uploaded_file: File the request referenced, None for inline requests
+
+        Returns:
+            bool: True if the file is missing, expired or not accessible
+        """
+        if uploaded_file is None:
+            return False
+        error_message = str(error).lower()
+        file_name = (getattr(uploaded_file, "name", None) or "").lower()
+        if file_name and file_name in error_message:
+            return isinstance(error, errors.ClientError) and error.code in (400, 403, 404)
+        return "file" in error_message and (
+            "not found" in error_message
+            or "expired" in error_message
+            or "not exist" in error_message
+            or "permission" in error_message
+        )
+
+    def _get_cache_key(self, file_data: bytes) -> str:
+        """
+        Get cache key of a transcription request.
+
+        Args:
+            file_data: Full audio content as bytes
+
+        Returns:
+            str: Cache key
+        """
+        return TranscriptionCache.make_key(file_data, self._get_request_params())
+
+    def _get_request_params(self) -> Dict[str, Any]:
+        """
+        Get parameters that affect the transcription result, used for caching.
+
+        Returns:
+            Dict[str, Any]: Request parameters
+        """
+        return {
+            "model": self.model,
+            "prompt": self.prompt,
+            "structured_output": self.structured_output,
+            "upload_encoding": self.upload_encoder.get_params() if self.upload_encoder else None,
+        }
+
+    def _estimate_tokens(self, file_data: bytes, mime_type: str, duration_s: Optional[float] = None) -> int:
+        """
+        Estimate number of input tokens of a transcription request.
+
+        Args:
+            file_data: File content as bytes
+            mime_type: MIME type of the file
+            duration_s: Duration (s) of the audio if already known
+
+        Returns:
+            int: Estimated number of tokens for the audio and the prompt
+        """
+        if duration_s is None and mime_type == "audio/wav":
+            # Exact duration from WAV header
+            try:
+                with wave.open(BytesIO(file_data)) as wav_file:
+                    duration_s = wav_file.getnframes() / wav_file.getframerate()
+            except (wave.Error, EOFError):
+                pass
+        if duration_s is None:
+            # Assume a typical compressed bitrate for other formats
+            duration_s = len(file_data) / ESTIMATED_BYTES_PER_SECOND
+
+        return int(duration_s * AUDIO_TOKENS_PER_SECOND) + len(self.prompt) // 4
+
+    def _wait_for_rate_limit(self, model: str, tokens: int, scope: Optional[str] = None):
+        """
+        Wait until the rate limiter allows a request to the model.
+
+        Args:
+            model: Gemini model name
+            tokens: Estimated number of tokens of the request
+            scope: Rate limiter scope, the API key label when a key pool is used
+        """
+        if self.rate_limiter is None:
+            return
+        waited = self.rate_limiter.acquire(model, tokens, scope=scope)
+        if waited > 0:
+            print(f"Rate limiter delayed request to {model} by {waited:.1f}s")
+
+    async def _wait_for_rate_limit_async(self, model: str, tokens: int, scope: Optional[str] = None):
+        """
+        Coroutine counterpart of _wait_for_rate_limit.
+
+        Args:
+            model: Gemini model name
+            tokens: Estimated number of tokens of the request
+            scope: Rate limiter scope, the API key label when a key pool is used
+        """
+        if self.rate_limiter is None:
+            return
+        waited = await self.rate_limiter.acquire_async(model, tokens, scope=scope)
+        if waited > 0:
+            print(f"Rate limiter delayed request to {model} by {waited:.1f}s")
+
+    def _get_retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Get delay before the next attempt, skipping the wait when a quota error can be
+        retried right away with another key of the key pool.
+
+        Args:
+            attempt: Number of the failed attempt, starting at 1
+            error: Error raised by the failed attempt
+
+        Returns:
+            float: Delay in seconds
+        """
+        if (
+            self.key_pool is not None
+            and self.key_pool.is_quota_error(error)
+            and self.key_pool.has_available_key()
+        ):
+            return 0.0
+        return self.retry_policy.get_delay(attempt, error)
+
+    def _log_retry(self, error: Exception, attempt: int, delay: float):
+        """
+        Report a failed attempt that is about to be retried.
+
+        Args:
+            error: Error raised by the failed attempt
+            attempt: Number of the failed attempt, starting at 1
+            delay: Delay (s) before the next attempt
+        """
+        print(f"Error calling API (attempt {attempt}): {error}. Retrying after {delay:.1f}s...")
+
+    def _get_generation_config(self) -> Optional[types.GenerateContentConfig]:
+        """
+        Get generation config of transcription requests.
+
+        Returns:
+            types.GenerateContentConfig, optional: Config requesting JSON output with the
+                TranscriptSegment list schema if structured output is enabled, otherwise None
+        """
+        if not self.structured_output:
+            return None
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=list[TranscriptSegment],
+        )
+
+    def _get_generation_request(
+        self, request: _AudioRequest, model: str, audio_part
+    ) -> Tuple[List[Any], Optional[types.GenerateContentConfig], Optional[str]]:
+        """
+        Get contents and config of a generation request, referencing the cached prompt if available.
+
+        Args:
+            request: Request state
+            model: Gemini model name
+            audio_part: Inline Part or uploaded File
+
+        Returns:
+            Tuple: (contents, generation config, name of the referenced cached content or None).
+                The name belongs to this call and is passed to request.handle_cache_error if it fails.
+        """
+        config = self._get_generation_config()
+        cached_content = None
+        if self.prompt_cache is not None:
+            cached_content = self.prompt_cache.get(request.client, model, self.prompt, request.scope)
+        if cached_content is None:
+            return [self.prompt, audio_part], config, None
+
+        if config is None:
+            config = types.GenerateContentConfig(cached_content=cached_content)
+        else:
+            config = config.model_copy(update={"cached_content": cached_content})
+        return [audio_part], config, cached_content
+
+    def _get_batch_generation_config(self) -> Optional[Dict[str, Any]]:
+        """
+        Get generation config of batch requests in REST JSON form.
+
+        Returns:
+            Dict[str, Any], optional: Config requesting JSON output with the TranscriptSegment
+                list schema if structured output is enabled, otherwise None
+        """
+        if not self.structured_output:
+            return None
+        return {"responseMimeType": "application/json", "responseSchema": TRANSCRIPT_RESPONSE_SCHEMA}
+
+    def _get_pack_generation_config(self) -> Optional[types.GenerateContentConfig]:
+        """
+        Get generation config of packed requests.
+
+        Returns:
+            types.GenerateContentConfig, optional: Config requesting JSON output with the PackedClip
+                list schema if structured output is enabled, otherwise None
+        """
+        if not self.structured_output:
+            return None
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=list[PackedClip],
+        )
+
+    def _parse_generation(self, response) -> List[Dict[str, str]]:
+        """
+        Get transcription results from a Gemini API response.
+
+        Results parsed by the client against the response schema are used directly, the
+        response text is only scraped for JSON when no parsed result is available.
+
+        Args:
+            response: Response of generate_content
+
+        Returns:
+            List[Dict[str, str]]: List of parsed transcription results
+
+        Raises:
+            ValueError: If response cannot be parsed as JSON
+        """
+        parsed = getattr(response, "parsed", None) if self.structured_output else None
+        if isinstance(parsed, list):
+            return [
+                item.model_dump() if isinstance(item, TranscriptSegment) else dict(item)
+                for item in parsed
+            ]
+        return self._parse_response(response.text)
+
+    def _measure_generation(self, request: _AudioRequest, model: str):
+        """
+        Measure one generation call.
+
+        Args:
+            request: Request state
+            model: Gemini model name
+
+        Returns:
+            Context manager yielding the generation event
+        """
+        return measure_stage(
+            self.metrics,
+            "generation",
+            file=request.filename,
+            model=model,
+            bytes_in=request.size,
+            retries=request.retries,
+        )
+
+    def _emit_stream_generation(self, request: _AudioRequest, start: float, usage: Dict[str, Optional[int]]):
+        """
+        Report a completed streamed generation, including upload and retries before the first result.
+
+        Args:
+            request: Request state
+            start: perf_counter time before the first attempt
+            usage: Token usage from the last stream chunk carrying usage metadata
+        """
+        emit(
+            self.metrics,
+            make_event(
+                "generation",
+                file=request.filename,
+                model=self.model,
+                bytes_in=request.size,
+                retries=request.retries,
+                duration_s=time.perf_counter() - start,
+                streamed=True,
+                **usage,
+            ),
+        )
+
+    def _measure_parse(self, request: _AudioRequest, response) -> List[Dict[str, str]]:
+        """
+        Parse a generation response and report the parse stage.
+
+        Args:
+            request: Request state
+            response: Response of generate_content
+
+        Returns:
+            List[Dict[str, str]]: List of parsed transcription results
+        """
+        text = response.text or ""
+        with measure_stage(
+            self.metrics, "parse", file=request.filename, bytes_in=len(text.encode("utf-8"))
+        ) as event:
+            results = self._parse_generation(response)
+            event["results"] = len(results)
+        return results
+
     def _generate_random_string(self, length: int = 20) -> str:
         """
         Generate a random string of specified length.
@@ -156,14 +933,17 @@ class AudioTranscriber:
         Returns:
             str: Standardized MIME type
         """
-        # Use python-magic to get MIME type from file content
-        magic_mime = magic.from_buffer(file_data)
+        # Recognize common audio formats from the header only
+        sniffed_mime = sniff_audio_mime(file_data[:SNIFF_BYTES])
+        if sniffed_mime:
+            return sniffed_mime
+
+        # Fall back to python-magic for unknown headers, reading only the beginning of the file
+        magic_mime = _get_magic().from_buffer(file_data[:MAGIC_BYTES])
 
         # Use mimetypes to get MIME type from filename
         filename_mime, _ = mimetypes.guess_type(filename)
 
-        print(f"MIME from magic: {magic_mime}, MIME from filename: {filename_mime}")
-
         # Map common MIME types to standardized form
         mime_mapping = {
             "audio/x-wav": "audio/wav",
@@ -193,176 +973,1269 @@ class AudioTranscriber:
         # If type cannot be determined, return default magic_mime
         return magic_mime
 
-    def transcribe(
-        self, 
-        file: Union[str, BytesIO],
-        max_retries: int = 5
-    ) -> List[Dict[str, str]]:
+    def _prepare_file(
+        self, file: Union[str, BytesIO, "DecodedAudio"]
+    ) -> Tuple[Union[str, BytesIO, "DecodedAudio"], bytes, str, str]:
         """
-        Transcribe audio file content using Google Gemini API.
+        Read input file and determine its filename and normalized MIME type.
 
         Args:
-            file: Path to audio file or BytesIO object
-            max_retries: Maximum number of retry attempts on error
+            file: Path to audio file, BytesIO object or DecodedAudio
 
         Returns:
-            List[Dict[str, str]]: Transcription results as JSON
+            Tuple: (file source for upload, file content as bytes, filename, MIME type). The file
+                source of DecodedAudio is the DecodedAudio itself.
 
         Raises:
             ValueError: If file format is not supported
-            RuntimeError: If transcription fails after maximum retries
         """
-        # Variable to track uploaded file
-        uploaded_file = None
+        # Decoded audio is sent as WAV, its samples are reused by the encoder
+        if _is_decoded_audio(file):
+            file_data = file.to_wav_bytes()
+            filename = file.get_wav_name() or f"audio_{self._generate_random_string()}.wav"
+            print(f"Using MIME type: audio/wav for decoded audio {filename}")
+            return file, file_data, filename, "audio/wav"
 
         # Create a copy of file to avoid affecting the original object
         if isinstance(file, BytesIO):
             # Create safe copy of BytesIO
             file.seek(0)
             file_copy = BytesIO(file.getvalue())
+            # Keep name of original object for filename detection
+            if hasattr(file, "name") and file.name:
+                file_copy.name = file.name
             # Reset pointer to beginning on both original and copy
             file.seek(0)  # Reset original file for other processing
             file = file_copy  # Use copy for our processing
 
-        try:
-            # Process input file and prepare config
-            if isinstance(file, str):
-                with open(file, "rb") as f:
-                    file_data = f.read()
-                filename = os.path.basename(file)
-                file_source = file  # Store original path
-            elif isinstance(file, BytesIO):
-                # BytesIO was already reset to beginning when copy was created
-                file_data = file.getvalue()
-
-                # Determine filename
-                if hasattr(file, "name") and file.name:
-                    filename = os.path.basename(file.name)
-                else:
-                    filename = f"audio_{self._generate_random_string()}.wav"
-
-                file_source = file  # File source is the BytesIO copy
+        if isinstance(file, str):
+            with open(file, "rb") as f:
+                file_data = f.read()
+            filename = os.path.basename(file)
+            file_source = file  # Store original path
+        elif isinstance(file, BytesIO):
+            # BytesIO was already reset to beginning when copy was created
+            file_data = file.getvalue()
+
+            # Determine filename
+            if hasattr(file, "name") and file.name:
+                filename = os.path.basename(file.name)
             else:
-                raise ValueError("File format not supported")
+                filename = f"audio_{self._generate_random_string()}.wav"
+
+            file_source = file  # File source is the BytesIO copy
+        else:
+            raise ValueError("File format not supported")
 
-            # Determine normalized MIME type
+        # Determine normalized MIME type
+        with measure_stage(self.metrics, "mime_detection", file=filename, bytes_in=len(file_data)) as event:
             mime_type = self._get_normalized_mime_type(file_data, filename)
-            config = {"mime_type": mime_type}
-            print(f"Using MIME type: {mime_type} for file {filename}")
+            event["mime_type"] = mime_type
+        print(f"Using MIME type: {mime_type} for file {filename}")
 
-            # Try upload and process with retry
-            for attempt in range(max_retries):
-                try:
-                    # Delete previously uploaded file if exists
-                    if uploaded_file:
+        return file_source, file_data, filename, mime_type
+
+    def _encode_audio(
+        self, file_data: bytes, filename: str, mime_type: str, decoded: Optional["DecodedAudio"] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Encode audio with the upload encoder.
+
+        Args:
+            file_data: File content as bytes
+            filename: File name
+            mime_type: MIME type of the file
+            decoded: Decoded samples of the file, if available
+
+        Returns:
+            Dict[str, Any], optional: Result of AudioEncoder.encode with "filename" of the encoded
+                audio, None if no encoder is set or the original audio is sent
+        """
+        if self.upload_encoder is None:
+            return None
+
+        with measure_stage(self.metrics, "encoding", file=filename, bytes_in=len(file_data)) as event:
+            try:
+                encoded = self.upload_encoder.encode(file_data, mime_type, decoded=decoded)
+            except ValueError as e:
+                print(f"Could not encode file {filename}: {e}. Sending original audio.")
+                encoded = None
+            event["bytes_out"] = encoded["encoded_bytes"] if encoded else len(file_data)
+            event["format"] = encoded["format"] if encoded else None
+
+        if encoded is None:
+            return None
+
+        print(
+            f"Encoded file {filename} as {encoded['format']}: {encoded['original_bytes']} -> "
+            f"{encoded['encoded_bytes']} bytes ({encoded['bytes_saved']} bytes saved)"
+        )
+        encoded["filename"] = f"{os.path.splitext(filename)[0]}.{encoded['extension']}"
+        return encoded
+
+    def _create_request(
+        self, file_source: Union[str, BytesIO, "DecodedAudio"], file_data: bytes, filename: str, mime_type: str
+    ) -> _AudioRequest:
+        """
+        Create request state for a prepared file, encoding the audio first if an encoder is set.
+
+        Args:
+            file_source: File source for upload (path, BytesIO or DecodedAudio)
+            file_data: File content as bytes
+            filename: File name
+            mime_type: MIME type of the file
+
+        Returns:
+            _AudioRequest: Request state
+        """
+        decoded = file_source if _is_decoded_audio(file_source) else None
+        encoded = self._encode_audio(file_data, filename, mime_type, decoded=decoded)
+        if encoded is None:
+            if decoded is not None:
+                file_source = BytesIO(file_data)
+            return _AudioRequest(self, file_source, file_data, filename, mime_type)
+
+        encoded_source = BytesIO(encoded["data"])
+        encoded_source.name = encoded["filename"]
+        return _AudioRequest(
+            self,
+            encoded_source,
+            encoded["data"],
+            encoded_source.name,
+            encoded["mime_type"],
+            duration_s=encoded["duration_s"],
+        )
+
+    def transcribe(
+        self, 
+        file: Union[str, BytesIO, "DecodedAudio"],
+        max_retries: int = 5,
+    ) -> List[Dict[str, str]]:
+        """
+        Transcribe audio file content using Google Gemini API.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+            max_retries: Maximum number of retry attempts on error
+
+        Returns:
+            List[Dict[str, str]]: Transcription results as JSON
+
+        Raises:
+            ValueError: If file format is not supported
+            RuntimeError: If transcription fails after maximum retries (RetryError)
+        """
+        # Variable to track request state and uploaded file
+        request = None
+
+        try:
+            # Process input file
+            file_source, file_data, filename, mime_type = self._prepare_file(file)
+
+            # Return cached results without calling the API
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._get_cache_key(file_data)
+                cached_results = self.cache.get(cache_key)
+                if cached_results is not None:
+                    print(f"Using cached transcription for file {filename}")
+                    return cached_results
+
+            request = self._create_request(file_source, file_data, filename, mime_type)
+
+            def attempt_transcription(model: str) -> List[Dict[str, str]]:
+                request.begin_attempt()
+                try:
+                    audio_part = request.get_audio_part()
+
+                    def generate(target_model: str) -> List[Dict[str, str]]:
+                        # Call Gemini API
+                        self._wait_for_rate_limit(target_model, request.estimated_tokens, request.scope)
+                        contents, config, cached_content = self._get_generation_request(
+                            request, target_model, audio_part
+                        )
                         try:
-                            self.client.files.delete(name=uploaded_file.name)
-                            print(f"Deleted previous temporary file: {uploaded_file.name}")
+                            with self._measure_generation(request, target_model) as event:
+                                response = request.client.models.generate_content(
+                                    model=target_model,
+                                    contents=contents,
+                                    config=config,
+                                )
+                                event.update(get_token_usage(response))
+                                event["bytes_out"] = len((response.text or "").encode("utf-8"))
                         except Exception as e:
-                            print(f"Could not delete temporary file: {str(e)}")
+                            request.handle_cache_error(e, cached_content)
+                            raise
 
-                    # Reset file to beginning before upload
-                    if isinstance(file_source, BytesIO) and hasattr(file_source, "seek"):
-                        file_source.seek(0)
+                        # Parse JSON result
+                        return self._measure_parse(request, response)
 
-                    # Upload file
-                    uploaded_file = self.client.files.upload(file=file_source, config=config)
-                    print(f"Uploaded file {filename} with ID: {uploaded_file.name}")
+                    # Send a duplicate request if the generation is slower than usual
+                    results = run_hedged(generate, model, self.hedge_policy, request.begin_hedge)
+                except Exception as e:
+                    request.handle_error(e)
+                    raise
+                request.end_attempt()
+                return results
+
+            # Try upload and process with retry
+            try:
+                results = self.retry_policy.call(
+                    attempt_transcription,
+                    self.model,
+                    max_attempts=max_retries,
+                    retry_if=request.is_stale_error,
+                    on_retry=self._log_retry,
+                    delay_func=self._get_retry_delay,
+                )
+            except RetryError as e:
+                # If model is still overloaded, try non-lite model once
+                if not ("-lite" in self.model and self.retry_policy.is_overloaded(e.last_error)):
+                    raise
+                non_lite_model = self.model.replace("-lite", "")
+                print(f"Trying with non-lite model: {non_lite_model}")
+                try:
+                    results = attempt_transcription(non_lite_model)
+                except Exception as model_e:
+                    print(f"Not successful with model {non_lite_model}: {model_e}")
+                    raise e
+                print(f"Successfully transcribed with model {non_lite_model}")
+
+            print(f"Successfully transcribed file {filename}: {len(results)} results")
+            if cache_key is not None:
+                self.cache.set(cache_key, results)
+            return results
+
+        finally:
+            if request is not None:
+                request.release()
+
+    def transcribe_stream(
+        self,
+        file: Union[str, BytesIO, "DecodedAudio"],
+        max_retries: int = 5,
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Transcribe audio file and yield each result as soon as it is generated.
+
+        The response is streamed from Gemini API and parsed incrementally, so alignment or a
+        UI can start on the first segments while generation continues. Failures before the
+        first segment is yielded are retried; once results have been yielded, errors are raised.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+            max_retries: Maximum number of retry attempts on error before the first result
+
+        Yields:
+            Dict[str, str]: Transcription results in order
+
+        Raises:
+            ValueError: If file format is not supported or the streamed response is not valid JSON
+            RuntimeError: If transcription fails after maximum retries (RetryError)
+        """
+        # Variable to track request state and uploaded file
+        request = None
+
+        try:
+            # Process input file
+            file_source, file_data, filename, mime_type = self._prepare_file(file)
+
+            # Return cached results without calling the API
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._get_cache_key(file_data)
+                cached_results = self.cache.get(cache_key)
+                if cached_results is not None:
+                    print(f"Using cached transcription for file {filename}")
+                    yield from cached_results
+                    return
+
+            request = self._create_request(file_source, file_data, filename, mime_type)
+
+            def open_stream():
+                # The attempt stays open while the stream is read and ends when the request is released
+                request.begin_attempt()
+                cached_content = None
+                try:
+                    audio_part = request.get_audio_part()
 
                     # Call Gemini API
-                    response = self.client.models.generate_content(
-                        model=self.model,
-                        contents=[self.prompt, uploaded_file],
+                    self._wait_for_rate_limit(self.model, request.estimated_tokens, request.scope)
+                    contents, config, cached_content = self._get_generation_request(request, self.model, audio_part)
+                    stream = iter(
+                        request.client.models.generate_content_stream(
+                            model=self.model,
+                            contents=contents,
+                            config=config,
+                        )
                     )
 
-                    # Get text from response
-                    response_text = response.text
+                    # Read until the first result is complete, so failures before any output are retried
+                    parser = JSONArrayStreamParser()
+                    first_results = []
+                    for chunk in stream:
+                        first_results = parser.feed(chunk.text or "")
+                        if first_results or parser.finished:
+                            break
+                    else:
+                        parser.close()
+                except Exception as e:
+                    request.handle_cache_error(e, cached_content)
+                    request.handle_error(e)
+                    raise
+
+                return stream, parser, first_results
 
-                    # Parse JSON result
-                    results = self._parse_response(response_text)
+            # Try upload and open stream with retry
+            stream_start = time.perf_counter()
+            stream, parser, first_results = self.retry_policy.call(
+                open_stream,
+                max_attempts=max_retries,
+                retry_if=request.is_stale_error,
+                on_retry=self._log_retry,
+                delay_func=self._get_retry_delay,
+            )
 
-                    print(f"Successfully transcribed file {filename}: {len(results)} results")
-                    return results
+            results = []
+            for item in first_results:
+                results.append(item)
+                yield item
 
-                except Exception as e:
-                    error_message = str(e).lower()
-                    last_attempt = attempt == max_retries - 1
-
-                    # Check different error types
-                    if "rate limit" in error_message or "quota" in error_message:
-                        # Handle rate limit by waiting
-                        print(
-                            f"Rate limit error, retrying ({attempt+1}/{max_retries})..."
-                        )
-                        time.sleep(1)  # Wait 1 second before retrying
-                    elif (
-                        "overloaded" in error_message
-                        or "unavailable" in error_message
-                        or "busy" in error_message
-                    ):
-                        # Handle model overloaded by waiting longer
-                        wait_time = min(
-                            30, 2**attempt + 1
-                        )  # Exponential backoff, max 30s
-                        print(
-                            f"Model overloaded, waiting {wait_time}s before retrying ({attempt+1}/{max_retries})..."
-                        )
-                        time.sleep(wait_time)
-
-                        # If last attempt and model is still overloaded, try non-lite model
-                        if last_attempt and "-lite" in self.model:
-                            non_lite_model = self.model.replace("-lite", "")
-                            print(f"Trying with non-lite model: {non_lite_model}")
-                            try:
-                                response = self.client.models.generate_content(
-                                    model=non_lite_model,
-                                    contents=[self.prompt, uploaded_file],
-                                )
-                                response_text = response.text
-                                results = self._parse_response(response_text)
-                                print(f"Successfully transcribed with model {non_lite_model}")
-                                return results
-                            except Exception as model_e:
-                                print(
-                                    f"Not successful with model {non_lite_model}: {model_e}"
-                                )
+            usage = {}
+            for chunk in stream:
+                if getattr(chunk, "usage_metadata", None):
+                    usage = get_token_usage(chunk)
+                for item in parser.feed(chunk.text or ""):
+                    results.append(item)
+                    yield item
+            parser.close()
+            self._emit_stream_generation(request, stream_start, usage)
+
+            print(f"Successfully transcribed file {filename}: {len(results)} results")
+            if cache_key is not None:
+                self.cache.set(cache_key, results)
+
+        finally:
+            if request is not None:
+                request.release()
 
-                        if last_attempt:
-                            print("Trying one final attempt with longer wait time...")
-                            time.sleep(10)  # Wait 10 more seconds
-                            max_retries += 1  # Add one more try
+    async def transcribe_stream_async(
+        self,
+        file: Union[str, BytesIO, "DecodedAudio"],
+        max_retries: int = 5,
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Coroutine counterpart of transcribe_stream, an asynchronous generator.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+            max_retries: Maximum number of retry attempts on error before the first result
+
+        Yields:
+            Dict[str, str]: Transcription results in order
+
+        Raises:
+            ValueError: If file format is not supported or the streamed response is not valid JSON
+            RuntimeError: If transcription fails after maximum retries (RetryError)
+        """
+        # Variable to track request state and uploaded file
+        request = None
+
+        try:
+            # Process input file, reading file without blocking the event loop
+            file_source, file_data, filename, mime_type = await asyncio.to_thread(
+                self._prepare_file, file
+            )
+
+            # Return cached results without calling the API
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._get_cache_key(file_data)
+                cached_results = await asyncio.to_thread(self.cache.get, cache_key)
+                if cached_results is not None:
+                    print(f"Using cached transcription for file {filename}")
+                    for item in cached_results:
+                        yield item
+                    return
+
+            request = await asyncio.to_thread(
+                self._create_request, file_source, file_data, filename, mime_type
+            )
 
-                    elif not last_attempt:  # If there are more attempts
-                        # Other error but still can retry
-                        wait_time = 2 * (attempt + 1)
-                        print(f"Error calling API: {e}. Retrying after {wait_time}s...")
-                        time.sleep(wait_time)
+            async def open_stream():
+                # The attempt stays open while the stream is read and ends when the request is released
+                request.begin_attempt()
+                cached_content = None
+                try:
+                    audio_part = await request.get_audio_part_async()
+
+                    # Call Gemini API
+                    await self._wait_for_rate_limit_async(self.model, request.estimated_tokens, request.scope)
+                    contents, config, cached_content = await asyncio.to_thread(
+                        self._get_generation_request, request, self.model, audio_part
+                    )
+                    stream = (
+                        await request.client.aio.models.generate_content_stream(
+                            model=self.model,
+                            contents=contents,
+                            config=config,
+                        )
+                    ).__aiter__()
+
+                    # Read until the first result is complete, so failures before any output are retried
+                    parser = JSONArrayStreamParser()
+                    first_results = []
+                    async for chunk in stream:
+                        first_results = parser.feed(chunk.text or "")
+                        if first_results or parser.finished:
+                            break
                     else:
-                        # Other error and no more attempts
-                        print(f"Error calling API: {e}")
-                        raise
+                        parser.close()
+                except Exception as e:
+                    request.handle_cache_error(e, cached_content)
+                    request.handle_error(e)
+                    raise
+
+                return stream, parser, first_results
+
+            # Try upload and open stream with retry
+            stream_start = time.perf_counter()
+            stream, parser, first_results = await self.retry_policy.call_async(
+                open_stream,
+                max_attempts=max_retries,
+                retry_if=request.is_stale_error,
+                on_retry=self._log_retry,
+                delay_func=self._get_retry_delay,
+            )
+
+            results = []
+            for item in first_results:
+                results.append(item)
+                yield item
 
-            # If all attempts were unsuccessful
-            raise RuntimeError(f"Could not transcribe after {max_retries} retry attempts")
+            usage = {}
+            async for chunk in stream:
+                if getattr(chunk, "usage_metadata", None):
+                    usage = get_token_usage(chunk)
+                for item in parser.feed(chunk.text or ""):
+                    results.append(item)
+                    yield item
+            parser.close()
+            self._emit_stream_generation(request, stream_start, usage)
+
+            print(f"Successfully transcribed file {filename}: {len(results)} results")
+            if cache_key is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, results)
 
         finally:
-            # Delete uploaded files to free resources
+            if request is not None:
+                request.release()
+
+    def transcribe_long(
+        self,
+        file: Union[str, BytesIO, "DecodedAudio"],
+        max_retries: int = 5,
+        segmenter: Optional["AudioSegmenter"] = None,
+        max_workers: int = 4,
+    ) -> List[Dict[str, str]]:
+        """
+        Transcribe long audio by splitting it at silence points into bounded windows.
+
+        Windows are transcribed concurrently and their results are stitched back in order.
+        Each result is extended with "window_index", "window_start_ms" and "window_end_ms"
+        so it can be located in the original audio.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+            max_retries: Maximum number of retry attempts on error for each window
+            segmenter: AudioSegmenter used to split the audio. If None, default settings are used.
+            max_workers: Maximum number of windows transcribed at the same time
+
+        Returns:
+            List[Dict[str, str]]: Transcription results of all windows in order
+
+        Raises:
+            ValueError: If file format is not supported
+            RuntimeError: If transcription of any window fails after maximum retries
+        """
+        if segmenter is None:
+            from .segmenter import AudioSegmenter
+
+            segmenter = AudioSegmenter()
+
+        # Split audio into windows at silence points
+        windows = segmenter.split(file)
+        print(f"Split audio into {len(windows)} windows for transcription")
+
+        # Short audio does not need to be split
+        if len(windows) == 1:
+            if isinstance(file, BytesIO):
+                file.seek(0)
+            return self.transcribe(file, max_retries=max_retries)
+
+        base_name = self._get_base_name(file)
+
+        def transcribe_window(window: Dict) -> List[Dict[str, str]]:
+            return self.transcribe(
+                self._export_window(window, base_name), max_retries=max_retries
+            )
+
+        # Transcribe windows concurrently, map keeps results in window order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            window_results = list(executor.map(transcribe_window, windows))
+
+        return self._stitch_window_results(windows, window_results)
+
+    def transcribe_many(
+        self,
+        files: Iterable[Union[str, BytesIO]],
+        max_retries: int = 5,
+        max_workers: int = 4,
+        long_audio: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Transcribe many audio files with bounded concurrency.
+
+        Gemini calls run in a worker pool of max_workers threads and results are yielded
+        as they complete, so they may come out of input order. Errors are collected per
+        file instead of aborting the whole batch.
+
+        Args:
+            files: Iterable of paths to audio files or BytesIO objects
+            max_retries: Maximum number of retry attempts on error for each file
+            max_workers: Maximum number of files transcribed at the same time
+            long_audio: Whether to split each file at silence points before transcription
+
+        Yields:
+            Dict[str, Any]: {"index": int, "input": file, "results": transcription results or None,
+                "error": exception or None}
+        """
+
+        def transcribe_file(file: Union[str, BytesIO]) -> List[Dict[str, str]]:
+            if long_audio:
+                return self.transcribe_long(file, max_retries=max_retries)
+            return self.transcribe(file, max_retries=max_retries)
+
+        for item in iter_completed(transcribe_file, files, max_workers=max_workers):
+            if item["error"] is not None:
+                print(f"Error transcribing item {item['index']}: {item['error']}")
+            yield item
+
+    def transcribe_packed(
+        self,
+        files: Iterable[Union[str, BytesIO]],
+        max_retries: int = 5,
+        max_workers: int = 4,
+        max_clips: int = DEFAULT_PACK_MAX_CLIPS,
+        max_pack_bytes: Optional[int] = None,
+        max_pack_tokens: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe many short clips, sending several clips in each Gemini request.
+
+        Clips are packed in input order up to max_clips per request and the byte and token
+        budget, each clip labelled with its index in the pack. The response is split back
+        into per-clip results; clips the model dropped or merged, clips that do not fit in a
+        pack and clips of packs that failed after all retries are transcribed individually.
+
+        Args:
+            files: Iterable of paths to audio files or BytesIO objects
+            max_retries: Maximum number of retry attempts on error for each request
+            max_workers: Maximum number of requests sent at the same time
+            max_clips: Maximum number of clips per request
+            max_pack_bytes: Maximum total audio size (bytes) of a request. If None, inline_max_bytes
+                is used, since packed audio is always sent inline.
+            max_pack_tokens: Maximum estimated audio tokens of a request. If None, tokens are not limited.
+
+        Returns:
+            List[Dict[str, Any]]: {"index": int, "input": file, "results": transcription results or None,
+                "error": exception or None} for each file, in input order
+        """
+        if max_pack_bytes is None:
+            max_pack_bytes = self.inline_max_bytes
+
+        items = []
+        clips = []
+        prompt_tokens = len(self.prompt) // 4
+        for index, file in enumerate(files):
+            item = {"index": index, "input": file, "results": None, "error": None}
+            items.append(item)
+            try:
+                file_source, file_data, filename, mime_type = self._prepare_file(file)
+                decoded = file_source if _is_decoded_audio(file_source) else None
+
+                cache_key = None
+                if self.cache is not None:
+                    cache_key = self._get_cache_key(file_data)
+                    cached_results = self.cache.get(cache_key)
+                    if cached_results is not None:
+                        print(f"Using cached transcription for file {filename}")
+                        item["results"] = cached_results
+                        continue
+
+                duration_s = None
+                encoded = self._encode_audio(file_data, filename, mime_type, decoded=decoded)
+                if encoded is not None:
+                    file_data, filename, mime_type = encoded["data"], encoded["filename"], encoded["mime_type"]
+                    duration_s = encoded["duration_s"]
+            except Exception as e:
+                item["error"] = e
+                continue
+
+            clips.append(
+                {
+                    "item": item,
+                    "data": file_data,
+                    "filename": filename,
+                    "mime_type": mime_type,
+                    # The prompt is sent once per pack, count audio tokens only
+                    "tokens": self._estimate_tokens(file_data, mime_type, duration_s) - prompt_tokens,
+                    "cache_key": cache_key,
+                }
+            )
+
+        packs = [
+            [clips[position] for position in pack]
+            for pack in plan_packs(
+                [len(clip["data"]) for clip in clips],
+                [clip["tokens"] for clip in clips],
+                max_clips,
+                max_pack_bytes,
+                max_pack_tokens,
+            )
+        ]
+
+        def transcribe_pack(pack: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            if len(pack) == 1:
+                return pack
+            try:
+                return self._transcribe_pack(pack, max_retries)
+            except Exception as e:
+                print(f"Packed request of {len(pack)} clips failed: {e}. Transcribing clips individually.")
+                return pack
+
+        # Packs run concurrently, clips returned by a pack still need an individual request
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            single_clips = [clip for remaining in executor.map(transcribe_pack, packs) for clip in remaining]
+
+        def transcribe_clip(clip: Dict[str, Any]) -> List[Dict[str, str]]:
+            return self.transcribe(clip["item"]["input"], max_retries=max_retries)
+
+        for result in iter_completed(transcribe_clip, single_clips, max_workers=max_workers):
+            item = single_clips[result["index"]]["item"]
+            item["results"] = result["results"]
+            item["error"] = result["error"]
+
+        for item in items:
+            if item["error"] is not None:
+                print(f"Error transcribing item {item['index']}: {item['error']}")
+
+        packed = len(clips) - len(single_clips)
+        print(f"Transcribed {packed} clips in packed requests, {len(single_clips)} individually")
+        return items
+
+    def _transcribe_pack(self, pack: List[Dict[str, Any]], max_retries: int) -> List[Dict[str, Any]]:
+        """
+        Transcribe a pack of clips in one request and store the results of accepted clips.
+
+        Args:
+            pack: Clips prepared by transcribe_packed
+            max_retries: Maximum number of retry attempts on error
+
+        Returns:
+            List[Dict[str, Any]]: Clips of the pack that have to be transcribed individually
+
+        Raises:
+            RuntimeError: If the request fails after maximum retries (RetryError)
+        """
+        contents = [get_pack_prompt(self.prompt, len(pack))]
+        for position, clip in enumerate(pack):
+            contents.append(f"Clip {position}:")
+            contents.append(types.Part.from_bytes(data=clip["data"], mime_type=clip["mime_type"]))
+
+        name = f"pack of {len(pack)} clips ({pack[0]['filename']}, ...)"
+        size = sum(len(clip["data"]) for clip in pack)
+        tokens = sum(clip["tokens"] for clip in pack) + len(contents[0]) // 4
+        attempts = 0
+
+        def attempt_pack(model: str) -> List[Any]:
+            nonlocal attempts
+            attempts += 1
+            key = self.key_pool.acquire() if self.key_pool is not None else None
+            client = key.client if key is not None else self.client
             try:
-                # Delete by known filename
-                if uploaded_file and hasattr(uploaded_file, "name"):
-                    try:
-                        print(f"Deleting uploaded file: {uploaded_file.name}")
-                        self.client.files.delete(name=uploaded_file.name)
-                    except Exception as e:
-                        print(f"Error deleting uploaded file: {e}")
-
-                # Delete any other files that might remain
+                self._wait_for_rate_limit(model, tokens, key.label if key is not None else None)
+                with measure_stage(
+                    self.metrics, "generation", file=name, model=model, bytes_in=size, retries=attempts - 1
+                ) as event:
+                    response = client.models.generate_content(
+                        model=model, contents=contents, config=self._get_pack_generation_config()
+                    )
+                    event.update(get_token_usage(response))
+                    event["bytes_out"] = len((response.text or "").encode("utf-8"))
+
+                text = response.text or ""
+                with measure_stage(self.metrics, "parse", file=name, bytes_in=len(text.encode("utf-8"))) as event:
+                    parsed = getattr(response, "parsed", None) if self.structured_output else None
+                    if isinstance(parsed, list):
+                        entries = [e.model_dump() if isinstance(e, PackedClip) else e for e in parsed]
+                    else:
+                        entries = self._parse_response(text)
+                    event["results"] = len(entries)
+            except Exception as e:
+                if key is not None:
+                    self.key_pool.release(key, e, self.retry_policy.get_retry_after(e))
+                raise
+            if key is not None:
+                self.key_pool.release(key)
+            return entries
+
+        entries = self.retry_policy.call(
+            attempt_pack,
+            self.model,
+            max_attempts=max_retries,
+            on_retry=self._log_retry,
+            delay_func=self._get_retry_delay,
+        )
+
+        by_clip, retry = split_packed_results(entries, len(pack))
+        for position, results in by_clip.items():
+            clip = pack[position]
+            clip["item"]["results"] = results
+            if clip["cache_key"] is not None:
+                self.cache.set(clip["cache_key"], results)
+
+        if retry:
+            indexes = [pack[position]["item"]["index"] for position in retry]
+            print(f"{name}: items {indexes} were dropped or merged, retrying them individually")
+        else:
+            print(f"Successfully transcribed {name}")
+        return [pack[position] for position in retry]
+
+    def _get_batch_backend(self, backend: Optional[BatchBackend] = None) -> BatchBackend:
+        """
+        Get backend of batch jobs.
+
+        Args:
+            backend: Backend given by the caller
+
+        Returns:
+            BatchBackend: The given backend, or a Gemini Batch API backend using this transcriber's key,
+                which the caller has to close
+        """
+        if backend is not None:
+            return backend
+        return GeminiBatchBackend(self.client, self.api_key, retry_policy=self.retry_policy)
+
+    def _get_batch_source(self, file: Union[str, BytesIO]) -> str:
+        """
+        Identify an input file of a batch job, so a resumed job can be checked against its inputs.
+
+        Args:
+            file: Path to audio file or BytesIO object
+
+        Returns:
+            str: Absolute path, or SHA-256 of the content of a BytesIO object
+        """
+        if isinstance(file, str):
+            return os.path.abspath(os.path.expanduser(file))
+        return f"sha256:{hashlib.sha256(file.getvalue()).hexdigest()}"
+
+    def submit_batch(
+        self,
+        files: Iterable[Union[str, BytesIO]],
+        state_path: str,
+        backend: Optional[BatchBackend] = None,
+        display_name: Optional[str] = None,
+    ) -> str:
+        """
+        Upload audio files and submit them as one batch job.
+
+        The job id, model and input files are written to state_path, so the job can be
+        awaited with wait_for_batch by another process, e.g. after a restart.
+
+        Args:
+            files: Iterable of paths to audio files or BytesIO objects
+            state_path: Path of the JSON state file of the job
+            backend: Batch backend. If None, the Gemini Batch API is used.
+            display_name: Display name of the job. If None, a timestamped name is used.
+
+        Returns:
+            str: Job id
+
+        Raises:
+            ValueError: If a file format is not supported or no file is given
+        """
+        if backend is None:
+            with self._get_batch_backend() as backend:
+                return self.submit_batch(files, state_path, backend=backend, display_name=display_name)
+
+        display_name = display_name or f"{BATCH_FILE_PREFIX}{datetime.now(timezone.utc):%Y%m%d-%H%M%S}"
+        generation_config = self._get_batch_generation_config()
+
+        items = []
+        try:
+            for index, file in enumerate(files):
+                file_source, file_data, filename, mime_type = self._prepare_file(file)
+                decoded = file_source if _is_decoded_audio(file_source) else None
+                cache_key = self._get_cache_key(file_data) if self.cache is not None else None
+
+                encoded = self._encode_audio(file_data, filename, mime_type, decoded=decoded)
+                if encoded is not None:
+                    file_data, filename, mime_type = encoded["data"], encoded["filename"], encoded["mime_type"]
+
+                with measure_stage(self.metrics, "upload", file=filename, bytes_in=len(file_data)):
+                    file_uri = backend.upload_file(file_data, mime_type, f"{BATCH_FILE_PREFIX}{filename}")
+
+                items.append(
+                    {
+                        "key": str(index),
+                        # BytesIO inputs cannot be persisted, they are identified by file name
+                        "input": file if isinstance(file, str) else filename,
+                        "source": self._get_batch_source(file),
+                        "file_uri": file_uri,
+                        "mime_type": mime_type,
+                        "cache_key": cache_key,
+                    }
+                )
+
+            if not items:
+                raise ValueError("No files to submit")
+
+            requests = [
+                {
+                    "key": item["key"],
+                    "request": build_batch_request(self.prompt, item["file_uri"], item["mime_type"], generation_config),
+                }
+                for item in items
+            ]
+            job_id = backend.submit(self.model, requests, display_name)
+        except Exception:
+            # Do not leave audio of a job that was never submitted
+            self._delete_batch_files(backend, None, items)
+            raise
+
+        save_batch_state(
+            state_path,
+            {
+                "job_id": job_id,
+                "model": self.model,
+                "display_name": display_name,
+                "submitted_at": datetime.now(timezone.utc).isoformat(),
+                "completed": False,
+                "status": "submitted",
+                "items": items,
+            },
+        )
+        print(f"Submitted batch job {job_id} with {len(items)} files")
+        return job_id
+
+    def wait_for_batch(
+        self,
+        state_path: str,
+        backend: Optional[BatchBackend] = None,
+        poll_interval_s: float = 60.0,
+        timeout_s: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Poll a submitted batch job until it finishes and map its results back to the input files.
+
+        Results are stored in the cache if one is set, and the uploaded audio is deleted
+        once the job has finished.
+
+        Args:
+            state_path: Path of the state file written by submit_batch
+            backend: Batch backend used to submit the job. If None, the Gemini Batch API is used.
+            poll_interval_s: Time (s) between job state checks
+            timeout_s: Maximum time (s) to wait. If None, waits until the job finishes.
+
+        Returns:
+            List[Dict[str, Any]]: {"index": int, "input": file path or name, "results": transcription
+                results or None, "error": exception or None} for each file, in input order
+
+        Raises:
+            FileNotFoundError: If the state file does not exist
+            TimeoutError: If the job does not finish within timeout_s
+            RuntimeError: If the job failed, was cancelled or expired. The terminal state is
+                recorded in the state file, so transcribe_batch submits a new job next time.
+        """
+        if backend is None:
+            with self._get_batch_backend() as backend:
+                return self.wait_for_batch(state_path, backend, poll_interval_s=poll_interval_s, timeout_s=timeout_s)
+
+        state = load_batch_state(state_path)
+        job_id = state["job_id"]
+        if state.get("completed") and state.get("status") not in (None, "succeeded"):
+            raise RuntimeError(f"Batch job {job_id} {state['status']}: {state.get('error')}")
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+
+        last_state = None
+        while True:
+            job = backend.get_job(job_id)
+            if job["state"] != last_state:
+                print(f"Batch job {job_id}: {job['state']}")
+                last_state = job["state"]
+            if job["state"] in TERMINAL_STATES:
+                break
+            if deadline is not None and time.monotonic() + poll_interval_s > deadline:
+                raise TimeoutError(f"Batch job {job_id} did not finish within {timeout_s}s")
+            time.sleep(poll_interval_s)
+
+        if job["state"] != "succeeded":
+            self._delete_batch_files(backend, job_id, state["items"])
+            state.update({"completed": True, "status": job["state"], "error": job.get("error")})
+            save_batch_state(state_path, state)
+            raise RuntimeError(f"Batch job {job_id} {job['state']}: {job.get('error')}")
+
+        raw_results = backend.get_results(job_id)
+        items = []
+        for index, item in enumerate(state["items"]):
+            result = raw_results.get(item["key"])
+            results = None
+            error = None
+            if result is None:
+                error = RuntimeError(f"No result for file {item['input']}")
+            elif result.get("error"):
+                error = RuntimeError(result["error"])
+            else:
                 try:
-                    for f in self.client.files.list():
-                        if hasattr(f, "name"):
-                            print(f"Deleting leftover file: {f.name}")
-                            self.client.files.delete(name=f.name)
-                except Exception as e:
-                    print(f"Error listing/deleting leftover files: {e}")
+                    with measure_stage(self.metrics, "parse", file=item["input"]) as event:
+                        results = self._parse_response(result["text"] or "")
+                        event["results"] = len(results)
+                except ValueError as e:
+                    error = e
+
+            if error is not None:
+                print(f"Error transcribing item {index}: {error}")
+            elif self.cache is not None and item.get("cache_key"):
+                self.cache.set(item["cache_key"], results)
+            items.append({"index": index, "input": item["input"], "results": results, "error": error})
+
+        self._delete_batch_files(backend, job_id, state["items"])
+        state.update({"completed": True, "status": "succeeded"})
+        save_batch_state(state_path, state)
+
+        succeeded = sum(item["error"] is None for item in items)
+        print(f"Batch job {job_id} finished: {succeeded}/{len(items)} files transcribed")
+        return items
+
+    def transcribe_batch(
+        self,
+        files: Iterable[Union[str, BytesIO]],
+        state_path: str,
+        backend: Optional[BatchBackend] = None,
+        poll_interval_s: float = 60.0,
+        timeout_s: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe many audio files as one offline batch job.
+
+        If state_path belongs to a job of the same files that has not completed yet, that job
+        is resumed instead of submitting the files again. A completed, failed, cancelled or
+        expired job is replaced by a new one.
+
+        Args:
+            files: Iterable of paths to audio files or BytesIO objects
+            state_path: Path of the JSON state file of the job
+            backend: Batch backend. If None, the Gemini Batch API is used.
+            poll_interval_s: Time (s) between job state checks
+            timeout_s: Maximum time (s) to wait. If None, waits until the job finishes.
+
+        Returns:
+            List[Dict[str, Any]]: Items as returned by wait_for_batch, in input order
+
+        Raises:
+            ValueError: If state_path belongs to an unfinished job of other files
+        """
+        if backend is None:
+            with self._get_batch_backend() as backend:
+                return self.transcribe_batch(
+                    files, state_path, backend, poll_interval_s=poll_interval_s, timeout_s=timeout_s
+                )
+
+        files = list(files)
+        state = load_batch_state(state_path) if os.path.exists(os.path.expanduser(state_path)) else None
+        if state is not None and not state.get("completed"):
+            self._check_batch_inputs(state, files, state_path)
+            print(f"Resuming batch job from {state_path}")
+        else:
+            self.submit_batch(files, state_path, backend=backend)
+        return self.wait_for_batch(state_path, backend=backend, poll_interval_s=poll_interval_s, timeout_s=timeout_s)
+
+    def _check_batch_inputs(
+        self, state: Dict[str, Any], files: List[Union[str, BytesIO]], state_path: str
+    ) -> None:
+        """
+        Check that an unfinished job of a state file was submitted for the given files.
+
+        Args:
+            state: Batch state
+            files: Input files of the current call
+            state_path: Path of the state file, used in the error message
+
+        Raises:
+            ValueError: If the files differ from the inputs of the job
+        """
+        items = state["items"]
+        if len(items) == len(files):
+            matches = [
+                item["source"] == self._get_batch_source(file)
+                if "source" in item
+                # State files written before sources were recorded only know the path
+                else isinstance(file, str) and item["input"] == file
+                for item, file in zip(items, files)
+            ]
+            if all(matches):
+                return
+        raise ValueError(
+            f"Batch job {state['job_id']} in {state_path} was submitted for other files, "
+            f"use another state_path or remove the state file"
+        )
+
+    def _delete_batch_files(
+        self, backend: BatchBackend, job_id: Optional[str], items: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Delete audio and request data uploaded for a batch job, logging failures.
+
+        Args:
+            backend: Batch backend the files were uploaded to
+            job_id: Job id, None if the job was not submitted
+            items: Items of the batch state
+        """
+        if job_id is not None:
+            try:
+                backend.delete_job_inputs(job_id)
             except Exception as e:
-                print(f"Overall error when deleting uploaded files: {e}")
+                print(f"Warning: Could not delete request file of batch job {job_id}: {e}")
+        for item in items:
+            try:
+                backend.delete_file(item["file_uri"])
+            except Exception as e:
+                print(f"Warning: Could not delete batch file {item['file_uri']}: {e}")
+
+    def _get_base_name(self, file: Union[str, BytesIO, "DecodedAudio"]) -> str:
+        """
+        Determine base name (without extension) used for files derived from the input.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+
+        Returns:
+            str: Base name
+        """
+        if isinstance(file, str):
+            return os.path.splitext(os.path.basename(file))[0]
+        elif getattr(file, "name", None):
+            return os.path.splitext(os.path.basename(file.name))[0]
+        return f"audio_{self._generate_random_string()}"
+
+    def _export_window(self, window: Dict, base_name: str) -> BytesIO:
+        """
+        Export audio window to a named WAV buffer.
+
+        Args:
+            window: Window from AudioSegmenter.split
+            base_name: Base name of the original file
+
+        Returns:
+            BytesIO: Buffer containing the window as WAV
+        """
+        window_buffer = BytesIO()
+        window["audio"].export(window_buffer, format="wav")
+        window_buffer.name = f"{base_name}_window{window['index']}.wav"
+        window_buffer.seek(0)
+        return window_buffer
+
+    def _stitch_window_results(
+        self, windows: List[Dict], window_results: List[List[Dict[str, str]]]
+    ) -> List[Dict[str, str]]:
+        """
+        Stitch transcription results of windows back in order together with window offsets.
+
+        Args:
+            windows: Windows from AudioSegmenter.split
+            window_results: Transcription results of each window, in window order
+
+        Returns:
+            List[Dict[str, str]]: Transcription results of all windows in order
+        """
+        results = []
+        for window, window_result in zip(windows, window_results):
+            for item in window_result:
+                item["window_index"] = window["index"]
+                item["window_start_ms"] = window["start_ms"]
+                item["window_end_ms"] = window["end_ms"]
+                results.append(item)
+
+        print(f"Successfully transcribed {len(windows)} windows: {len(results)} results")
+        return results
+
+    async def transcribe_async(
+        self,
+        file: Union[str, BytesIO, "DecodedAudio"],
+        max_retries: int = 5,
+    ) -> List[Dict[str, str]]:
+        """
+        Transcribe audio file content using the asynchronous Google Gemini API client.
+
+        Coroutine counterpart of transcribe: uploads, generations and retry waits do not
+        block the event loop, so many files can be in flight on a single thread.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+            max_retries: Maximum number of retry attempts on error
+
+        Returns:
+            List[Dict[str, str]]: Transcription results as JSON
+
+        Raises:
+            ValueError: If file format is not supported
+            RuntimeError: If transcription fails after maximum retries (RetryError)
+        """
+        # Variable to track request state and uploaded file
+        request = None
+
+        try:
+            # Process input file, reading file without blocking the event loop
+            file_source, file_data, filename, mime_type = await asyncio.to_thread(
+                self._prepare_file, file
+            )
+
+            # Return cached results without calling the API
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self._get_cache_key(file_data)
+                cached_results = await asyncio.to_thread(self.cache.get, cache_key)
+                if cached_results is not None:
+                    print(f"Using cached transcription for file {filename}")
+                    return cached_results
+
+            request = await asyncio.to_thread(
+                self._create_request, file_source, file_data, filename, mime_type
+            )
+
+            async def attempt_transcription(model: str) -> List[Dict[str, str]]:
+                request.begin_attempt()
+                try:
+                    audio_part = await request.get_audio_part_async()
+
+                    async def generate(target_model: str) -> List[Dict[str, str]]:
+                        # Call Gemini API
+                        await self._wait_for_rate_limit_async(
+                            target_model, request.estimated_tokens, request.scope
+                        )
+                        contents, config, cached_content = await asyncio.to_thread(
+                            self._get_generation_request, request, target_model, audio_part
+                        )
+                        try:
+                            with self._measure_generation(request, target_model) as event:
+                                response = await request.client.aio.models.generate_content(
+                                    model=target_model,
+                                    contents=contents,
+                                    config=config,
+                                )
+                                event.update(get_token_usage(response))
+                                event["bytes_out"] = len((response.text or "").encode("utf-8"))
+                        except Exception as e:
+                            request.handle_cache_error(e, cached_content)
+                            raise
+
+                        # Parse JSON result
+                        return self._measure_parse(request, response)
+
+                    # Send a duplicate request if the generation is slower than usual, the slower one is cancelled
+                    results = await run_hedged_async(generate, model, self.hedge_policy, request.begin_hedge)
+                except Exception as e:
+                    request.handle_error(e)
+                    raise
+                request.end_attempt()
+                return results
+
+            # Try upload and process with retry
+            try:
+                results = await self.retry_policy.call_async(
+                    attempt_transcription,
+                    self.model,
+                    max_attempts=max_retries,
+                    retry_if=request.is_stale_error,
+                    on_retry=self._log_retry,
+                    delay_func=self._get_retry_delay,
+                )
+            except RetryError as e:
+                # If model is still overloaded, try non-lite model once
+                if not ("-lite" in self.model and self.retry_policy.is_overloaded(e.last_error)):
+                    raise
+                non_lite_model = self.model.replace("-lite", "")
+                print(f"Trying with non-lite model: {non_lite_model}")
+                try:
+                    results = await attempt_transcription(non_lite_model)
+                except Exception as model_e:
+                    print(f"Not successful with model {non_lite_model}: {model_e}")
+                    raise e
+                print(f"Successfully transcribed with model {non_lite_model}")
+
+            print(f"Successfully transcribed file {filename}: {len(results)} results")
+            if cache_key is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, results)
+            return results
+
+        finally:
+            if request is not None:
+                request.release()
+
+    async def transcribe_long_async(
+        self,
+        file: Union[str, BytesIO, "DecodedAudio"],
+        max_retries: int = 5,
+        segmenter: Optional["AudioSegmenter"] = None,
+        max_workers: int = 4,
+    ) -> List[Dict[str, str]]:
+        """
+        Coroutine counterpart of transcribe_long.
+
+        Audio decoding and splitting run in a worker thread, windows are transcribed with
+        transcribe_async and at most max_workers windows are in flight at the same time.
+
+        Args:
+            file: Path to audio file, BytesIO object or DecodedAudio
+            max_retries: Maximum number of retry attempts on error for each window
+            segmenter: AudioSegmenter used to split the audio. If None, default settings are used.
+            max_workers: Maximum number of windows transcribed at the same time
+
+        Returns:
+            List[Dict[str, str]]: Transcription results of all windows in order
+
+        Raises:
+            ValueError: If file format is not supported
+            RuntimeError: If transcription of any window fails after maximum retries
+        """
+        if segmenter is None:
+            from .segmenter import AudioSegmenter
+
+            segmenter = AudioSegmenter()
+
+        # Split audio into windows at silence points without blocking the event loop
+        windows = await asyncio.to_thread(segmenter.split, file)
+        print(f"Split audio into {len(windows)} windows for transcription")
+
+        # Short audio does not need to be split
+        if len(windows) == 1:
+            if isinstance(file, BytesIO):
+                file.seek(0)
+            return await self.transcribe_async(file, max_retries=max_retries)
+
+        base_name = self._get_base_name(file)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def transcribe_window(window: Dict) -> List[Dict[str, str]]:
+            async with semaphore:
+                window_buffer = await asyncio.to_thread(self._export_window, window, base_name)
+                return await self.transcribe_async(window_buffer, max_retries=max_retries)
+
+        # Transcribe windows concurrently, gather keeps results in window order
+        window_results = await asyncio.gather(
+            *(transcribe_window(window) for window in windows)
+        )
+
+        return self._stitch_window_results(windows, window_results)
@@ -0,0 +1,135 @@
+"""
+Tests of batch jobs with the local backend.
+"""
+
+import json
+import threading
+import wave
+
+import pytest
+
+from gemini_audio_transcription import AudioTranscriber, BatchBackend, LocalBatchBackend
+
+RESPONSE = json.dumps([{"text": "hello", "description": "clear"}])
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"clip{i}.wav"
+        with wave.open(str(path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\0\0" * 1600 * (i + 1))
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def transcriber():
+    transcriber = AudioTranscriber(api_key="test-key")
+    yield transcriber
+    transcriber.close()
+
+
+def blocking_backend(storage_dir):
+    """
+    Local backend whose requests wait until the returned event is set.
+    """
+    release = threading.Event()
+
+    def handler(model, prompt, audio, mime_type):
+        release.wait(10)
+        return RESPONSE
+
+    return LocalBatchBackend(handler, storage_dir=storage_dir), release
+
+
+def test_incomplete_backend_cannot_be_created():
+    class UploadOnlyBackend(BatchBackend):
+        def upload_file(self, file_data, mime_type, display_name):
+            return "file"
+
+    with pytest.raises(TypeError):
+        UploadOnlyBackend()
+
+
+def test_batch_results_in_input_order(tmp_path, files, transcriber):
+    backend = LocalBatchBackend(lambda *args: RESPONSE, storage_dir=str(tmp_path / "store"))
+    state_path = str(tmp_path / "state.json")
+
+    items = transcriber.transcribe_batch(files, state_path, backend=backend, poll_interval_s=0.01)
+
+    assert [item["index"] for item in items] == [0, 1]
+    assert [item["input"] for item in items] == files
+    assert all(item["results"] == json.loads(RESPONSE) and item["error"] is None for item in items)
+    state = json.loads((tmp_path / "state.json").read_text())
+    assert state["completed"] and state["status"] == "succeeded"
+    # Uploaded audio is deleted once the results are read
+    assert list((tmp_path / "store" / "files").iterdir()) == []
+
+
+def test_unfinished_job_is_resumed(tmp_path, files, transcriber):
+    store = str(tmp_path / "store")
+    state_path = str(tmp_path / "state.json")
+    backend, release = blocking_backend(store)
+    job_id = transcriber.submit_batch(files, state_path, backend=backend)
+
+    release.set()
+    resumed = LocalBatchBackend(lambda *args: RESPONSE, storage_dir=store)
+    items = transcriber.transcribe_batch(files, state_path, backend=resumed, poll_interval_s=0.01)
+
+    assert json.loads((tmp_path / "state.json").read_text())["job_id"] == job_id
+    assert all(item["results"] for item in items)
+
+
+def test_resume_with_other_files_is_rejected(tmp_path, files, transcriber):
+    state_path = str(tmp_path / "state.json")
+    backend, release = blocking_backend(str(tmp_path / "store"))
+    transcriber.submit_batch(files, state_path, backend=backend)
+
+    try:
+        with pytest.raises(ValueError):
+            transcriber.transcribe_batch(files[:1], state_path, backend=backend)
+        with pytest.raises(ValueError):
+            transcriber.transcribe_batch(files[::-1], state_path, backend=backend)
+    finally:
+        release.set()
+
+
+def test_cancelled_job_is_recorded_and_replaced(tmp_path, files, transcriber):
+    store = str(tmp_path / "store")
+    state_path = str(tmp_path / "state.json")
+    backend, release = blocking_backend(store)
+    job_id = transcriber.submit_batch(files, state_path, backend=backend)
+    backend.cancel(job_id)
+    release.set()
+
+    with pytest.raises(RuntimeError):
+        transcriber.wait_for_batch(state_path, backend=backend, poll_interval_s=0.01)
+    state = json.loads((tmp_path / "state.json").read_text())
+    assert state["completed"] and state["status"] == "cancelled"
+    # A recorded failure is raised again without polling
+    with pytest.raises(RuntimeError):
+        transcriber.wait_for_batch(state_path, backend=backend)
+
+    items = transcriber.transcribe_batch(
+        files, state_path, backend=LocalBatchBackend(lambda *args: RESPONSE, storage_dir=store), poll_interval_s=0.01
+    )
+    assert json.loads((tmp_path / "state.json").read_text())["job_id"] != job_id
+    assert all(item["results"] for item in items)
+
+
+def test_failed_entries_are_reported_per_file(tmp_path, files, transcriber):
+    def handler(model, prompt, audio, mime_type):
+        if len(audio) > 4000:
+            raise RuntimeError("too long")
+        return RESPONSE
+
+    backend = LocalBatchBackend(handler, storage_dir=str(tmp_path / "store"))
+    items = transcriber.transcribe_batch(files, str(tmp_path / "state.json"), backend=backend, poll_interval_s=0.01)
+
+    assert items[0]["results"] and items[0]["error"] is None
+    assert items[1]["results"] is None and "too long" in str(items[1]["error"])
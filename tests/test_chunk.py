@@ -0,0 +1,80 @@
+"""
+Tests of lazy audio chunks.
+"""
+
+import io
+import wave
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from gemini_audio_transcription.chunk import AudioChunk, AudioSlice
+from gemini_audio_transcription.decoded_audio import DecodedAudio, pcm_to_samples
+
+
+@pytest.fixture
+def source():
+    return (np.arange(16000) % 200 - 100).astype(np.int16)
+
+
+@pytest.fixture
+def audio_slice(source):
+    return AudioSlice(source, 16000, 1000, 9000, leading_samples=160, trailing_samples=160)
+
+
+def test_slice_matches_equivalent_segment(audio_slice, source):
+    segment = audio_slice.to_segment()
+    expected = np.concatenate([np.zeros(160, np.int16), source[1000:9000], np.zeros(160, np.int16)])
+
+    assert isinstance(audio_slice, AudioSegment)
+    assert len(audio_slice) == len(segment) == 520
+    assert audio_slice == segment and segment == audio_slice
+    assert hash(audio_slice) == hash(segment)
+    assert np.array_equal(np.array(audio_slice.get_array_of_samples()), expected)
+
+
+def test_operations_return_plain_segments(audio_slice):
+    silence = AudioSegment.silent(10, frame_rate=16000)
+
+    assert type(audio_slice[0:100]) is AudioSegment
+    assert len(audio_slice[0:100]) == 100
+    assert len(audio_slice + silence) == len(silence + audio_slice) == 530
+    assert len(sum([audio_slice, audio_slice])) == 1040
+    assert len(audio_slice * 2) == 1040
+    assert type(audio_slice - 3) is AudioSegment
+
+
+def test_raw_data_is_built_once_for_consecutive_operations(audio_slice, monkeypatch):
+    builds = []
+    build_data = AudioSlice._build_data
+    monkeypatch.setattr(AudioSlice, "_build_data", lambda self: builds.append(1) or build_data(self))
+
+    audio_slice[0:100]
+    audio_slice + audio_slice
+    audio_slice.get_array_of_samples()
+
+    assert len(builds) == 1
+
+
+def test_wav_keeps_source_sample_width():
+    source = np.array([-8388608, -1, 0, 1, 8388607] * 100, dtype=np.int32)
+    audio_slice = AudioSlice(source, 48000, 10, 400, 5, 5, sample_width=3)
+
+    with wave.open(io.BytesIO(audio_slice.to_wav())) as wav_file:
+        assert wav_file.getsampwidth() == 3
+        samples = pcm_to_samples(wav_file.readframes(wav_file.getnframes()), 3)
+    assert np.array_equal(samples, audio_slice.samples)
+    # pydub holds 24-bit audio as 32-bit
+    assert audio_slice.sample_width == 4
+    assert audio_slice == DecodedAudio(audio_slice.samples, 48000, sample_width=3).to_segment()
+
+
+def test_chunk_is_read_only_mapping(audio_slice):
+    chunk = AudioChunk(audio_slice, "hello", "a.wav")
+
+    assert dict(chunk) == {"audio": audio_slice, "text": "hello", "filename": "a.wav"}
+    assert chunk.start_s == 1000 / 16000
+    assert chunk.to_wav() == audio_slice.to_wav()
+    with pytest.raises(KeyError):
+        chunk["start"]
@@ -0,0 +1,155 @@
+"""
+Tests of hedged requests.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from google.genai import errors
+
+from gemini_audio_transcription import AudioTranscriber, HedgePolicy
+from gemini_audio_transcription.hedging import run_hedged, run_hedged_async
+from gemini_audio_transcription.prompt_cache import PromptCache
+from gemini_audio_transcription.transcriber import _AudioRequest
+
+
+def policy_with(latencies, **kwargs):
+    policy = HedgePolicy(**kwargs)
+    for latency in latencies:
+        policy.record("model", latency)
+    return policy
+
+
+def test_delay_is_nearest_rank_percentile():
+    latencies = [float(i) for i in range(1, 21)]
+    assert policy_with(latencies, percentile=95, min_samples=20, min_delay_s=0).get_delay("model") == 19.0
+    assert policy_with(latencies, percentile=50, min_samples=20, min_delay_s=0).get_delay("model") == 10.0
+    assert policy_with(latencies, percentile=100, min_samples=20, min_delay_s=0).get_delay("model") == 20.0
+    # Latencies are sorted before ranking
+    assert policy_with(latencies[::-1], percentile=50, min_samples=20, min_delay_s=0).get_delay("model") == 10.0
+
+
+def test_delay_before_min_samples_uses_initial_delay():
+    assert policy_with([5.0] * 3, min_samples=4).get_delay("model") is None
+    assert policy_with([5.0] * 3, min_samples=4, initial_delay_s=2.0).get_delay("model") == 2.0
+    assert policy_with([5.0] * 4, min_samples=4, initial_delay_s=2.0).get_delay("model") == 5.0
+    # Latencies are kept per model
+    assert policy_with([5.0] * 4, min_samples=4).get_delay("other") is None
+
+
+def test_delay_is_bounded_by_min_delay_and_window():
+    assert policy_with([0.1] * 5, min_samples=5, min_delay_s=1.0).get_delay("model") == 1.0
+    # Only the last window latencies count
+    policy = policy_with([100.0] * 5 + [2.0] * 5, percentile=100, min_samples=5, window=5, min_delay_s=0)
+    assert policy.get_delay("model") == 2.0
+
+
+def test_invalid_policy_raises():
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=0)
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=101)
+    with pytest.raises(ValueError):
+        HedgePolicy(max_outstanding=-1)
+
+
+def test_slow_call_is_hedged_to_fallback_model():
+    policy = HedgePolicy(initial_delay_s=0.05, min_delay_s=0.05, fallback_model="fallback")
+    release = threading.Event()
+    hedges = []
+
+    def call(model):
+        if model == "model":
+            release.wait(5)
+        return model
+
+    def on_hedge():
+        hedges.append("sent")
+        return lambda: hedges.append("done")
+
+    try:
+        assert run_hedged(call, "model", policy, on_hedge) == "fallback"
+        assert policy.outstanding == 1
+    finally:
+        release.set()
+    deadline = time.monotonic() + 5
+    while policy.outstanding and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert policy.outstanding == 0
+    assert hedges == ["sent", "done"]
+
+
+def test_fast_call_is_not_hedged():
+    policy = HedgePolicy(initial_delay_s=1.0)
+    calls = []
+    assert run_hedged(lambda model: calls.append(model) or "ok", "model", policy) == "ok"
+    assert calls == ["model"]
+
+
+def test_no_hedge_while_losing_calls_are_outstanding():
+    policy = HedgePolicy(initial_delay_s=0.05, min_delay_s=0.05, max_outstanding=0)
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        time.sleep(0.2)
+        return model
+
+    assert run_hedged(call, "model", policy) == "model"
+    assert calls == ["model"]
+
+
+def test_error_of_original_call_is_raised_when_all_fail():
+    policy = HedgePolicy(initial_delay_s=0.05, min_delay_s=0.05, fallback_model="fallback")
+
+    def call(model):
+        if model == "model":
+            time.sleep(0.2)
+            raise RuntimeError("primary")
+        raise RuntimeError("hedge")
+
+    with pytest.raises(RuntimeError, match="primary"):
+        run_hedged(call, "model", policy)
+
+
+def test_async_losing_call_is_cancelled():
+    policy = HedgePolicy(initial_delay_s=0.05, min_delay_s=0.05, fallback_model="fallback")
+    cancelled = []
+
+    async def call(model):
+        if model == "model":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(model)
+                raise
+        return model
+
+    assert asyncio.run(run_hedged_async(call, "model", policy)) == "fallback"
+    assert cancelled == ["model"]
+
+
+def test_each_call_invalidates_the_cached_prompt_it_used():
+    transcriber = AudioTranscriber(api_key="test-key", prompt_cache=PromptCache())
+    try:
+        request = _AudioRequest(transcriber, None, b"", "clip.wav", "audio/wav")
+        cache_error = errors.ClientError(
+            400, {"error": {"code": 400, "message": "CachedContent not found", "status": "INVALID_ARGUMENT"}}
+        )
+        invalidated = []
+        transcriber.prompt_cache.invalidate = invalidated.append
+
+        # The hedged call used a newer handle and failed for another reason
+        request.handle_cache_error(cache_error, "cachedContents/old")
+        request.handle_cache_error(RuntimeError("timeout"), "cachedContents/new")
+        request.handle_cache_error(cache_error, None)
+        assert invalidated == ["cachedContents/old"]
+
+        request.handle_error(cache_error)
+        assert request.is_stale_error(cache_error)
+        request.handle_error(RuntimeError("timeout"))
+        assert not request.is_stale_error(cache_error)
+    finally:
+        transcriber.close()
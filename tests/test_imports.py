@@ -0,0 +1,35 @@
+"""
+Tests that the package import stays light for transcription-only users.
+"""
+
+import json
+import subprocess
+import sys
+
+# Modules that must stay unloaded until the classes needing them are used
+HEAVY_MODULES = ("stable_whisper", "torch", "pydub", "numpy", "magic")
+
+
+def loaded_modules(code: str):
+    """
+    Run code in a fresh interpreter and return the heavy modules it loaded.
+    """
+    code += f"\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_package_import_loads_no_heavy_modules():
+    assert loaded_modules("import gemini_audio_transcription") == []
+
+
+def test_transcriber_construction_loads_no_heavy_modules():
+    code = "import gemini_audio_transcription as g\ng.AudioTranscriber(api_key='test-key')"
+    assert loaded_modules(code) == []
+
+
+def test_audio_classes_load_on_first_access():
+    code = "import gemini_audio_transcription as g\ng.DecodedAudio, g.AudioSlice, g.AudioEncoder, g.AudioSegmenter"
+    loaded = loaded_modules(code)
+    assert "pydub" in loaded and "numpy" in loaded
+    assert "stable_whisper" not in loaded
@@ -0,0 +1,151 @@
+"""
+Tests of clip packing and the fallback to individual requests.
+"""
+
+import json
+import types
+import wave
+
+import pytest
+
+from gemini_audio_transcription import AudioTranscriber, RetryPolicy
+from gemini_audio_transcription.packing import get_pack_prompt, plan_packs, split_packed_results
+
+
+def results(text):
+    return [{"text": text, "description": "clear"}]
+
+
+def test_packs_respect_clip_byte_and_token_budget():
+    assert plan_packs([10] * 5, [1] * 5, max_clips=2, max_bytes=100) == [[0, 1], [2, 3], [4]]
+    assert plan_packs([40, 40, 40, 10], [1] * 4, max_clips=10, max_bytes=90) == [[0, 1], [2, 3]]
+    assert plan_packs([1] * 4, [5, 5, 5, 5], max_clips=10, max_bytes=100, max_tokens=10) == [[0, 1], [2, 3]]
+    # A clip over the budget on its own forms a pack of one
+    assert plan_packs([10, 200, 10], [1] * 3, max_clips=10, max_bytes=100) == [[0], [1], [2]]
+    assert plan_packs([], [], max_clips=10, max_bytes=100) == []
+
+
+def test_pack_prompt_lists_clip_indexes():
+    prompt = get_pack_prompt("Transcribe.\n", 3)
+    assert prompt.startswith("Transcribe.\n")
+    assert "3 separate audio clips" in prompt
+    assert "indexes 0 to 2" in prompt
+
+
+def test_complete_response_is_split_per_clip():
+    entries = [{"clip": i, "results": results(f"clip {i}")} for i in (2, 0, 1)]
+    by_clip, retry = split_packed_results(entries, 3)
+    assert by_clip == {0: results("clip 0"), 1: results("clip 1"), 2: results("clip 2")}
+    assert retry == []
+
+
+def test_missing_clip_and_its_neighbours_are_retried():
+    entries = [{"clip": i, "results": results(f"clip {i}")} for i in (0, 1, 3, 4)]
+    by_clip, retry = split_packed_results(entries, 5)
+    assert sorted(by_clip) == [0, 4]
+    assert retry == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"clip": 1, "results": []},
+        {"clip": 1, "results": "text"},
+        {"clip": 1, "results": ["text"]},
+        {"clip": "one", "results": results("x")},
+        {"results": results("x")},
+        "clip 1",
+    ],
+)
+def test_invalid_entry_counts_as_missing(entry):
+    entries = [{"clip": 0, "results": results("a")}, entry, {"clip": 2, "results": results("c")}]
+    by_clip, retry = split_packed_results(entries, 3)
+    assert by_clip == {}
+    assert retry == [0, 1, 2]
+
+
+def test_duplicate_and_out_of_range_clips_are_rejected():
+    entries = [
+        {"clip": 0, "results": results("a")},
+        {"clip": 0, "results": results("b")},
+        {"clip": "1", "results": results("c")},
+        {"clip": 2, "results": results("d")},
+        {"clip": 3, "results": results("e")},
+    ]
+    by_clip, retry = split_packed_results(entries, 3)
+    # Clip 0 appears twice, so it and its neighbour 1 are retried
+    assert by_clip == {2: results("d")}
+    assert retry == [0, 1]
+
+
+class FakeModels:
+    """
+    Fake models API answering packed and single requests.
+    """
+
+    def __init__(self, answer_pack):
+        self.answer_pack = answer_pack
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        labels = [part for part in contents if isinstance(part, str) and part.startswith("Clip ")]
+        self.calls.append(len(labels))
+        text = self.answer_pack(len(labels)) if labels else json.dumps(results("single"))
+        return types.SimpleNamespace(text=text, usage_metadata=None)
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"clip{i}.wav"
+        with wave.open(str(path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(b"\0\0" * 1600)
+        paths.append(str(path))
+    return paths
+
+
+def packed_transcriber(answer_pack):
+    transcriber = AudioTranscriber(api_key="test-key", retry_policy=RetryPolicy(base_delay_s=0))
+    transcriber.client = types.SimpleNamespace(models=FakeModels(answer_pack))
+    return transcriber
+
+
+def test_dropped_clips_are_transcribed_individually(files):
+    def answer_pack(count):
+        # The model drops the last clip
+        return json.dumps([{"clip": i, "results": results(f"packed {i}")} for i in range(count - 1)])
+
+    transcriber = packed_transcriber(answer_pack)
+    try:
+        items = transcriber.transcribe_packed(files, max_clips=4, max_workers=1)
+    finally:
+        transcriber.close()
+
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert [item["results"] for item in items] == [
+        results("packed 0"),
+        results("packed 1"),
+        results("single"),
+        results("single"),
+    ]
+    assert all(item["error"] is None for item in items)
+    assert transcriber.client.models.calls == [4, 0, 0]
+
+
+def test_failed_pack_falls_back_to_single_requests(files):
+    def answer_pack(count):
+        return "not json"
+
+    transcriber = packed_transcriber(answer_pack)
+    try:
+        items = transcriber.transcribe_packed(files, max_retries=2, max_clips=2, max_workers=1)
+    finally:
+        transcriber.close()
+
+    assert [item["results"] for item in items] == [results("single")] * 4
+    # Each pack is retried once before its clips are sent individually
+    assert transcriber.client.models.calls == [2, 2, 2, 2, 0, 0, 0, 0]
@@ -0,0 +1,26 @@
+"""
+Tests of AudioProcessor construction.
+"""
+
+import pytest
+
+pytest.importorskip("stable_whisper")
+
+from gemini_audio_transcription import AudioEncoder  # noqa: E402
+from gemini_audio_transcription.processor import AudioProcessor  # noqa: E402
+
+
+def test_uploads_are_not_encoded_by_default():
+    processor = AudioProcessor(api_key="test-key")
+    assert processor.transcriber.upload_encoder is None
+
+
+def test_default_upload_encoder_is_lossless():
+    processor = AudioProcessor(api_key="test-key", encode_uploads=True)
+    assert processor.transcriber.upload_encoder.formats == ("flac",)
+
+
+def test_lossy_upload_encoder_is_opt_in():
+    encoder = AudioEncoder(formats=("opus",))
+    processor = AudioProcessor(api_key="test-key", encode_uploads=True, upload_encoder=encoder)
+    assert processor.transcriber.upload_encoder is encoder
@@ -0,0 +1,85 @@
+"""
+Tests of client-side rate limiting.
+"""
+
+import asyncio
+
+import pytest
+
+from gemini_audio_transcription import FileLockBackend, InMemoryBackend, RateLimiter
+from gemini_audio_transcription.rate_limiter import _take
+
+
+def test_bucket_starts_full_and_refills_over_time():
+    buckets = {}
+    # 3 requests per minute refill one request every 20 s
+    for _ in range(3):
+        assert _take(buckets, [("m:rpm", 3.0, 1.0)], now=100.0) == 0
+    assert _take(buckets, [("m:rpm", 3.0, 1.0)], now=100.0) == pytest.approx(20.0)
+    assert _take(buckets, [("m:rpm", 3.0, 1.0)], now=110.0) == pytest.approx(10.0)
+    assert _take(buckets, [("m:rpm", 3.0, 1.0)], now=120.0) == 0
+    # Refill is capped at the capacity
+    assert _take(buckets, [("m:rpm", 3.0, 1.0)], now=10000.0) == 0
+    assert buckets["m:rpm"][0] == pytest.approx(2.0)
+
+
+def test_tokens_are_taken_from_all_buckets_or_none():
+    buckets = {}
+    requests = [("m:rpm", 60.0, 1.0), ("m:tpm", 100.0, 80.0)]
+    assert _take(buckets, requests, now=0.0) == 0
+    # The request bucket has room, the token bucket does not, so neither is charged
+    assert _take(buckets, requests, now=0.0) == pytest.approx(36.0)
+    assert buckets["m:rpm"][0] == pytest.approx(59.0)
+    assert buckets["m:tpm"][0] == pytest.approx(20.0)
+
+
+def test_request_larger_than_bucket_passes_when_full():
+    buckets = {}
+    assert _take(buckets, [("m:tpm", 100.0, 500.0)], now=0.0) == 0
+    assert buckets["m:tpm"][0] == 0
+    assert _take(buckets, [("m:tpm", 100.0, 500.0)], now=30.0) == pytest.approx(30.0)
+
+
+def test_budgets_are_separate_per_model_and_scope():
+    limiter = RateLimiter(requests_per_minute=1, model_limits={"fast": (None, None)})
+    assert limiter.try_acquire("model") == 0
+    assert limiter.try_acquire("model") > 0
+    assert limiter.try_acquire("other") == 0
+    assert limiter.try_acquire("model", scope="key-2") == 0
+    # Unlimited models are never throttled
+    for _ in range(5):
+        assert limiter.try_acquire("fast") == 0
+
+
+def test_tokens_per_minute_only_counts_estimated_tokens():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter.try_acquire("model", tokens=900) == 0
+    assert limiter.try_acquire("model", tokens=0) == 0
+    assert limiter.try_acquire("model", tokens=200) == pytest.approx(6.0, abs=0.1)
+
+
+def test_acquire_waits_for_budget():
+    # 1200 requests per minute refill one request every 50 ms
+    limiter = RateLimiter(requests_per_minute=1200, backend=InMemoryBackend())
+    for _ in range(1200):
+        assert limiter.try_acquire("model") == 0
+    assert 0 < limiter.acquire("model") < 1
+    assert 0 < asyncio.run(limiter.acquire_async("model")) < 1
+
+
+def test_file_backend_shares_budget_between_limiters(tmp_path):
+    path = str(tmp_path / "limits" / "state.json")
+    first = RateLimiter(requests_per_minute=2, backend=FileLockBackend(path))
+    second = RateLimiter(requests_per_minute=2, backend=FileLockBackend(path))
+    assert first.try_acquire("model") == 0
+    assert second.try_acquire("model") == 0
+    assert first.try_acquire("model") > 0
+    assert second.try_acquire("model") > 0
+
+
+def test_file_backend_recovers_from_corrupt_state(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("not json", encoding="utf-8")
+    limiter = RateLimiter(requests_per_minute=1, backend=FileLockBackend(str(path)))
+    assert limiter.try_acquire("model") == 0
+    assert limiter.try_acquire("model") > 0
@@ -0,0 +1,160 @@
+"""
+Tests of retry classification and backoff.
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from google.genai import errors
+
+from gemini_audio_transcription import RetryError, RetryPolicy
+
+
+def api_error(code, details=None, headers=None):
+    body = {"error": {"code": code, "message": "error", "status": "ERROR"}}
+    if details is not None:
+        body["error"]["details"] = details
+    response = httpx.Response(code, headers=headers) if headers is not None else None
+    error_type = errors.ClientError if code < 500 else errors.ServerError
+    return error_type(code, body, response)
+
+
+@pytest.mark.parametrize("code", [408, 429, 500, 502, 503, 504])
+def test_transient_status_codes_are_retried(code):
+    assert RetryPolicy().is_retryable(api_error(code))
+
+
+@pytest.mark.parametrize("code", [400, 401, 403, 404, 501])
+def test_permanent_status_codes_are_not_retried(code):
+    assert not RetryPolicy().is_retryable(api_error(code))
+
+
+def test_exceptions_are_classified_by_type():
+    policy = RetryPolicy()
+    assert policy.is_retryable(httpx.ConnectTimeout("timeout"))
+    assert policy.is_retryable(ConnectionResetError())
+    assert policy.is_retryable(ValueError("Cannot parse result as JSON"))
+    assert not policy.is_retryable(KeyError("text"))
+    assert not RetryPolicy(retryable_exceptions=()).is_retryable(ValueError("bad"))
+
+
+def test_overloaded_errors():
+    policy = RetryPolicy()
+    assert policy.is_overloaded(api_error(503))
+    assert not policy.is_overloaded(api_error(429))
+    assert not policy.is_overloaded(TimeoutError())
+
+
+def test_retry_after_hints():
+    policy = RetryPolicy()
+    assert policy.get_retry_after(api_error(429, headers={"retry-after": "7"})) == 7.0
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert policy.get_retry_after(api_error(503, headers={"retry-after": retry_at})) == pytest.approx(30, abs=2)
+    details = [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12.5s"}]
+    assert policy.get_retry_after(api_error(429, details=details)) == 12.5
+    assert policy.get_retry_after(api_error(429)) is None
+    assert policy.get_retry_after(TimeoutError()) is None
+
+
+def test_backoff_is_full_jitter_under_the_cap():
+    policy = RetryPolicy(base_delay_s=1.0, max_delay_s=10.0)
+    random.seed(0)
+    for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (5, 10.0), (20, 10.0)]:
+        delays = [policy.get_delay(attempt, TimeoutError()) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > cap / 2
+
+
+def test_server_hint_overrides_backoff():
+    policy = RetryPolicy(base_delay_s=1.0, max_delay_s=10.0)
+    assert 7.0 <= policy.get_delay(1, api_error(429, headers={"retry-after": "7"})) <= 8.0
+    assert 10.0 <= policy.get_delay(1, api_error(429, headers={"retry-after": "120"})) <= 11.0
+
+
+def test_call_retries_until_success():
+    policy = RetryPolicy(base_delay_s=0)
+    outcomes = [api_error(503), TimeoutError(), "ok"]
+    retries = []
+
+    def func():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert policy.call(func, on_retry=lambda e, attempt, delay: retries.append(attempt)) == "ok"
+    assert retries == [1, 2]
+
+
+def test_call_raises_non_retryable_error_at_once():
+    policy = RetryPolicy(base_delay_s=0)
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise api_error(400)
+
+    with pytest.raises(errors.ClientError):
+        policy.call(func)
+    assert len(calls) == 1
+
+
+def test_call_gives_up_after_max_attempts():
+    policy = RetryPolicy(max_attempts=5, base_delay_s=0)
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise TimeoutError()
+
+    with pytest.raises(RetryError) as info:
+        policy.call(func, max_attempts=3)
+    assert len(calls) == 3
+    assert info.value.attempts == 3
+    assert isinstance(info.value.last_error, TimeoutError)
+
+
+def test_retry_if_marks_more_errors_retryable():
+    policy = RetryPolicy(base_delay_s=0)
+    outcomes = [KeyError("stale"), "ok"]
+
+    def func():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert policy.call(func, retry_if=lambda e: isinstance(e, KeyError)) == "ok"
+
+
+def test_deadline_stops_retries():
+    policy = RetryPolicy(max_attempts=10, deadline_s=1.0)
+
+    def func():
+        raise TimeoutError()
+
+    with pytest.raises(RetryError, match="deadline") as info:
+        policy.call(func, delay_func=lambda attempt, error: 5.0)
+    assert info.value.attempts == 1
+
+
+def test_call_async_retries():
+    policy = RetryPolicy(base_delay_s=0)
+    outcomes = [api_error(429), "ok"]
+
+    async def func(value):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return f"{outcome} {value}"
+
+    assert asyncio.run(policy.call_async(func, "async")) == "ok async"
+
+
+def test_invalid_policy_raises():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
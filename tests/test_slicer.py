@@ -0,0 +1,49 @@
+"""
+Tests of sample-accurate slicing.
+"""
+
+import numpy as np
+import pytest
+
+from gemini_audio_transcription.slicer import compute_boundaries, ms_to_samples, slice_samples
+
+
+def test_ms_to_samples_rounds_to_nearest_sample():
+    assert ms_to_samples(100, 16000) == 1600
+    assert ms_to_samples(0.04, 16000) == 1
+    assert ms_to_samples(0.03, 16000) == 0
+    assert ms_to_samples(-5, 16000) == 0
+
+
+def test_boundaries_round_to_nearest_sample():
+    # 0.10003 s is 1600.48 samples and 0.20004 s is 3200.64 samples at 16 kHz
+    start_idx, end_idx = compute_boundaries([0.10003], [0.20004], 16000, 16000)
+    assert start_idx.tolist() == [1600]
+    assert end_idx.tolist() == [3201]
+
+
+def test_boundaries_are_clipped_and_ordered():
+    start_idx, end_idx = compute_boundaries([-1.0, 0.5, 2.0], [0.25, 0.4, 3.0], 16000, 16000)
+    assert start_idx.tolist() == [0, 8000, 16000]
+    assert end_idx.tolist() == [4000, 8000, 16000]
+
+
+def test_boundaries_reject_mismatched_lengths():
+    with pytest.raises(ValueError):
+        compute_boundaries([0.0, 1.0], [1.0], 16000, 16000)
+
+
+def test_unpadded_chunks_are_views():
+    samples = np.arange(100, dtype=np.int16)
+    chunks = slice_samples(samples, np.array([10, 50]), np.array([20, 55]))
+    assert [chunk.tolist() for chunk in chunks] == [list(range(10, 20)), list(range(50, 55))]
+    assert all(np.shares_memory(chunk, samples) for chunk in chunks)
+
+
+def test_padded_chunks_share_one_buffer():
+    samples = np.arange(1, 101, dtype=np.int16)
+    chunks = slice_samples(samples, np.array([0, 10]), np.array([3, 12]), 2, 1)
+    assert chunks[0].tolist() == [0, 0, 1, 2, 3, 0]
+    assert chunks[1].tolist() == [0, 0, 11, 12, 0]
+    assert np.shares_memory(chunks[0], chunks[1].base)
+    assert not np.shares_memory(chunks[0], samples)
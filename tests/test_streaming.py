@@ -0,0 +1,67 @@
+"""
+Tests of incremental JSON parsing of streamed responses.
+"""
+
+import json
+
+import pytest
+
+from gemini_audio_transcription.streaming import JSONArrayStreamParser
+
+ITEMS = [
+    {"text": "say \"hi\" {not a brace}", "description": "quote [and] bracket"},
+    {"text": "back\\slash é", "description": "nested", "extra": {"a": [1, {"b": 2}]}},
+    {"text": "", "description": "empty"},
+]
+
+
+def feed_in_pieces(text, size):
+    parser = JSONArrayStreamParser()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i : i + size]))
+    parser.close()
+    return parser, items
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_objects_match_json_loads_for_any_piece_size(size):
+    text = "```json\n" + json.dumps(ITEMS, indent=2) + "\n```"
+    parser, items = feed_in_pieces(text, size)
+    assert items == ITEMS
+    assert parser.finished
+
+
+def test_object_is_returned_when_its_closing_brace_arrives():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"text": "a", ') == []
+    assert parser.feed('"description": "b"}') == [{"text": "a", "description": "b"}]
+    assert parser.feed(', {"text": "c"') == []
+    assert parser.feed("}]") == [{"text": "c"}]
+    assert parser.finished
+    # Text after the array is ignored
+    assert parser.feed('[{"text": "d"}]') == []
+
+
+def test_empty_array():
+    parser, items = feed_in_pieces("[]", 1)
+    assert items == []
+    assert parser.finished
+
+
+def test_missing_or_unclosed_array_raises_on_close():
+    parser = JSONArrayStreamParser()
+    parser.feed("no json here")
+    with pytest.raises(ValueError, match="Valid JSON format not found"):
+        parser.close()
+
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"text": "a"}, {"text": ') == [{"text": "a"}]
+    with pytest.raises(ValueError, match="response ended"):
+        parser.close()
+
+
+def test_invalid_object_raises():
+    parser = JSONArrayStreamParser()
+    with pytest.raises(ValueError, match="Cannot parse result as JSON"):
+        parser.feed('[{"text": "a",}]')